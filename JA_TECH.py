@@ -1,143 +1,226 @@
+import time
+_INICIO_PROCESSO = time.perf_counter() # Marca antes dos imports para medir o custo deles
 import sys
 import os
-import subprocess
-import json
-import webbrowser
 from pathlib import Path
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTimeEdit, QLineEdit, QFrame, QRadioButton, QComboBox,
-                             QSpinBox, QPushButton, QListWidget, QApplication, QStackedWidget, QProgressBar,
-                             QListWidgetItem, QFileDialog, QMessageBox, QHBoxLayout, QGroupBox, QButtonGroup)
-from PyQt6.QtCore import QTimer, QTime, Qt, QSize, QUrl, QThread, pyqtSignal
+                             QSpinBox, QPushButton, QListWidget, QListView, QApplication, QStackedWidget, QProgressBar,
+                             QListWidgetItem, QFileDialog, QMessageBox, QHBoxLayout, QGroupBox, QButtonGroup, QDialog,
+                             QCheckBox, QDateEdit)
+from PyQt6.QtCore import QTimer, QTime, QDate, Qt, QSize, QCoreApplication
 from PyQt6.QtGui import QIcon
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PyQt6.QtMultimediaWidgets import QVideoWidget
-import yt_dlp
 from style import STYLE
+from config import ROOT_DIR, BUILDE_DIR, carregar_config
+from downloads import PAUSADO, ERRO, CANCELADO
+from analise import (AnaliseWorker, ExpansorPlaylist, PreCarregadorYtDlp, CacheAnalise, normalizar_id,
+                     FORMATOS_LOTE)
+from nucleo import Nucleo
+from exibicao import MSG_TELAS_SEM_SINCRONIA
+from servico import ClienteServico, GerenciadorRemoto, ExibidorRemoto, HistoricoRemoto, TranscodificadorRemoto
+from transcodificacao import PRESETS, CONVERTENDO
+from formatos import ranquear_formatos, texto_audio
+from agendador import DIAS_SEMANA, TODOS_OS_DIAS
+from modelo_eventos import ModeloEventos, FiltroEventos, PAPEL_HORA, PAPEL_MONITOR, PAPEL_ORDEM
 
 # --- Versão ---
 APP_VERSION = "1.0.2"
 
-# --- Configurações Globais ---
-DATA_FILE = "configuracoes.json"
-ROOT_DIR = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
-# Define onde está a pasta build
-BUILDE_DIR = ROOT_DIR / "builde"
-# Garante que a pasta downloads fique na raiz do projeto
-DOWNLOAD_DIR = ROOT_DIR / "downloads"
-DOWNLOAD_DIR.mkdir(exist_ok=True) # Cria a pasta se não existir
-
-# Verificação visual no terminal
-print(f"Raiz do Projeto: {ROOT_DIR}")
-print(f"Pasta de Ferramentas (Builde): {BUILDE_DIR}")
-
-# --- Funções de JSON ---
-def carregar_config():
-    if not os.path.exists(DATA_FILE):
-        return {"eventos": [], "downloads": []}
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Erro ao carregar JSON: {e}")
-        return {"eventos": [], "downloads": []}
-
-def salvar_config(cfg):
-    try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Erro ao salvar JSON: {e}")
-
-class DownloadWorker(QThread):
-    progress = pyqtSignal(int)
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
-    status_msg = pyqtSignal(str)
-
-    def __init__(self, url, is_audio, quality_id):
-        super().__init__()
-        self.url = url
-        self.is_audio = is_audio
-        self.quality_id = quality_id
-        # Garante que seja string para o yt-dlp
-        self.ffmpeg_dir = str(BUILDE_DIR)
-
-    def run(self):
-        # --- 1. Verificação de Segurança do FFmpeg ---
-        # Verifica se os arquivos realmente existem antes de tentar baixar
-        ffmpeg_path = BUILDE_DIR / "ffmpeg.exe"
-        ffprobe_path = BUILDE_DIR / "ffprobe.exe"
-
-        if not ffmpeg_path.exists():
-            self.error.emit(f"CRÍTICO: ffmpeg.exe não encontrado em:\n{ffmpeg_path}")
-            return
-        
-        if not ffprobe_path.exists():
-            self.error.emit(f"CRÍTICO: ffprobe.exe não encontrado em:\n{ffprobe_path}")
+# --- Perfil de Inicialização (--profile-startup) ---
+class PerfilInicializacao:
+    def __init__(self, ativo):
+        self.ativo = ativo
+        self.etapas = []
+        self._ultimo = _INICIO_PROCESSO
+
+    def marcar(self, etapa):
+        agora = time.perf_counter()
+        self.etapas.append((etapa, agora - self._ultimo))
+        self._ultimo = agora
+
+    def registrar(self, etapa, duracao):
+        # Para etapas medidas fora da linha do tempo principal (ex: threads)
+        self.etapas.append((etapa, duracao))
+
+    def relatorio(self):
+        if not self.ativo:
             return
+        print("--- Perfil de Inicialização ---")
+        print(f"Raiz do Projeto: {ROOT_DIR}")
+        print(f"Pasta de Ferramentas (Builde): {BUILDE_DIR}")
+        for etapa, duracao in self.etapas:
+            print(f"{etapa:<45} {duracao * 1000:8.1f} ms")
+        print(f"{'Total até a janela responder':<45} {(self._ultimo - _INICIO_PROCESSO) * 1000:8.1f} ms")
+
+PERFIL = PerfilInicializacao("--profile-startup" in sys.argv)
+PERFIL.marcar("Imports (Python + PyQt6 + módulos do app)")
+
+class ItemFilaWidget(QWidget):
+    def __init__(self, job):
+        super().__init__()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 4, 6, 4)
 
-        # --- 2. Hook de Progresso Matemático (Sem ler texto) ---
-        def progress_hook(d):
-            if d['status'] == 'downloading':
-                try:
-                    # Pega os bytes totais e baixados
-                    total = d.get('total_bytes') or d.get('total_bytes_estimate')
-                    baixado = d.get('downloaded_bytes', 0)
-                    
-                    if total:
-                        # Calcula a porcentagem matematicamente (infalível)
-                        porcentagem = (baixado / total) * 100
-                        self.progress.emit(int(porcentagem))
-                    
-                    # Atualiza o texto de status
-                    velocidade = d.get('_speed_str', '...')
-                    percent_str = d.get('_percent_str', '0%')
-                    self.status_msg.emit(f"Baixando: {percent_str} | Vel: {velocidade}")
-                    
-                except Exception as e:
-                    print(f"Erro cálculo progresso: {e}")
-            
-            elif d['status'] == 'finished':
-                self.progress.emit(100)
-                self.status_msg.emit("Download finalizado. Convertendo áudio/vídeo (aguarde)...")
-
-        # --- 3. Configurações yt-dlp ---
-        ydl_opts = {
-            'outtmpl': str(DOWNLOAD_DIR / '%(title)s.%(ext)s'),
-            'ffmpeg_location': self.ffmpeg_dir, # Passa a pasta 'build'
-            'quiet': True,
-            'noprogress': True, # Desliga a barra do terminal para evitar lixo no log
-            'progress_hooks': [progress_hook],
-        }
-
-        if self.is_audio:
-            ydl_opts.update({
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-            })
+        self.lbl_titulo = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.progress_bar.setTextVisible(True)
+        self.lbl_estado = QLabel()
+        self.lbl_estado.setStyleSheet("font-weight: normal; font-size: 12px;")
+
+        layout.addWidget(self.lbl_titulo)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.lbl_estado)
+        self.setLayout(layout)
+        self.atualizar(job)
+
+    def atualizar(self, job):
+        tipo_icon = "🎵" if job["is_audio"] else "🎬"
+        self.lbl_titulo.setText(f"{tipo_icon} {job['titulo']}")
+        self.progress_bar.setValue(job["progresso"])
+        self.lbl_estado.setText(f"[{job['estado'].upper()}] {job['mensagem']}")
+
+    def atualizar_progresso(self, progresso):
+        # Chamado no máximo 10x por segundo pelo AgregadorProgresso
+        self.progress_bar.setValue(progresso.percentual)
+        self.lbl_estado.setText(f"[BAIXANDO] {progresso.texto()}")
+
+    def atualizar_conversao(self, tarefa):
+        # Depois do download, a mesma linha acompanha a conversão do arquivo
+        self.progress_bar.setValue(tarefa["progresso"])
+        nome = PRESETS[tarefa["preset"]]["nome"]
+        if tarefa["estado"] == CONVERTENDO:
+            velocidade = f" ({tarefa['velocidade']:.1f}x)" if tarefa.get("velocidade") else ""
+            self.lbl_estado.setText(f"[CONVERTENDO] {nome}: {tarefa['progresso']}%{velocidade}")
+        else:
+            self.lbl_estado.setText(f"[{tarefa['estado'].upper()}] {tarefa['mensagem']}")
+
+class DialogoHistorico(QDialog):
+    def __init__(self, historico, parent=None):
+        super().__init__(parent)
+        self.historico = historico
+        self.setWindowTitle("Histórico de Downloads")
+        self.resize(700, 450)
+        layout = QVBoxLayout()
+
+        self.busca = QLineEdit()
+        self.busca.setPlaceholderText("Buscar por título, link ou ID do vídeo...")
+        self.busca.textChanged.connect(self.atualizar)
+        self.lista = QListWidget()
+
+        layout.addWidget(self.busca)
+        layout.addWidget(self.lista)
+        self.setLayout(layout)
+        self.atualizar()
+
+    def atualizar(self):
+        # Pelo serviço a busca não espera a resposta: a lista é preenchida quando ela chegar
+        if hasattr(self.historico, "consultar_depois"):
+            self.historico.consultar_depois(self.busca.text(), self.mostrar, self.falhou)
         else:
-            # Baixa vídeo + melhor áudio disponível
-            ydl_opts.update({
-                'format': f'{self.quality_id}+bestaudio/best'
-            })
+            self.mostrar(self.historico.consultar(self.busca.text()))
+
+    def falhou(self, msg):
+        self.lista.clear()
+        self.lista.addItem(f"⚠️ Sem resposta do serviço: {msg}")
+
+    def mostrar(self, entradas):
+        self.lista.clear()
+        for e in entradas:
+            texto = f"📅 {e['data']} | 🎞️ {e['formato']} | {e['titulo'] or e['url']}"
+            item = QListWidgetItem(texto)
+            item.setToolTip(f"{e['arquivo']}\nSHA-256: {e['sha256']}")
+            self.lista.addItem(item)
+
+def _formatar_ms(valor):
+    return "—" if valor is None else f"{valor:.0f} ms"
+
+class DialogoMetricas(QDialog):
+    # Painel dos tempos de disparo da agenda (metricas.py), atualizado a cada 2 s
+    def __init__(self, metricas, parent=None):
+        super().__init__(parent)
+        self.metricas = metricas
+        self.setWindowTitle("Tempos de Disparo da Agenda")
+        self.resize(760, 480)
+        layout = QVBoxLayout()
 
+        self.lbl_resumo = QLabel()
+        self.lbl_resumo.setStyleSheet("font-family: monospace; font-weight: normal;")
+        self.lbl_resumo.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.lista = QListWidget()
+        self.btn_exportar = QPushButton("💾 Exportar CSV")
+        self.btn_exportar.clicked.connect(self.exportar)
+
+        layout.addWidget(self.lbl_resumo)
+        layout.addWidget(QLabel("Últimos disparos:"))
+        layout.addWidget(self.lista)
+        layout.addWidget(self.btn_exportar)
+        self.setLayout(layout)
+
+        self._consultando = False
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.atualizar)
+        self.timer.start(2000)
+        self.atualizar()
+
+    def atualizar(self):
+        if not hasattr(self.metricas, "consultar_depois"):
+            self.mostrar({"resumo": self.metricas.resumo(), "ultimas": self.metricas.ultimas(50)})
+        elif not self._consultando:
+            # Pelo serviço: o timer não trava a janela esperando, e não empilha consultas
+            self._consultando = True
+            self.metricas.consultar_depois(50, self.mostrar, self.falhou)
+
+    def falhou(self, msg):
+        self._consultando = False
+        self.lbl_resumo.setText(f"Sem resposta do serviço: {msg}")
+
+    def mostrar(self, dados):
+        self._consultando = False
+        r = dados["resumo"]
+        dentro = "—" if r["dentro_sla"] is None else f"{r['dentro_sla']}%"
+        linhas = [f"Disparos: {r['disparos']}   Perdidos: {r['perdidos']}   "
+                  f"Na tela em até {r['sla_ms']} ms: {dentro}", "",
+                  f"{'':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'máx':>10}{'n':>7}"]
+        for campo, nome in (("atraso_despacho_ms", "Despacho"), ("atraso_spawn_ms", "Abertura"),
+                            ("atraso_quadro_ms", "Primeiro quadro"), ("fechamento_ms", "Fechamento")):
+            c = r[campo]
+            linhas.append(f"{nome:<22}{_formatar_ms(c['p50']):>10}{_formatar_ms(c['p95']):>10}"
+                          f"{_formatar_ms(c['p99']):>10}{_formatar_ms(c['max']):>10}{c['n']:>7}")
+        self.lbl_resumo.setText("\n".join(linhas))
+
+        self.lista.clear()
+        for m in reversed(dados["ultimas"]):
+            hora = time.strftime("%d/%m %H:%M:%S", time.localtime(m["agendado"]))
+            if m.get("perdido"):
+                texto = f"⚠️ {hora} | PERDIDO | {m['arquivo']}"
+            else:
+                texto = (f"{hora} | {m.get('motor') or '?'} | despacho {_formatar_ms(m['atraso_despacho_ms'])}"
+                         f" | abertura {_formatar_ms(m['atraso_spawn_ms'])} | quadro {_formatar_ms(m['atraso_quadro_ms'])}"
+                         f" | fechamento {_formatar_ms(m['fechamento_ms'])} | {os.path.basename(m['arquivo'] or '')}")
+            self.lista.addItem(texto)
+
+    def exportar(self):
+        caminho, _ = QFileDialog.getSaveFileName(self, "Exportar tempos", "tempos_agenda.csv", "CSV (*.csv)")
+        if not caminho:
+            return
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=True)
-                titulo = info.get('title', 'Arquivo')
-                self.finished.emit(f"Sucesso! Salvo em downloads.\nTítulo: {titulo}")
-        except Exception as e:
-            self.error.emit(f"Erro no Download: {str(e)}")
+            self.metricas.exportar_csv(caminho)
+        except (ConnectionError, RuntimeError, OSError) as e:
+            QMessageBox.warning(self, "Erro", f"Não foi possível exportar:\n{e}")
+            return
+        QMessageBox.information(self, "Exportado", f"Tempos salvos em:\n{caminho}")
 
 class TelaDownload(QWidget):
-    def __init__(self, cfg):
+    def __init__(self, gerenciador, cache_analise, historico, transcodificador):
         super().__init__()
-        self.cfg = cfg
-        self.formatos_encontrados = [] 
+        self.gerenciador = gerenciador
+        self.transcodificador = transcodificador
+        self.cache_analise = cache_analise
+        self.historico = historico
+        self.worker_analise = None
+        self.formatos_encontrados = []
+        self.titulo_encontrado = None
+        self.itens_fila = {} # job_id -> (QListWidgetItem, ItemFilaWidget)
         layout = QVBoxLayout()
 
         # --- Seção YouTube ---
@@ -157,7 +240,7 @@ class TelaDownload(QWidget):
         self.radio_video = QRadioButton("Vídeo (MP4)")
         self.radio_audio = QRadioButton("Áudio (MP3)")
         self.radio_video.setChecked(True)
-        self.radio_video.toggled.connect(self.limpar_combo)
+        self.radio_video.toggled.connect(self.alternar_tipo)
         layout_radio.addWidget(self.radio_video)
         layout_radio.addWidget(self.radio_audio)
         
@@ -165,30 +248,89 @@ class TelaDownload(QWidget):
         self.combo_qualidade.addItem("Analise o link primeiro...")
         self.combo_qualidade.setEnabled(False)
 
-        # Barra de Progresso (NOVO)
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setValue(0)
-        self.progress_bar.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.progress_bar.setTextVisible(True)
+        # Conversão opcional depois do download (resolução, codec e volume dos quiosques)
+        self.combo_preset = QComboBox()
+        self.combo_preset.addItem("Sem conversão depois do download", None)
+        for chave, preset in PRESETS.items():
+            self.combo_preset.addItem(f"Converter para {preset['nome']}", chave)
 
-        self.youtube_btn = QPushButton("⬇️ 2. Baixar Selecionado")
+        self.youtube_btn = QPushButton("⬇️ 2. Adicionar à Fila")
         self.youtube_btn.setEnabled(False)
         self.youtube_btn.clicked.connect(self.iniciar_download)
 
+        # Lote: playlist ou canal inteiro com uma qualidade só
+        layout_lote = QHBoxLayout()
+        self.combo_lote = QComboBox()
+        for nome, seletor in FORMATOS_LOTE:
+            self.combo_lote.addItem(nome, seletor)
+        self.btn_lote = QPushButton("📚 Baixar Playlist/Canal (Lote)")
+        self.btn_lote.clicked.connect(self.baixar_lote)
+        layout_lote.addWidget(self.combo_lote)
+        layout_lote.addWidget(self.btn_lote)
+        self.expansor = None
+        self.lote_total = 0
+
         layout_yt.addWidget(lbl_url)
         layout_yt.addWidget(self.youtube_input)
         layout_yt.addWidget(self.btn_analisar)
         layout_yt.addSpacing(5)
         layout_yt.addWidget(frame_escolha)
         layout_yt.addWidget(self.combo_qualidade)
+        layout_yt.addWidget(self.combo_preset)
         layout_yt.addSpacing(10)
-        layout_yt.addWidget(QLabel("Progresso:"))
-        layout_yt.addWidget(self.progress_bar) # Adiciona barra
         layout_yt.addWidget(self.youtube_btn)
+        layout_yt.addLayout(layout_lote)
         
         group_yt.setLayout(layout_yt)
         layout.addWidget(group_yt)
 
+        # --- Seção Fila de Downloads ---
+        group_fila = QGroupBox("Fila de Downloads")
+        layout_fila = QVBoxLayout()
+
+        layout_simult = QHBoxLayout()
+        lbl_simult = QLabel("Downloads simultâneos:")
+        self.spin_simultaneos = QSpinBox()
+        self.spin_simultaneos.setRange(1, 10)
+        self.spin_simultaneos.setValue(self.gerenciador.max_simultaneos)
+        self.spin_simultaneos.valueChanged.connect(self.gerenciador.definir_max_simultaneos)
+        lbl_fragmentos = QLabel("Fragmentos por download:")
+        self.spin_fragmentos = QSpinBox()
+        self.spin_fragmentos.setRange(1, 16)
+        self.spin_fragmentos.setValue(self.gerenciador.fragmentos_simultaneos)
+        self.spin_fragmentos.setToolTip("Partes de vídeos DASH/HLS baixadas em paralelo")
+        self.spin_fragmentos.valueChanged.connect(self.gerenciador.definir_fragmentos_simultaneos)
+        layout_simult.addWidget(lbl_simult)
+        layout_simult.addWidget(self.spin_simultaneos)
+        layout_simult.addWidget(lbl_fragmentos)
+        layout_simult.addWidget(self.spin_fragmentos)
+        layout_simult.addStretch()
+
+        self.lista_fila = QListWidget()
+
+        layout_acoes = QHBoxLayout()
+        self.btn_pausar = QPushButton("⏯️ Pausar/Retomar")
+        self.btn_pausar.clicked.connect(self.pausar_retomar_selecionado)
+        self.btn_cancelar = QPushButton("✖️ Cancelar")
+        self.btn_cancelar.clicked.connect(self.cancelar_selecionado)
+        self.btn_repetir = QPushButton("🔁 Tentar Novamente")
+        self.btn_repetir.clicked.connect(self.repetir_selecionado)
+        self.btn_limpar = QPushButton("🧹 Limpar Finalizados")
+        self.btn_limpar.clicked.connect(self.gerenciador.limpar_finalizados)
+        self.btn_historico = QPushButton("📜 Histórico")
+        self.btn_historico.clicked.connect(self.abrir_historico)
+        layout_acoes.addWidget(self.btn_pausar)
+        layout_acoes.addWidget(self.btn_cancelar)
+        layout_acoes.addWidget(self.btn_repetir)
+        layout_acoes.addWidget(self.btn_limpar)
+        layout_acoes.addWidget(self.btn_historico)
+
+        layout_fila.addLayout(layout_simult)
+        layout_fila.addWidget(self.lista_fila)
+        layout_fila.addLayout(layout_acoes)
+        group_fila.setLayout(layout_fila)
+        layout.addWidget(group_fila)
+
         # Status
         self.status = QLabel("Aguardando ação...")
         self.status.setWordWrap(True)
@@ -196,104 +338,221 @@ class TelaDownload(QWidget):
         self.status.setStyleSheet("border: 1px dashed #000; padding: 5px; background: #fff;") 
         layout.addWidget(self.status)
         
-        layout.addStretch()
         self.setLayout(layout)
 
+        # Fila persistida: mostra os jobs que sobraram da última sessão
+        for job in self.gerenciador.jobs():
+            self.adicionar_item_fila(job["id"])
+
+        self.gerenciador.job_adicionado.connect(self.adicionar_item_fila)
+        self.gerenciador.job_atualizado.connect(self.atualizar_item_fila)
+        self.gerenciador.job_progresso.connect(self.atualizar_progresso_fila)
+        self.gerenciador.job_removido.connect(self.remover_item_fila)
+        self.gerenciador.job_concluido.connect(self.download_concluido)
+        self.gerenciador.job_erro.connect(self.download_erro)
+        self.transcodificador.tarefa_progresso.connect(self.atualizar_conversao_fila)
+        self.transcodificador.tarefa_concluida.connect(self.atualizar_conversao_fila)
+        self.transcodificador.tarefa_erro.connect(self.atualizar_conversao_fila)
+
     def limpar_combo(self):
         self.combo_qualidade.clear()
         self.combo_qualidade.addItem("Analise o link novamente...")
         self.combo_qualidade.setEnabled(False)
         self.youtube_btn.setEnabled(False)
 
+    def alternar_tipo(self):
+        # Trocar Vídeo/Áudio reaproveita a análise em cache em vez de analisar de novo
+        url = self.youtube_input.text().strip()
+        info = self.cache_analise.obter(normalizar_id(url)) if url else None
+        if info:
+            self.mostrar_analise(info)
+        else:
+            self.limpar_combo()
+
     def analisar_link(self):
         url = self.youtube_input.text().strip()
         if not url: return
 
+        chave = normalizar_id(url)
+        info = self.cache_analise.obter(chave)
+        if info:
+            self.mostrar_analise(info)
+            return
+
         self.status.setText("Analisando vídeo... (Aguarde)")
         self.btn_analisar.setEnabled(False)
         self.combo_qualidade.clear()
-        QApplication.processEvents()
+        self.youtube_btn.setEnabled(False)
 
-        try:
-            ydl_opts = {'quiet': True}
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                self.formatos_encontrados = info.get('formats', [])
-                titulo = info.get('title', 'Vídeo')
-                
-                if self.radio_audio.isChecked():
-                    self.status.setText(f"Encontrado: {titulo}. (Áudio)")
-                    self.combo_qualidade.addItem(f"Melhor Qualidade (MP3)", "best_audio")
-                else:
-                    self.status.setText(f"Encontrado: {titulo}. (Vídeo)")
-                    seen_res = set()
-                    formatos_video = sorted(
-                        [f for f in self.formatos_encontrados if f.get('height') and f.get('vcodec') != 'none'],
-                        key=lambda x: x.get('height', 0), reverse=True
-                    )
-
-                    for f in formatos_video:
-                        height = f.get('height')
-                        if height not in seen_res:
-                            self.combo_qualidade.addItem(f"{height}p ({f['ext']})", f['format_id'])
-                            seen_res.add(height)
-                
-                if self.combo_qualidade.count() > 0:
-                    self.combo_qualidade.setEnabled(True)
-                    self.youtube_btn.setEnabled(True)
-
-        except Exception as e:
-            self.status.setText(f"Erro ao analisar: {str(e)}")
-        finally:
-            self.btn_analisar.setEnabled(True)
+        # A extração roda fora da thread da interface para a janela não congelar
+        self.worker_analise = AnaliseWorker(url, chave)
+        self.worker_analise.concluido.connect(self.analise_concluida)
+        self.worker_analise.error.connect(self.analise_erro)
+        self.worker_analise.start()
+
+    def analise_concluida(self, chave, info):
+        self.cache_analise.guardar(chave, info)
+        self.btn_analisar.setEnabled(True)
+        # Ignora o resultado se o link foi trocado durante a análise
+        if normalizar_id(self.youtube_input.text()) == chave:
+            self.mostrar_analise(info)
+
+    def analise_erro(self, chave, erro_msg):
+        self.btn_analisar.setEnabled(True)
+        self.status.setText(f"Erro ao analisar: {erro_msg}")
+
+    def mostrar_analise(self, info):
+        self.combo_qualidade.clear()
+        self.formatos_encontrados = info.get('formats', [])
+        titulo = info.get('title', 'Vídeo')
+        self.titulo_encontrado = titulo
+
+        if info.get('_type') == 'playlist':
+            self.status.setText(f"Playlist/Canal: {titulo}. Use o botão de Lote para baixar tudo.")
+            self.limpar_combo()
+            return
+
+        # Tempo estimado pela velocidade medida nos últimos downloads
+        velocidade = self.gerenciador.velocidade_estimada()
+        if self.radio_audio.isChecked():
+            self.status.setText(f"Encontrado: {titulo}. (Áudio)")
+            self.combo_qualidade.addItem(texto_audio(info, velocidade), "best_audio")
+        else:
+            self.status.setText(f"Encontrado: {titulo}. (Vídeo)")
+            # Uma opção por resolução, já com o par vídeo+áudio que junta sem reconverter
+            for opcao in ranquear_formatos(info, velocidade):
+                self.combo_qualidade.addItem(opcao["texto"], opcao["seletor"])
+                if opcao["recomendado"]:
+                    self.combo_qualidade.setCurrentIndex(self.combo_qualidade.count() - 1)
+
+        if self.combo_qualidade.count() > 0:
+            self.combo_qualidade.setEnabled(True)
+            self.youtube_btn.setEnabled(True)
 
     def iniciar_download(self):
         url = self.youtube_input.text().strip()
         data_escolhida = self.combo_qualidade.currentData()
         is_audio = self.radio_audio.isChecked()
-        
-        # Reseta a interface
-        self.progress_bar.setValue(0)
-        self.youtube_btn.setEnabled(False)
-        self.btn_analisar.setEnabled(False)
-        self.status.setText("Iniciando download...")
+        titulo = self.titulo_encontrado or url
 
-        # Não precisamos mais passar ffmpeg_local, o Worker já pega o global
-        self.worker = DownloadWorker(url, is_audio, data_escolhida)
-        self.worker.progress.connect(self.atualizar_barra)
-        self.worker.status_msg.connect(self.atualizar_status)
-        self.worker.finished.connect(self.download_concluido)
-        self.worker.error.connect(self.download_erro)
-        self.worker.start()
+        # O gerenciador decide quando começar conforme as vagas do pool
+        self.gerenciador.adicionar(url, is_audio, data_escolhida, titulo, preset=self.combo_preset.currentData())
+        self.status.setText(f"Adicionado à fila: {titulo}")
 
-    def atualizar_barra(self, val):
-        self.progress_bar.setValue(val)
+    # --- Lote (Playlist/Canal) ---
+    def baixar_lote(self):
+        if self.expansor is not None:
+            self.expansor.parar()
+            return
 
-    def atualizar_status(self, msg):
-        self.status.setText(msg)
+        url = self.youtube_input.text().strip()
+        if not url: return
 
-    def download_concluido(self, msg):
+        self.lote_total = 0
+        self.lote_audio = self.radio_audio.isChecked()
+        self.lote_qualidade = "best_audio" if self.lote_audio else self.combo_lote.currentData()
+        self.lote_preset = self.combo_preset.currentData()
+        self.btn_lote.setText("⏹️ Parar de Adicionar")
+        self.status.setText("Lendo a playlist/canal... os vídeos entram na fila conforme chegam.")
+
+        self.expansor = ExpansorPlaylist(url)
+        self.expansor.entrada.connect(self.lote_entrada)
+        self.expansor.concluido.connect(self.lote_concluido)
+        self.expansor.error.connect(self.lote_erro)
+        self.expansor.start()
+
+    def lote_entrada(self, entrada):
+        self.gerenciador.adicionar(entrada["url"], self.lote_audio, self.lote_qualidade, entrada["titulo"],
+                                   preset=self.lote_preset)
+        self.lote_total += 1
+        self.status.setText(f"Lote: {self.lote_total} vídeo(s) adicionados à fila...")
+
+    def lote_concluido(self, total):
+        self.status.setText(f"Lote finalizado: {total} vídeo(s) adicionados à fila.")
+        self.encerrar_expansor()
+
+    def lote_erro(self, erro_msg):
+        self.status.setText(f"Erro ao ler a playlist: {erro_msg}")
+        self.encerrar_expansor()
+
+    def encerrar_expansor(self):
+        self.expansor.wait(2000)
+        self.expansor = None
+        self.btn_lote.setText("📚 Baixar Playlist/Canal (Lote)")
+
+    # --- Fila de Downloads ---
+    def job_selecionado(self):
+        item = self.lista_fila.currentItem()
+        if item is None:
+            QMessageBox.warning(self, "Aviso", "Selecione um download da fila.")
+            return None
+        return item.data(Qt.ItemDataRole.UserRole)
+
+    def pausar_retomar_selecionado(self):
+        job_id = self.job_selecionado()
+        if not job_id: return
+        if self.gerenciador.job(job_id)["estado"] == PAUSADO:
+            self.gerenciador.retomar(job_id)
+        else:
+            self.gerenciador.pausar(job_id)
+
+    def cancelar_selecionado(self):
+        job_id = self.job_selecionado()
+        if job_id:
+            self.gerenciador.cancelar(job_id)
+
+    def repetir_selecionado(self):
+        job_id = self.job_selecionado()
+        if not job_id: return
+        if self.gerenciador.job(job_id)["estado"] not in (ERRO, CANCELADO):
+            QMessageBox.warning(self, "Aviso", "Só é possível repetir downloads com erro ou cancelados.")
+            return
+        self.gerenciador.tentar_novamente(job_id)
+
+    def adicionar_item_fila(self, job_id):
+        job = self.gerenciador.job(job_id)
+        widget = ItemFilaWidget(job)
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, job_id)
+        item.setSizeHint(widget.sizeHint())
+        self.lista_fila.addItem(item)
+        self.lista_fila.setItemWidget(item, widget)
+        self.itens_fila[job_id] = (item, widget)
+
+    def atualizar_item_fila(self, job_id):
+        if job_id in self.itens_fila:
+            self.itens_fila[job_id][1].atualizar(self.gerenciador.job(job_id))
+
+    def atualizar_progresso_fila(self, job_id, progresso):
+        if job_id in self.itens_fila:
+            self.itens_fila[job_id][1].atualizar_progresso(progresso)
+
+    def atualizar_conversao_fila(self, tarefa_id, *_):
+        tarefa = self.transcodificador.tarefa(tarefa_id)
+        if tarefa and tarefa.get("job_id") in self.itens_fila:
+            self.itens_fila[tarefa["job_id"]][1].atualizar_conversao(tarefa)
+
+    def remover_item_fila(self, job_id):
+        item, _ = self.itens_fila.pop(job_id, (None, None))
+        if item is not None:
+            self.lista_fila.takeItem(self.lista_fila.row(item))
+
+    def abrir_historico(self):
+        DialogoHistorico(self.historico, self).exec()
+
+    def download_concluido(self, job_id, msg):
         self.status.setText(msg)
-        self.youtube_btn.setEnabled(True)
-        self.btn_analisar.setEnabled(True)
-        self.progress_bar.setValue(100)
-        if self.cfg:
-             self.cfg["downloads"].append({"tipo": "youtube", "data": QTime.currentTime().toString("HH:mm")})
 
-    def download_erro(self, erro_msg):
+    def download_erro(self, job_id, erro_msg):
         self.status.setText(f"Erro: {erro_msg}")
-        self.youtube_btn.setEnabled(True)
-        self.btn_analisar.setEnabled(True)
         if "ffmpeg" in erro_msg.lower() or "ffprobe" in erro_msg.lower():
              QMessageBox.critical(self, "Erro FFmpeg", "Certifique-se que ffmpeg.exe E ffprobe.exe estão na pasta.")
 
 class TelaAgendador(QWidget):
-    def __init__(self, cfg):
+    def __init__(self, exibidor):
         super().__init__()
-        self.cfg = cfg
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.verificar_eventos)
-        self.timer.start(1000)
+        # ExibidorEventos local ou ExibidorRemoto (quando o serviço está rodando)
+        self.exibidor = exibidor
 
         layout = QVBoxLayout()
 
@@ -305,16 +564,21 @@ class TelaAgendador(QWidget):
         self.radio_group = QButtonGroup()
         self.radio_arquivo = QRadioButton("Arquivo Local")
         self.radio_link = QRadioButton("Link (URL/YouTube)")
+        # Vários arquivos em sequência na mesma tela, sem fechar/abrir entre eles
+        self.radio_playlist = QRadioButton("Playlist (vários arquivos)")
         self.radio_arquivo.setChecked(True)
         self.radio_group.addButton(self.radio_arquivo)
         self.radio_group.addButton(self.radio_link)
+        self.radio_group.addButton(self.radio_playlist)
         
         layout_radios = QHBoxLayout()
         layout_radios.addWidget(self.radio_arquivo)
         layout_radios.addWidget(self.radio_link)
+        layout_radios.addWidget(self.radio_playlist)
         
         # Conecta mudança de estado
         self.radio_arquivo.toggled.connect(self.alternar_modo)
+        self.radio_playlist.toggled.connect(self.alternar_modo)
 
         # Inputs
         self.arquivo_btn = QPushButton("📂 Selecionar arquivo de Mídia")
@@ -328,7 +592,7 @@ class TelaAgendador(QWidget):
         self.lbl_conteudo.setStyleSheet("color: #555; font-style: italic;")
 
         self.hora_execucao = QTimeEdit()
-        self.hora_execucao.setDisplayFormat("HH:mm")
+        self.hora_execucao.setDisplayFormat("HH:mm:ss")
         self.hora_execucao.setTime(QTime.currentTime())
 
         # Seleção de Monitor (NOVO)
@@ -338,6 +602,9 @@ class TelaAgendador(QWidget):
         self.spin_monitor.setPrefix("Monitor ID: ")
         self.spin_monitor.setValue(0) # 0 é a tela principal
         self.spin_monitor.setToolTip("0 = Principal, 1 = Secundária, etc.")
+        # Mesma mídia em outras telas ao mesmo tempo (um decode só, quadro a quadro igual)
+        self.input_espelhos = QLineEdit()
+        self.input_espelhos.setPlaceholderText("Também nos monitores (ex: 1,2) - opcional")
 
         # Tempo e Conversor
         lbl_tempo = QLabel("Tempo que ficará aberto (em segundos):")
@@ -355,6 +622,40 @@ class TelaAgendador(QWidget):
         layout_conv.addWidget(lbl_min)
         layout_conv.addWidget(self.spin_minutos)
 
+        # Repetição (opcional): dias da semana, intervalo e período
+        layout_dias = QHBoxLayout()
+        self.check_dias = []
+        for nome in DIAS_SEMANA:
+            check = QCheckBox(nome)
+            check.setChecked(True)
+            self.check_dias.append(check)
+            layout_dias.addWidget(check)
+
+        layout_repetir = QHBoxLayout()
+        self.spin_intervalo = QSpinBox()
+        self.spin_intervalo.setRange(0, 720)
+        self.spin_intervalo.setSuffix(" min")
+        self.spin_intervalo.setSpecialValueText("Não repetir")
+        self.repetir_ate = QTimeEdit()
+        self.repetir_ate.setDisplayFormat("HH:mm")
+        self.repetir_ate.setTime(QTime(23, 59))
+        layout_repetir.addWidget(QLabel("Repetir a cada:"))
+        layout_repetir.addWidget(self.spin_intervalo)
+        layout_repetir.addWidget(QLabel("até"))
+        layout_repetir.addWidget(self.repetir_ate)
+
+        layout_periodo = QHBoxLayout()
+        self.check_periodo = QCheckBox("Só entre")
+        self.data_inicio = QDateEdit(QDate.currentDate())
+        self.data_fim = QDateEdit(QDate.currentDate().addDays(7))
+        for campo in (self.data_inicio, self.data_fim):
+            campo.setDisplayFormat("dd/MM/yyyy")
+            campo.setCalendarPopup(True)
+        layout_periodo.addWidget(self.check_periodo)
+        layout_periodo.addWidget(self.data_inicio)
+        layout_periodo.addWidget(QLabel("e"))
+        layout_periodo.addWidget(self.data_fim)
+
         self.add_event_btn = QPushButton("➕ Adicionar Evento")
         self.add_event_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
         self.add_event_btn.clicked.connect(self.adicionar_evento)
@@ -367,34 +668,65 @@ class TelaAgendador(QWidget):
         layout_config.addWidget(self.hora_execucao)
         layout_config.addWidget(lbl_monitor) # Add Monitor
         layout_config.addWidget(self.spin_monitor) # Add Monitor
+        layout_config.addWidget(self.input_espelhos)
         layout_config.addWidget(lbl_tempo)
         layout_config.addWidget(self.tempo_execucao)
         layout_config.addLayout(layout_conv)
+        layout_config.addWidget(QLabel("Dias da semana:"))
+        layout_config.addLayout(layout_dias)
+        layout_config.addLayout(layout_repetir)
+        layout_config.addLayout(layout_periodo)
         layout_config.addWidget(self.add_event_btn)
         group_config.setLayout(layout_config)
 
         # --- Lista de Eventos ---
         self.lista_label = QLabel("Eventos Agendados (Marque a caixa para excluir):")
-        self.lista_eventos = QListWidget()
+        self.modelo_eventos = ModeloEventos(self.exibidor)
+        self.filtro_eventos = FiltroEventos(self.modelo_eventos)
+        self.lista_eventos = QListView()
+        self.lista_eventos.setModel(self.filtro_eventos)
+        self.lista_eventos.setUniformItemSizes(True) # Agendas grandes: não mede linha por linha
+
+        layout_filtro = QHBoxLayout()
+        self.combo_ordem = QComboBox()
+        self.combo_ordem.addItem("Ordenar por horário", PAPEL_HORA)
+        self.combo_ordem.addItem("Ordenar por tela", PAPEL_MONITOR)
+        self.combo_ordem.addItem("Ordem de criação", PAPEL_ORDEM)
+        self.combo_ordem.currentIndexChanged.connect(
+            lambda: self.filtro_eventos.ordenar_por(self.combo_ordem.currentData()))
+        self.combo_tela = QComboBox()
+        self.combo_tela.addItem("Todas as telas", None)
+        for i in range(self.spin_monitor.maximum() + 1):
+            self.combo_tela.addItem(f"Tela {i}", i)
+        self.combo_tela.currentIndexChanged.connect(
+            lambda: self.filtro_eventos.filtrar_monitor(self.combo_tela.currentData()))
+        self.busca_eventos = QLineEdit()
+        self.busca_eventos.setPlaceholderText("Filtrar por nome ou link...")
+        self.busca_eventos.textChanged.connect(self.filtro_eventos.setFilterFixedString)
+        layout_filtro.addWidget(self.combo_ordem)
+        layout_filtro.addWidget(self.combo_tela)
+        layout_filtro.addWidget(self.busca_eventos)
         
         self.del_event_btn = QPushButton("❌ Excluir Eventos Marcados")
         self.del_event_btn.setStyleSheet("background-color: #ff4444; color: white; font-weight: bold;")
         self.del_event_btn.clicked.connect(self.excluir_eventos_marcados)
+        self.btn_metricas = QPushButton("📈 Tempos de Disparo")
+        self.btn_metricas.clicked.connect(lambda: DialogoMetricas(self.exibidor.metricas, self).exec())
 
         layout.addWidget(group_config)
         layout.addSpacing(10)
         layout.addWidget(self.lista_label)
+        layout.addLayout(layout_filtro)
         layout.addWidget(self.lista_eventos)
         layout.addWidget(self.del_event_btn)
+        layout.addWidget(self.btn_metricas)
         
         self.setLayout(layout)
 
         self.conteudo_selecionado = None 
-        self.eventos_disparados = []
-        self.recarregar_eventos()
 
     def alternar_modo(self):
-        is_file = self.radio_arquivo.isChecked()
+        is_file = self.radio_arquivo.isChecked() or self.radio_playlist.isChecked()
         self.arquivo_btn.setVisible(is_file)
         self.input_link.setVisible(not is_file)
         self.lbl_conteudo.setText("Insira o conteúdo acima.")
@@ -406,6 +738,13 @@ class TelaAgendador(QWidget):
             self.tempo_execucao.setValue(segundos)
 
     def selecionar_arquivo(self):
+        if self.radio_playlist.isChecked():
+            arquivos, _ = QFileDialog.getOpenFileNames(self, "Selecionar os arquivos da playlist (na ordem)")
+            if arquivos:
+                self.conteudo_selecionado = [str(Path(a)) for a in arquivos]
+                self.lbl_conteudo.setText(f"{len(arquivos)} arquivos: " + ", ".join(Path(a).name for a in arquivos))
+                self.lbl_conteudo.setToolTip("\n".join(self.conteudo_selecionado))
+            return
         arquivo, _ = QFileDialog.getOpenFileName(self, "Selecionar arquivo")
         if arquivo:
             path_arquivo = Path(arquivo)
@@ -414,10 +753,13 @@ class TelaAgendador(QWidget):
             self.lbl_conteudo.setToolTip(str(path_arquivo))
 
     def adicionar_evento(self):
-        hora = self.hora_execucao.time().toString("HH:mm")
+        hora = self.hora_execucao.time().toString("HH:mm:ss")
         tempo = self.tempo_execucao.value()
         monitor = self.spin_monitor.value() # Pega o ID do monitor
-        tipo = "arquivo" if self.radio_arquivo.isChecked() else "url"
+        if self.radio_playlist.isChecked():
+            tipo = "playlist"
+        else:
+            tipo = "arquivo" if self.radio_arquivo.isChecked() else "url"
         
         if tipo == "url":
             link = self.input_link.text().strip()
@@ -425,164 +767,82 @@ class TelaAgendador(QWidget):
                 QMessageBox.warning(self, "Aviso", "Cole um link válido.")
                 return
             self.conteudo_selecionado = link
-        elif tipo == "arquivo":
-            if not self.conteudo_selecionado:
-                QMessageBox.warning(self, "Aviso", "Selecione um arquivo.")
-                return
+        elif not self.conteudo_selecionado:
+            QMessageBox.warning(self, "Aviso", "Selecione um arquivo." if tipo == "arquivo" else "Selecione os arquivos.")
+            return
+
+        regra = self.montar_regra()
+        if regra is False:
+            return
+        monitores = self.ler_monitores(monitor, tipo)
+        if monitores is False:
+            return
+        if tipo == "playlist":
+            itens = self.conteudo_selecionado
+            self.exibidor.adicionar_evento(tipo, itens[0], hora, tempo, monitor, regra, itens, monitores)
+        else:
+            self.exibidor.adicionar_evento(tipo, self.conteudo_selecionado, hora, tempo, monitor, regra,
+                                           monitores=monitores)
 
-        # Adiciona ao JSON com a info do monitor
-        self.cfg["eventos"].append({
-            "tipo": tipo,
-            "arquivo": self.conteudo_selecionado, 
-            "hora": hora,
-            "duracao": tempo,
-            "monitor": monitor # Salva o monitor escolhido
-        })
-        
-        salvar_config(self.cfg) 
-        
-        self.recarregar_eventos()
         self.lbl_conteudo.setText("Evento adicionado!")
         self.conteudo_selecionado = None
         self.input_link.clear()
+        self.input_espelhos.clear()
         self.spin_minutos.setValue(0)
 
-    def recarregar_eventos(self):
-        self.lista_eventos.clear()
-        for ev in self.cfg.get("eventos", []):
-            conteudo = ev.get('arquivo', '?')
-            nome_exibicao = os.path.basename(conteudo) if ev.get('tipo') == 'arquivo' else conteudo
-            tipo_icon = "📄" if ev.get('tipo', 'arquivo') == 'arquivo' else "🌐"
-            monitor_id = ev.get('monitor', 0)
-            
-            texto = f"⏰ {ev['hora']} | 📺 Tela {monitor_id} | ⏳ {ev['duracao']}s | {tipo_icon} {nome_exibicao}"
-            
-            item = QListWidgetItem(texto)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(Qt.CheckState.Unchecked)
-            self.lista_eventos.addItem(item)
+    def ler_monitores(self, monitor, tipo):
+        texto = self.input_espelhos.text().strip()
+        if not texto:
+            return None
+        try:
+            extras = [int(p) for p in texto.replace(" ", "").split(",") if p]
+        except ValueError:
+            QMessageBox.warning(self, "Aviso", "Monitores extras: use números separados por vírgula, ex: 1,2.")
+            return False
+        if tipo == "url":
+            QMessageBox.warning(self, "Aviso", "Links abrem em uma tela só.")
+            return False
+        monitores = list(dict.fromkeys([monitor] + extras))
+        if len(monitores) < 2:
+            return None
+        if not self.exibidor.telas_sincronizadas():
+            resposta = QMessageBox.question(self, "Várias telas", f"{MSG_TELAS_SEM_SINCRONIA}\n\nAgendar mesmo assim?")
+            if resposta != QMessageBox.StandardButton.Yes:
+                return False
+        return monitores
+
+    def montar_regra(self):
+        # Sem nada marcado fora do padrão, o evento continua sendo "todo dia, uma vez"
+        regra = {}
+        dias = [i for i, check in enumerate(self.check_dias) if check.isChecked()]
+        if not dias:
+            QMessageBox.warning(self, "Aviso", "Marque pelo menos um dia da semana.")
+            return False
+        if dias != list(TODOS_OS_DIAS):
+            regra["dias_semana"] = dias
+        if self.spin_intervalo.value():
+            regra["intervalo_min"] = self.spin_intervalo.value()
+            regra["repetir_ate"] = self.repetir_ate.time().toString("HH:mm")
+        if self.check_periodo.isChecked():
+            if self.data_fim.date() < self.data_inicio.date():
+                QMessageBox.warning(self, "Aviso", "A data final vem antes da inicial.")
+                return False
+            regra["data_inicio"] = self.data_inicio.date().toString("yyyy-MM-dd")
+            regra["data_fim"] = self.data_fim.date().toString("yyyy-MM-dd")
+        return regra or None
 
     def excluir_eventos_marcados(self):
-        itens_para_remover = []
-        for i in range(self.lista_eventos.count()):
-            item = self.lista_eventos.item(i)
-            if item.checkState() == Qt.CheckState.Checked:
-                itens_para_remover.append(i)
+        # Marcações guardadas por id no modelo: valem mesmo para linhas escondidas pelo filtro
+        itens_para_remover = self.modelo_eventos.marcados()
         
         if not itens_para_remover:
             QMessageBox.warning(self, "Aviso", "Marque os itens para excluir.")
             return
 
-        for i in sorted(itens_para_remover, reverse=True):
-            del self.cfg["eventos"][i]
-            self.lista_eventos.takeItem(i)
+        self.exibidor.remover_eventos(itens_para_remover)
             
-        salvar_config(self.cfg) 
         QMessageBox.information(self, "Sucesso", "Eventos removidos.")
 
-    def verificar_eventos(self):
-        agora = QTime.currentTime().toString("HH:mm")
-        
-        if self.eventos_disparados and self.eventos_disparados[0]['hora'] != agora:
-            self.eventos_disparados.clear()
-
-        for ev in self.cfg.get("eventos", []):
-            chave_evento = f"{ev['hora']}_{ev['arquivo']}"
-            ja_disparado = any(f"{e['hora']}_{e['arquivo']}" == chave_evento for e in self.eventos_disparados)
-
-            if ev["hora"] == agora and not ja_disparado:
-                print(f"Disparando: {ev['arquivo']}")
-                
-                try:
-                    tipo = ev.get("tipo", "arquivo")
-                    conteudo = ev["arquivo"]
-                    monitor_idx = ev.get("monitor", 0)
-
-                    # --- Lógica de Posicionamento (Geometria da Tela) ---
-                    app = QApplication.instance()
-                    screens = app.screens()
-                    pos_x = 0
-                    pos_y = 0
-                    
-                    if monitor_idx < len(screens):
-                        rect = screens[monitor_idx].geometry()
-                        pos_x = rect.x()
-                        pos_y = rect.y()
-                    else:
-                        print(f"Aviso: Monitor {monitor_idx} não existe. Usando principal.")
-
-                    if tipo == "url":
-                        # Abre link no navegador com coordenadas
-                        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-                        edge_path = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
-                        browser = chrome_path if os.path.exists(chrome_path) else edge_path
-
-                        if os.path.exists(browser):
-                            # Modo Kiosk ou Fullscreen forçado na coordenada X,Y
-                            cmd = [
-                                browser,
-                                "--new-window",
-                                f"--window-position={pos_x},{pos_y}",
-                                "--start-fullscreen",
-                                conteudo
-                            ]
-                            subprocess.Popen(cmd)
-                        else:
-                            webbrowser.open(conteudo)
-
-                    else:
-                        # Abre arquivo local
-                        # Tenta usar VLC para garantir que abra na tela certa
-                        vlc_path = r"C:\Program Files\VideoLAN\VLC\vlc.exe"
-                        
-                        if os.path.exists(vlc_path):
-                            cmd = [
-                                vlc_path,
-                                conteudo,
-                                "--no-embedded-video",
-                                "--fullscreen",
-                                f"--video-x={pos_x}",
-                                f"--video-y={pos_y}"
-                            ]
-                            subprocess.Popen(cmd)
-                        else:
-                            # Se não tiver VLC, usa o padrão (não garante tela certa)
-                            if sys.platform == "win32":
-                                os.startfile(conteudo)
-                            else:
-                                subprocess.Popen(["xdg-open", conteudo])
-                    
-                    self.eventos_disparados.append(ev)
-                    QTimer.singleShot(ev["duracao"] * 1000, lambda c=conteudo: self.fechar_midia(c))
-
-                except Exception as e:
-                    print(f"Erro ao disparar evento: {e}")
-
-    def fechar_midia(self, conteudo):
-        print(f"Tentando fechar: {conteudo}")
-        
-        # Se for link, tenta fechar navegadores
-        if "http" in str(conteudo):
-            if sys.platform == "win32":
-                subprocess.run('taskkill /F /IM "chrome.exe"', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                subprocess.run('taskkill /F /IM "msedge.exe"', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return
-
-        path = Path(conteudo)
-        nome_arquivo = path.name
-        nome_sem_extensao = path.stem
-
-        if sys.platform == "win32":
-            try:
-                lista_players = ["Microsoft.Media.Player.exe", "Video.UI.exe", "wmplayer.exe", "vlc.exe", "mpc-hc64.exe", "PotPlayerMini64.exe", "mpv.exe"]
-                for player in lista_players:
-                    subprocess.run(f'taskkill /F /IM "{player}"', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-                cmd_title = f'taskkill /FI "WINDOWTITLE eq *{nome_sem_extensao}*" /F'
-                subprocess.run(cmd_title, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            except Exception:
-                pass
-
 class JanelaPrincipal(QWidget):
     def __init__(self):
         super().__init__()
@@ -590,11 +850,33 @@ class JanelaPrincipal(QWidget):
         self.setWindowIcon(QIcon("icons/ja_logo.png")) 
         self.setStyleSheet(STYLE)
 
-        self.cfg = carregar_config()
+        # Com o serviço rodando (python cli.py servico) a janela é só um cliente dele:
+        # a agenda e os downloads continuam lá mesmo depois que a janela fechar
+        self.nucleo = None
+        self.cliente = ClienteServico.conectar()
+        estado = None
+        if self.cliente is not None:
+            try:
+                estado = self.cliente.pedir("assinar")
+            except (ConnectionError, RuntimeError) as e:
+                print(f"Serviço não respondeu ({e}). Rodando sem ele.")
+                self.cliente.fechar()
+                self.cliente = None
+        if self.cliente is not None:
+            self.cache_analise = CacheAnalise()
+            self.historico = HistoricoRemoto(self.cliente)
+            self.gerenciador = GerenciadorRemoto(self.cliente, estado, self.cache_analise)
+            self.exibidor = ExibidorRemoto(self.cliente, estado)
+            self.transcodificador = TranscodificadorRemoto(self.cliente, estado)
+            # Serviço encerrado ou caído: a janela assume a agenda e os downloads
+            self.cliente.desconectado.connect(self.servico_caiu)
+            print("Conectado ao serviço JA TECH.")
+            PERFIL.marcar("Conectar ao serviço")
+        else:
+            self.usar_nucleo_local()
 
         self.stacked = QStackedWidget()
-        self.stacked.addWidget(TelaDownload(self.cfg))
-        self.stacked.addWidget(TelaAgendador(self.cfg))
+        self.montar_telas()
         # TelaMultiTela REMOVIDA DAQUI
 
         layout_principal = QHBoxLayout()
@@ -627,16 +909,73 @@ class JanelaPrincipal(QWidget):
         layout_principal.addWidget(self.stacked)
         self.setLayout(layout_principal)
 
+    def usar_nucleo_local(self):
+        cfg = carregar_config()
+        PERFIL.marcar("Carregar configuração")
+        self.nucleo = Nucleo(cfg)
+        self.cache_analise = self.nucleo.cache_analise
+        self.historico = self.nucleo.historico
+        self.gerenciador = self.nucleo.gerenciador
+        self.exibidor = self.nucleo.exibidor
+        self.transcodificador = self.nucleo.transcodificador
+        PERFIL.marcar("Núcleo (downloads, conversões, histórico e agenda)")
+
+    def montar_telas(self):
+        self.stacked.addWidget(TelaDownload(self.gerenciador, self.cache_analise, self.historico, self.transcodificador))
+        PERFIL.marcar("Construir TelaDownload")
+        self.stacked.addWidget(TelaAgendador(self.exibidor))
+        PERFIL.marcar("Construir TelaAgendador")
+
+    def servico_caiu(self):
+        # Sem isso os comandos da janela iriam para um socket fechado e se perderiam
+        if self.nucleo is not None:
+            return
+        self.cliente = None
+        atual = self.stacked.currentIndex()
+        for tela in [self.stacked.widget(i) for i in range(self.stacked.count())]:
+            # Só sai da pilha e fica escondida: pode ter uma análise rodando em thread
+            self.stacked.removeWidget(tela)
+            tela.hide()
+        self.usar_nucleo_local()
+        self.montar_telas()
+        self.stacked.setCurrentIndex(atual)
+        QMessageBox.warning(self, "Serviço encerrado",
+                            "A conexão com o serviço JA TECH caiu.\n"
+                            "A agenda e os downloads passam a rodar nesta janela; os downloads "
+                            "que estavam no serviço continuam de onde pararam.")
+
+    def encerrar(self):
+        if self.nucleo is not None:
+            self.nucleo.encerrar()
+        else:
+            self.cliente.fechar()
+
 class App(QApplication):
     def __init__(self, args):
+        # Exigido pelo QtWebEngine quando ele é importado depois do QApplication (carga sob demanda)
+        QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
         super().__init__(args)
+        PERFIL.marcar("Criar QApplication")
         self.win = JanelaPrincipal()
+        self.aboutToQuit.connect(self.win.encerrar)
         self.win.resize(900, 600)
         self.win.show()
+        PERFIL.marcar("Mostrar janela")
+
+        # Só depois que o loop rodar (janela pintada) começa a carregar o yt-dlp
+        QTimer.singleShot(0, self.janela_pronta)
+
+    def janela_pronta(self):
+        PERFIL.marcar("Primeiro ciclo do loop de eventos")
+        self.pre_carregador = PreCarregadorYtDlp()
+        self.pre_carregador.concluido.connect(self.yt_dlp_carregado)
+        self.pre_carregador.start()
+
+    def yt_dlp_carregado(self, duracao):
+        PERFIL.registrar("yt-dlp (segundo plano, após a janela)", duracao)
+        PERFIL.relatorio()
 
 if __name__ == "__main__":
-    print("JA TECH – Ferramenta Multimídia")
-    # versão do app
-    print(f"Versão: {APP_VERSION}")
+    print(f"JA TECH – Ferramenta Multimídia (Versão: {APP_VERSION})")
     app = App(sys.argv)
     sys.exit(app.exec())
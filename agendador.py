@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import math
+import time
+import uuid
+from datetime import date, datetime, timedelta, time as dtime
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+# --- Parâmetros do Agendador ---
+TOLERANCIA_ATRASO_PADRAO = 60 # Segundos de atraso aceitos (ex: PC acordando); depois disso o evento é perdido
+MAX_ESPERA_MS = 60000 # Só uma salvaguarda: o timer acorda ao menos uma vez por minuto para conferir o relógio
+LIMIAR_SALTO_RELOGIO = 2.0 # Diferença (s) entre relógio de parede e monotônico que indica salto
+ANTECEDENCIA_PREPARO_PADRAO = 10 # Segundos antes do horário em que a mídia/página começa a carregar
+
+def garantir_ids(eventos):
+    # Eventos antigos do JSON não tinham id; a agenda precisa de uma chave estável
+    alterou = False
+    for ev in eventos:
+        if not ev.get("id"):
+            ev["id"] = uuid.uuid4().hex
+            alterou = True
+    return alterou
+
+def ler_hora(texto):
+    # Aceita "HH:mm" (formato antigo) e "HH:mm:ss"
+    partes = [int(p) for p in texto.split(":")]
+    partes += [0] * (3 - len(partes))
+    return dtime(partes[0], partes[1], partes[2])
+
+# --- Regras de Repetição ---
+# ev["regra"] (opcional), tudo opcional dentro dela:
+#   "dias_semana": [0..6] (0 = segunda), "intervalo_min": repete a cada N minutos,
+#   "repetir_ate": "HH:mm[:ss]" (fim das repetições no dia), "data_inicio"/"data_fim": "AAAA-MM-DD".
+# Sem regra o evento toca todo dia no "hora", como sempre. A regra nunca é expandida
+# em uma lista: só a próxima ocorrência é calculada, então a fila tem uma entrada por evento.
+DIAS_SEMANA = ("seg", "ter", "qua", "qui", "sex", "sáb", "dom")
+TODOS_OS_DIAS = tuple(range(7))
+
+def ler_data(texto):
+    return date.fromisoformat(texto)
+
+def validar_regra(regra):
+    dias = regra.get("dias_semana", TODOS_OS_DIAS)
+    if not dias or any(d not in TODOS_OS_DIAS for d in dias):
+        raise ValueError("dias_semana precisa ter valores de 0 (segunda) a 6 (domingo)")
+    if int(regra.get("intervalo_min") or 0) < 0:
+        raise ValueError("intervalo_min não pode ser negativo")
+    if regra.get("repetir_ate"):
+        ler_hora(regra["repetir_ate"])
+    inicio = ler_data(regra["data_inicio"]) if regra.get("data_inicio") else None
+    fim = ler_data(regra["data_fim"]) if regra.get("data_fim") else None
+    if inicio and fim and fim < inicio:
+        raise ValueError("data_fim é anterior a data_inicio")
+
+def descrever_regra(regra):
+    dias = sorted(set(regra.get("dias_semana", TODOS_OS_DIAS)))
+    if dias == list(TODOS_OS_DIAS):
+        partes = ["todo dia"]
+    elif dias == [0, 1, 2, 3, 4]:
+        partes = ["seg–sex"]
+    else:
+        partes = [", ".join(DIAS_SEMANA[d] for d in dias)]
+    if regra.get("intervalo_min"):
+        ate = f" até {regra['repetir_ate'][:5]}" if regra.get("repetir_ate") else ""
+        partes.append(f"a cada {regra['intervalo_min']} min{ate}")
+    if regra.get("data_inicio") or regra.get("data_fim"):
+        partes.append(f"{regra.get('data_inicio') or '…'} a {regra.get('data_fim') or '…'}")
+    return " · ".join(partes)
+
+def proxima_ocorrencia(ev, depois_de):
+    # Próximo instante (timestamp) estritamente depois de 'depois_de'; None se a regra já acabou
+    base = datetime.fromtimestamp(depois_de)
+    hora = ler_hora(ev["hora"])
+    regra = ev.get("regra")
+    if not regra:
+        candidato = datetime.combine(base.date(), hora)
+        if candidato.timestamp() <= depois_de:
+            candidato = datetime.combine(base.date() + timedelta(days=1), hora)
+        return candidato.timestamp()
+
+    dias = set(regra.get("dias_semana", TODOS_OS_DIAS))
+    intervalo = timedelta(minutes=int(regra.get("intervalo_min") or 0))
+    if intervalo:
+        ate = ler_hora(regra["repetir_ate"]) if regra.get("repetir_ate") else dtime(23, 59, 59)
+    else:
+        ate = hora
+    inicio = ler_data(regra["data_inicio"]) if regra.get("data_inicio") else None
+    fim = ler_data(regra["data_fim"]) if regra.get("data_fim") else None
+
+    dia = base.date()
+    if inicio and dia < inicio:
+        dia = inicio
+    # Uma semana e um dia bastam para achar um dia permitido
+    for _ in range(8):
+        if fim and dia > fim:
+            return None
+        if dia.weekday() in dias:
+            candidato = _proxima_no_dia(dia, hora, ate, intervalo, base)
+            if candidato is not None:
+                return candidato.timestamp()
+        dia += timedelta(days=1)
+    return None
+
+def _proxima_no_dia(dia, hora, ate, intervalo, base):
+    primeira = datetime.combine(dia, hora)
+    if primeira > base:
+        return primeira
+    if not intervalo:
+        return None
+    # Pula direto para a repetição certa, sem percorrer as anteriores
+    candidato = primeira + ((base - primeira) // intervalo + 1) * intervalo
+    return candidato if candidato <= datetime.combine(dia, ate) else None
+
+class FilaEventos:
+    # Heap de (instante, seq, id). Remoções são preguiçosas: a entrada só vale se
+    # bater com _agendado[id], então adicionar/remover custa O(log N) sem reconstruir tudo.
+    # Com 'adiantamento', cada ocorrência entra no heap esse tanto de segundos antes do horário.
+    def __init__(self, tolerancia=TOLERANCIA_ATRASO_PADRAO, adiantamento=0):
+        self.tolerancia = tolerancia
+        self.adiantamento = adiantamento
+        self._heap = []
+        self._seq = itertools.count()
+        self._eventos = {} # id -> evento
+        self._agendado = {} # id -> instante válido no heap
+
+    def __len__(self):
+        return len(self._agendado)
+
+    def carregar(self, eventos, agora):
+        self._eventos = {ev["id"]: ev for ev in eventos}
+        self._agendado = {}
+        self._heap = []
+        for ev in eventos:
+            quando = self._proxima(ev, self._inicio_busca(ev, agora))
+            if quando is not None:
+                self._agendado[ev["id"]] = quando
+                self._heap.append((quando, next(self._seq), ev["id"]))
+        heapq.heapify(self._heap)
+
+    def adicionar(self, ev, agora):
+        # Um evento criado para "agora" (dentro da tolerância) ainda dispara
+        self._eventos[ev["id"]] = ev
+        self._agendar(ev["id"], self._proxima(ev, self._inicio_busca(ev, agora)))
+
+    def remover(self, ev_id):
+        self._eventos.pop(ev_id, None)
+        self._agendado.pop(ev_id, None)
+        # Se sobrar muito lixo no heap, reconstrói (amortizado O(1) por remoção)
+        if len(self._heap) > 2 * len(self._agendado) + 32:
+            self._heap = [(q, s, i) for q, s, i in self._heap if self._agendado.get(i) == q]
+            heapq.heapify(self._heap)
+
+    def proximo_instante(self):
+        self._descartar_obsoletos()
+        return self._heap[0][0] if self._heap else None
+
+    def retirar_vencidos(self, agora):
+        # Retorna [(evento, horário_do_evento, atraso)] e já reagenda a próxima ocorrência
+        vencidos = []
+        while self._heap and self._heap[0][0] <= agora:
+            quando, _, ev_id = heapq.heappop(self._heap)
+            if self._agendado.get(ev_id) != quando:
+                continue
+            ev = self._eventos[ev_id]
+            vencidos.append((ev, quando + self.adiantamento, agora - quando))
+            # Depois de um salto grande, não tenta "recuperar" todas as ocorrências perdidas
+            self._agendar(ev_id, self._proxima(ev, max(quando, agora - self.tolerancia)))
+        return vencidos
+
+    def _inicio_busca(self, ev, agora):
+        # A tolerância recupera só o que não disparou: uma ocorrência que já disparou antes de o
+        # app reiniciar (ultimo_disparo, gravado pelo exibidor) não volta a disparar
+        inicio = agora - self.tolerancia
+        ultimo = ev.get("ultimo_disparo")
+        if ultimo is not None:
+            inicio = max(inicio, ultimo - self.adiantamento)
+        return inicio
+
+    def _proxima(self, ev, depois_de):
+        quando = proxima_ocorrencia(ev, depois_de + self.adiantamento)
+        return None if quando is None else quando - self.adiantamento
+
+    def _agendar(self, ev_id, quando):
+        if quando is None:
+            self._agendado.pop(ev_id, None)
+            return
+        self._agendado[ev_id] = quando
+        heapq.heappush(self._heap, (quando, next(self._seq), ev_id))
+
+    def _descartar_obsoletos(self):
+        while self._heap and self._agendado.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+class AgendadorEventos(QObject):
+    disparar = pyqtSignal(object, float) # evento, instante programado
+    perdido = pyqtSignal(object, float)
+    preparar = pyqtSignal(object, float) # evento, horário em que vai disparar (emitido 'antecedencia' s antes)
+
+    def __init__(self, eventos, tolerancia=TOLERANCIA_ATRASO_PADRAO, relogio=time.time, relogio_monotonico=time.monotonic,
+                 antecedencia=0):
+        super().__init__()
+        self.relogio = relogio
+        self.relogio_monotonico = relogio_monotonico
+        self.fila = FilaEventos(tolerancia)
+        # Segunda fila, deslocada no tempo, para carregar a mídia antes do horário.
+        # A tolerância dela é a própria antecedência: preparar depois do início não serve mais.
+        self.fila_preparo = FilaEventos(antecedencia, adiantamento=antecedencia) if antecedencia > 0 else None
+
+        # Um único timer, sempre armado para o próximo evento da agenda
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.processar)
+        self._ref_parede = None
+        self._ref_monotonico = None
+
+        self.recarregar(eventos)
+
+    def _filas(self):
+        return [self.fila] if self.fila_preparo is None else [self.fila, self.fila_preparo]
+
+    def adicionar(self, ev):
+        agora = self.relogio()
+        for fila in self._filas():
+            fila.adicionar(ev, agora)
+        self._armar()
+
+    def remover(self, ev_id):
+        for fila in self._filas():
+            fila.remover(ev_id)
+        self._armar()
+
+    def recarregar(self, eventos):
+        agora = self.relogio()
+        for fila in self._filas():
+            fila.carregar(eventos, agora)
+        self._armar()
+
+    def processar(self):
+        agora = self.relogio()
+        saltou = False
+        if self._ref_parede is not None:
+            # Parede andou diferente do monotônico: suspensão, NTP ou ajuste manual
+            salto = (agora - self._ref_parede) - (self.relogio_monotonico() - self._ref_monotonico)
+            if abs(salto) > LIMIAR_SALTO_RELOGIO:
+                print(f"Aviso: relógio saltou {salto:+.1f}s (suspensão ou ajuste). Reavaliando agenda.")
+                saltou = True
+
+        if self.fila_preparo is not None:
+            for ev, quando, atraso in self.fila_preparo.retirar_vencidos(agora):
+                if atraso <= self.fila_preparo.tolerancia:
+                    self.preparar.emit(ev, quando)
+
+        for ev, quando, atraso in self.fila.retirar_vencidos(agora):
+            if atraso > self.fila.tolerancia:
+                print(f"Evento perdido ({atraso:.0f}s de atraso): {ev.get('arquivo')}")
+                self.perdido.emit(ev, quando)
+            else:
+                self.disparar.emit(ev, quando)
+
+        if saltou:
+            # As próximas ocorrências foram calculadas com o relógio antigo: recalcula a partir de agora
+            self.recarregar(list(self.fila._eventos.values()))
+        else:
+            self._armar()
+
+    def _armar(self):
+        self._ref_parede = self.relogio()
+        self._ref_monotonico = self.relogio_monotonico()
+        instantes = [q for q in (f.proximo_instante() for f in self._filas()) if q is not None]
+        proximo = min(instantes) if instantes else None
+        if proximo is None:
+            self.timer.stop()
+            return
+        espera_ms = math.ceil(max(0.0, proximo - self._ref_parede) * 1000)
+        self.timer.start(min(espera_ms, MAX_ESPERA_MS))
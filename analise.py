@@ -0,0 +1,179 @@
+import re
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# --- Cache de Análise ---
+# As URLs de mídia do YouTube expiram em ~6h, então o TTL fica bem abaixo disso
+CACHE_TTL_PADRAO = 30 * 60
+CACHE_MAX_ITENS = 64
+
+# --- Lote (Playlist/Canal) ---
+# Seletores por altura máxima: servem para qualquer vídeo da playlist, sem analisar um por um
+FORMATOS_LOTE = [
+    ("Melhor disponível", "bestvideo"),
+    ("Até 1080p", "bestvideo[height<=1080]"),
+    ("Até 720p", "bestvideo[height<=720]"),
+    ("Até 480p", "bestvideo[height<=480]"),
+    ("Até 360p", "bestvideo[height<=360]"),
+]
+MAX_PROFUNDIDADE_LOTE = 3 # Canal -> abas -> playlist
+
+YOUTUBE_ID_RE = re.compile(r'^[0-9A-Za-z_-]{11}$')
+YOUTUBE_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com", "www.youtube-nocookie.com")
+
+def normalizar_id(url):
+    # Links diferentes para o mesmo vídeo (youtu.be, shorts, &t=30...) viram a mesma chave
+    url = url.strip()
+    try:
+        partes = urlparse(url if "://" in url else f"https://{url}")
+    except ValueError:
+        return url
+    host = (partes.hostname or "").lower()
+    caminho = [p for p in partes.path.split("/") if p]
+
+    video_id = None
+    if host in ("youtu.be", "www.youtu.be") and caminho:
+        video_id = caminho[0]
+    elif host in YOUTUBE_HOSTS:
+        if caminho[:1] == ["watch"]:
+            video_id = parse_qs(partes.query).get("v", [None])[0]
+        elif len(caminho) >= 2 and caminho[0] in ("shorts", "embed", "live", "v"):
+            video_id = caminho[1]
+
+    if video_id and YOUTUBE_ID_RE.match(video_id):
+        return f"youtube:{video_id}"
+    # Outros sites: a própria URL sem fragmento serve de chave
+    return f"{host}{partes.path}?{partes.query}" if partes.query else f"{host}{partes.path}"
+
+class CacheAnalise:
+    def __init__(self, ttl=CACHE_TTL_PADRAO, max_itens=CACHE_MAX_ITENS):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens = OrderedDict() # chave -> (instante, info)
+
+    def obter(self, chave):
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        instante, info = item
+        if time.monotonic() - instante > self.ttl:
+            del self._itens[chave]
+            return None
+        # LRU: quem foi usado por último vai para o fim
+        self._itens.move_to_end(chave)
+        return info
+
+    def guardar(self, chave, info):
+        self._itens[chave] = (time.monotonic(), info)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        self._itens.pop(chave, None)
+
+    def limpar(self):
+        self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
+
+class PreCarregadorYtDlp(QThread):
+    # O yt-dlp leva centenas de ms para importar; carrega em segundo plano depois
+    # que a janela aparece, para a primeira análise não pagar esse custo
+    concluido = pyqtSignal(float)
+
+    def run(self):
+        inicio = time.perf_counter()
+        import yt_dlp
+        yt_dlp.YoutubeDL({'quiet': True}).close()
+        self.concluido.emit(time.perf_counter() - inicio)
+
+class AnaliseWorker(QThread):
+    concluido = pyqtSignal(str, object)
+    error = pyqtSignal(str, str)
+
+    def __init__(self, url, chave):
+        super().__init__()
+        self.url = url
+        self.chave = chave
+
+    def run(self):
+        try:
+            import yt_dlp
+            # Link de vídeo dentro de playlist analisa só o vídeo; playlist pura vem "rasa"
+            ydl_opts = {'quiet': True, 'noplaylist': True, 'extract_flat': 'in_playlist'}
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(self.url, download=False)
+            self.concluido.emit(self.chave, info)
+        except Exception as e:
+            self.error.emit(self.chave, str(e))
+
+class ExpansorPlaylist(QThread):
+    entrada = pyqtSignal(object)
+    concluido = pyqtSignal(int)
+    error = pyqtSignal(str)
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self._parar = False
+
+    def parar(self):
+        self._parar = True
+
+    def run(self):
+        total = 0
+        try:
+            import yt_dlp
+            # process=False devolve as entradas como gerador paginado: cada vídeo é
+            # entregue assim que a página dele chega, sem montar a lista inteira antes
+            ydl_opts = {'quiet': True, 'extract_flat': 'in_playlist'}
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                resultado = ydl.extract_info(self.url, download=False, process=False)
+                for entrada in self._percorrer(ydl, resultado, 0):
+                    if self._parar:
+                        break
+                    if not entrada["url"]:
+                        continue
+                    self.entrada.emit(entrada)
+                    total += 1
+            self.concluido.emit(total)
+        except Exception as e:
+            self.error.emit(str(e))
+
+    def _percorrer(self, ydl, resultado, profundidade):
+        tipo = resultado.get('_type', 'video')
+
+        if tipo == 'playlist':
+            for item in resultado.get('entries') or []:
+                if self._parar:
+                    return
+                if item:
+                    yield from self._percorrer(ydl, item, profundidade + 1)
+            return
+
+        ie_key = resultado.get('ie_key') or ''
+        if tipo in ('url', 'url_transparent') and ('Tab' in ie_key or 'Playlist' in ie_key or profundidade == 0):
+            # Aponta para outra lista (aba do canal, playlist aninhada) ou é um redirecionamento
+            if profundidade >= MAX_PROFUNDIDADE_LOTE:
+                return
+            destino = ydl.extract_info(resultado['url'], ie_key=ie_key or None, download=False, process=False)
+            if destino.get('_type', 'video') == 'video':
+                yield self._como_entrada(destino)
+            else:
+                yield from self._percorrer(ydl, destino, profundidade + 1)
+            return
+
+        yield self._como_entrada(resultado)
+
+    def _como_entrada(self, item):
+        url = item.get('webpage_url') or item.get('url')
+        if not url and item.get('formats'):
+            # Extrator genérico: a entrada é a própria mídia
+            url = item['formats'][-1].get('url')
+        if url and "://" not in url and item.get('ie_key') == 'Youtube':
+            url = f"https://www.youtube.com/watch?v={url}"
+        return {"url": url, "titulo": item.get('title') or url}
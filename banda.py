@@ -0,0 +1,80 @@
+import time
+from datetime import datetime
+from PyQt6.QtCore import QObject, QTimer
+from agendador import proxima_ocorrencia
+
+# --- Banda durante Eventos ao Vivo ---
+# Links da agenda sem cópia local são transmitidos pelo navegador na hora do evento e
+# disputam o link com os downloads. Enquanto um deles está no ar (e um pouco antes, para o
+# navegador encher o buffer), os downloads são limitados ou parados; quando a transmissão
+# acaba, a fila volta a baixar sozinha no intervalo livre.
+MODO_LIMITAR = "limitar"
+MODO_PAUSAR = "pausar"
+MODO_LIVRE = "livre"
+LIMITE_PADRAO_KBPS = 256 # Soma de todos os downloads enquanto um link está no ar
+ANTECEDENCIA_PADRAO = 60 # Segundos antes do início em que a banda já é liberada para o evento
+MAX_ESPERA_MS = 60 * 1000 # Reavalia pelo menos nesse intervalo (um link pode ter ganhado cópia local)
+
+class GovernadorBanda(QObject):
+    def __init__(self, cfg, gerenciador, historico, relogio=time.time):
+        super().__init__()
+        self.cfg = cfg
+        self.gerenciador = gerenciador
+        self.historico = historico
+        self.relogio = relogio
+
+        # Armado só para a próxima mudança (um link entrando ou saindo do ar), como a agenda
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.verificar)
+        self.verificar()
+
+    # --- Configuração ---
+    def modo(self):
+        return self.cfg.get("banda_modo", MODO_LIMITAR)
+
+    def limite_bytes(self):
+        return int(self.cfg.get("banda_limite_kbps", LIMITE_PADRAO_KBPS) * 1024)
+
+    def antecedencia(self):
+        return self.cfg.get("banda_antecedencia", ANTECEDENCIA_PADRAO)
+
+    # --- Ciclo ---
+    def verificar(self):
+        agora = self.relogio()
+        fim, proxima = self.transmissoes(agora)
+        if fim is None or self.modo() == MODO_LIVRE:
+            self.gerenciador.limitar_banda(None)
+        else:
+            ate = datetime.fromtimestamp(fim).strftime("%H:%M")
+            if self.modo() == MODO_PAUSAR:
+                self.gerenciador.limitar_banda(0, f"Aguardando o fim da transmissão ao vivo ({ate})...")
+            else:
+                self.gerenciador.limitar_banda(self.limite_bytes(), f"Banda limitada até {ate} (transmissão ao vivo)...")
+
+        espera = MAX_ESPERA_MS if proxima is None else min(MAX_ESPERA_MS, max(0, proxima - agora) * 1000)
+        self.timer.start(int(espera))
+
+    def transmissoes(self, agora):
+        # Fim da última transmissão no ar agora (None se nenhuma) e o próximo instante em que isso muda
+        antecedencia = self.antecedencia()
+        fim = None
+        proxima = None
+        for ev in self.cfg.get("eventos", []):
+            if ev.get("tipo") != "url":
+                continue # Arquivos e playlists tocam do disco
+            duracao = ev.get("duracao", 0)
+            # Começou há menos de 'duracao' segundos ou ainda vai começar
+            inicio = proxima_ocorrencia(ev, agora - duracao)
+            if inicio is None:
+                continue
+            no_ar = inicio - antecedencia <= agora
+            mudanca = inicio + duracao if no_ar else inicio - antecedencia
+            if not no_ar and proxima is not None and mudanca >= proxima:
+                continue # Não muda nada antes do que já foi achado: poupa a busca no histórico
+            if self.historico.procurar_local(ev["arquivo"]) is not None:
+                continue # Já baixado: o evento toca o arquivo, sem rede
+            if no_ar:
+                fim = max(fim or 0, inicio + duracao)
+            proxima = mudanca if proxima is None else min(proxima, mudanca)
+        return fim, proxima
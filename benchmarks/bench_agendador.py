@@ -0,0 +1,288 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest import mock
+
+# --- Benchmark / Soak da Agenda ---
+# Roda sem janela (plataforma offscreen do Qt), com relógio simulado e Popen falso:
+#   python benchmarks/bench_agendador.py
+#   python benchmarks/bench_agendador.py --tamanhos 10 1000 100000 --comparar resultados/anterior.json
+# Cenários:
+#   dia         um dia inteiro simulado: custo de CPU por tick do timer e disparos
+#               perdidos/duplicados/indevidos contra um gabarito calculado à parte
+#   saltos      o mesmo dia com o relógio pulando 5 min para frente (suspensão) e
+#               2 min para trás (NTP): nada pode disparar duas vezes
+#   tempo_real  QTimer de verdade, relógio de verdade: jitter do disparo em ms
+#   disparo     ExibidorEventos.disparar_evento/fechar_midia com o Popen falso
+# O resultado vai para benchmarks/resultados/*.json, para comparar entre versões.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from comum import LIMITE_REGRESSAO_PADRAO, ambiente, resumo_numeros, salvar_resultado, comparar_com_arquivo
+from PyQt6.QtCore import QCoreApplication, QTimer, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+from agendador import AgendadorEventos, TOLERANCIA_ATRASO_PADRAO, ANTECEDENCIA_PREPARO_PADRAO, ler_hora, ler_data
+
+TAMANHOS_PADRAO = [10, 100, 1000, 10000, 100000]
+DIA_SIMULADO = datetime(2026, 3, 2) # Uma segunda-feira
+MAX_EVENTOS_COM_REGRA = 500 # Regras de 5 em 5 min multiplicam os disparos; o resto é evento simples
+ATRASO_TIMER_MS = (0.0, 2.0) # Atraso simulado do QTimer a cada tick (uniforme)
+CONTAGENS_ERRO = ("duplicados", "faltando", "indevidos")
+
+# --- Agenda sintética ---
+def gerar_eventos(n, semente=42):
+    aleatorio = random.Random(semente)
+    horarios_cheios = ["08:00", "12:00", "12:30", "18:00", "23:59"] # Muitos eventos no mesmo minuto
+    com_regra = min(n // 10, MAX_EVENTOS_COM_REGRA)
+    eventos = []
+    for i in range(n):
+        sorteio = aleatorio.random()
+        if sorteio < 0.2:
+            hora = aleatorio.choice(horarios_cheios)
+        elif sorteio < 0.4:
+            hora = f"{aleatorio.randrange(24):02d}:{aleatorio.randrange(60):02d}" # Virada de minuto exata
+        else:
+            hora = f"{aleatorio.randrange(24):02d}:{aleatorio.randrange(60):02d}:{aleatorio.randrange(60):02d}"
+        ev = {"id": f"ev{i:06d}", "tipo": "arquivo", "arquivo": f"/midia/video_{i}.mp4",
+              "hora": hora, "duracao": aleatorio.randint(5, 120), "monitor": aleatorio.randrange(3)}
+        if i < com_regra:
+            regra = {"dias_semana": sorted(aleatorio.sample(range(7), aleatorio.randint(1, 7)))}
+            if aleatorio.random() < 0.5:
+                regra["intervalo_min"] = aleatorio.choice([5, 15, 30, 60])
+                regra["repetir_ate"] = f"{aleatorio.randint(ler_hora(hora).hour, 23):02d}:59"
+            if aleatorio.random() < 0.2:
+                regra["data_fim"] = (DIA_SIMULADO + timedelta(hours=aleatorio.randint(-24, 24))).date().isoformat()
+            ev["regra"] = regra
+        eventos.append(ev)
+    return eventos
+
+def ocorrencias(ev, inicio, fim):
+    # Gabarito independente do agendador: percorre os dias e as repetições um a um
+    hora = ler_hora(ev["hora"])
+    regra = ev.get("regra") or {}
+    dias = set(regra.get("dias_semana", range(7)))
+    passo = timedelta(minutes=regra.get("intervalo_min") or 0)
+    ate = ler_hora(regra["repetir_ate"]) if passo and regra.get("repetir_ate") else None
+    data_inicio = ler_data(regra["data_inicio"]) if regra.get("data_inicio") else None
+    data_fim = ler_data(regra["data_fim"]) if regra.get("data_fim") else None
+    dia = datetime.fromtimestamp(inicio).date() - timedelta(days=1)
+    ultimo = datetime.fromtimestamp(fim).date()
+    while dia <= ultimo:
+        permitido = dia.weekday() in dias and not (data_inicio and dia < data_inicio) and not (data_fim and dia > data_fim)
+        if permitido:
+            instante = datetime.combine(dia, hora)
+            limite = datetime.combine(dia, ate) if ate else (datetime.combine(dia, hora) if not passo else
+                                                                datetime.combine(dia, datetime.max.time()))
+            while instante <= limite:
+                if inicio < instante.timestamp() <= fim:
+                    yield instante.timestamp()
+                if not passo:
+                    break
+                instante += passo
+        dia += timedelta(days=1)
+
+# --- Relógio simulado ---
+class Relogio:
+    def __init__(self, inicio):
+        self.parede = inicio
+        self.monotonico = 1000.0
+
+    def avancar(self, segundos):
+        self.parede += segundos
+        self.monotonico += segundos
+
+    def saltar(self, segundos):
+        # Só a parede muda: é o que o agendador enxerga como suspensão/ajuste
+        self.parede += segundos
+
+# --- Cenários ---
+def simular_dia(eventos, saltos=(), semente=7):
+    # saltos = [(instante relativo ao início em s, segundos do salto)]
+    aleatorio = random.Random(semente)
+    inicio = DIA_SIMULADO.timestamp() - 0.5
+    fim = inicio + 24 * 3600
+    relogio = Relogio(inicio)
+
+    agendador = AgendadorEventos([], relogio=lambda: relogio.parede,
+                                 relogio_monotonico=lambda: relogio.monotonico, antecedencia=ANTECEDENCIA_PREPARO_PADRAO)
+    disparos = Counter()
+    preparos = Counter()
+    perdidos = []
+    agendador.disparar.connect(lambda ev, quando: disparos.update([(ev["id"], quando)]))
+    agendador.preparar.connect(lambda ev, quando: preparos.update([(ev["id"], quando)]))
+    agendador.perdido.connect(lambda ev, quando: perdidos.append((ev["id"], quando)))
+    t0 = time.perf_counter()
+    agendador.recarregar(eventos)
+    carga_ms = (time.perf_counter() - t0) * 1000
+
+    custo_tick = []
+    pendentes = sorted(saltos)
+    saltado = 0.0
+    puladas = [] # Janelas atravessadas por um salto para frente: o que caiu nelas pode ser descartado
+    while relogio.parede < fim + saltado:
+        if not agendador.timer.isActive():
+            break
+        espera = agendador.timer.interval() / 1000 + aleatorio.uniform(*ATRASO_TIMER_MS) / 1000
+        relogio.avancar(espera)
+        while pendentes and relogio.parede - inicio - saltado >= pendentes[0][0]:
+            segundos = pendentes.pop(0)[1]
+            if segundos > 0:
+                puladas.append((relogio.parede, relogio.parede + segundos - TOLERANCIA_ATRASO_PADRAO))
+            relogio.saltar(segundos)
+            saltado += segundos
+        t0 = time.process_time_ns()
+        agendador.processar()
+        custo_tick.append(time.process_time_ns() - t0)
+
+    fim_real = relogio.parede
+    esperados = set()
+    for ev in eventos:
+        for instante in ocorrencias(ev, inicio - TOLERANCIA_ATRASO_PADRAO, fim_real):
+            esperados.add((ev["id"], instante))
+    disparados = set(disparos)
+    perdidos_set = set(perdidos)
+    faltando = {(ev_id, t) for ev_id, t in esperados - disparados - perdidos_set
+                if not any(antes < t < depois for antes, depois in puladas)}
+    return {
+        "eventos": len(eventos),
+        "carga_ms": round(carga_ms, 2),
+        "ticks": len(custo_tick),
+        "cpu_por_tick_us": resumo_numeros(custo_tick, escala=1e-3),
+        "cpu_total_ms": round(sum(custo_tick) / 1e6, 2),
+        "disparos": sum(disparos.values()),
+        "esperados": len(esperados),
+        "duplicados": sum(c - 1 for c in disparos.values() if c > 1),
+        "faltando": len(faltando),
+        "indevidos": len(disparados - esperados),
+        "perdidos_por_atraso": len(perdidos_set),
+        "preparos_duplicados": sum(c - 1 for c in preparos.values() if c > 1),
+    }
+
+def medir_tempo_real(n, segundos):
+    # Relógio e QTimer de verdade: quanto depois do horário o sinal 'disparar' chega
+    agora = time.time()
+    eventos = []
+    for i in range(n):
+        quando = datetime.fromtimestamp(agora + 1 + segundos * i / n)
+        eventos.append({"id": f"rt{i}", "tipo": "arquivo", "arquivo": "x", "duracao": 1,
+                        "hora": quando.strftime("%H:%M:%S")})
+    agendador = AgendadorEventos(eventos)
+    atrasos = []
+    agendador.disparar.connect(lambda ev, quando: atrasos.append(time.time() - quando))
+    QTimer.singleShot(int((segundos + 2.5) * 1000), QCoreApplication.quit)
+    QCoreApplication.exec()
+    agendador.timer.stop()
+    return {"eventos": n, "disparados": len(atrasos), "jitter_ms": resumo_numeros(atrasos, escala=1000, casas=2)}
+
+class PopenFalso:
+    # Não abre nada: o processo "já saiu", então o RegistroProcessos nunca manda sinal a um pid real
+    proximo_pid = 10_000_000
+
+    def __init__(self, cmd, **kwargs):
+        PopenFalso.proximo_pid += 1
+        self.pid = PopenFalso.proximo_pid
+        self.args = cmd
+        self.returncode = 0
+
+    def poll(self):
+        return 0
+
+def medir_disparo(n):
+    from exibicao import ExibidorEventos
+    eventos = gerar_eventos(n, semente=3)
+    cfg = {"eventos": eventos, "metricas_ativas": False}
+    # A agenda sintética não pode ir parar no configuracoes.json de verdade
+    with mock.patch("subprocess.Popen", PopenFalso), mock.patch("os.startfile", create=True), \
+            mock.patch("exibicao.salvar_item"):
+        exibidor = ExibidorEventos(cfg, historico=None, interno=False)
+        exibidor.agendador.timer.stop()
+        agora = time.time()
+        custo_disparo, custo_fechar = [], []
+        for ev in eventos:
+            t0 = time.perf_counter_ns()
+            exibidor.disparar_evento(ev, agora)
+            custo_disparo.append(time.perf_counter_ns() - t0)
+        for ev in eventos:
+            t0 = time.perf_counter_ns()
+            exibidor.fechar_midia(ev)
+            custo_fechar.append(time.perf_counter_ns() - t0)
+    return {"eventos": n, "disparo_us": resumo_numeros(custo_disparo, escala=1e-3),
+            "fechamento_us": resumo_numeros(custo_fechar, escala=1e-3)}
+
+# --- Resultado ---
+def metricas_comparaveis(resultado):
+    # Números onde "maior = pior", achatados em chave -> valor
+    planos = {}
+    for cenario in ("dia", "saltos"):
+        for item in resultado.get(cenario, []):
+            base = f"{cenario}[{item['eventos']}]"
+            planos[f"{base}.cpu_por_tick_us.p99"] = item["cpu_por_tick_us"].get("p99")
+            planos[f"{base}.cpu_total_ms"] = item["cpu_total_ms"]
+            planos[f"{base}.carga_ms"] = item["carga_ms"]
+            for chave in CONTAGENS_ERRO:
+                planos[f"{base}.{chave}"] = item[chave]
+    if resultado.get("tempo_real"):
+        planos["tempo_real.jitter_ms.p99"] = resultado["tempo_real"]["jitter_ms"].get("p99")
+    for item in resultado.get("disparo", []):
+        planos[f"disparo[{item['eventos']}].disparo_us.p99"] = item["disparo_us"].get("p99")
+    return planos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark e soak da agenda (sem janela)")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--tempo-real", type=float, default=5, metavar="S",
+                        help="Duração do cenário com relógio real (0 desliga)")
+    parser.add_argument("--saida", help="Arquivo JSON do resultado (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", metavar="JSON", help="Resultado anterior para comparar")
+    parser.add_argument("--limite-regressao", type=float, default=LIMITE_REGRESSAO_PADRAO, metavar="%")
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1]) # QApplication: o disparo consulta as telas
+    resultado = ambiente("agendador")
+    resultado.update({
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "dia": [],
+        "saltos": [],
+        "disparo": [],
+    })
+
+    # O agendador avisa cada salto de relógio; no benchmark isso só polui a saída
+    with mock.patch("builtins.print"):
+        for n in args.tamanhos:
+            eventos = gerar_eventos(n)
+            resultado["dia"].append(simular_dia(eventos))
+            resultado["saltos"].append(simular_dia(eventos, saltos=[(12 * 3600, 300), (18 * 3600, -120)]))
+        for n in [t for t in args.tamanhos if t <= 10000]:
+            resultado["disparo"].append(medir_disparo(n))
+        if args.tempo_real > 0:
+            resultado["tempo_real"] = medir_tempo_real(200, args.tempo_real)
+
+    for cenario in ("dia", "saltos"):
+        for item in resultado[cenario]:
+            cpu = item["cpu_por_tick_us"]
+            print(f"{cenario:<7}{item['eventos']:>7} eventos | carga {item['carga_ms']:>8.1f} ms | "
+                  f"{item['ticks']:>6} ticks, p99 {cpu.get('p99', 0):>8.1f} µs | disparos {item['disparos']:>7} | "
+                  f"dup {item['duplicados']} falt {item['faltando']} indev {item['indevidos']} "
+                  f"perd {item['perdidos_por_atraso']}")
+    for item in resultado["disparo"]:
+        print(f"disparo{item['eventos']:>7} eventos | p50 {item['disparo_us']['p50']:.0f} µs, "
+              f"p99 {item['disparo_us']['p99']:.0f} µs | fechar p99 {item['fechamento_us']['p99']:.0f} µs")
+    if resultado.get("tempo_real"):
+        j = resultado["tempo_real"]["jitter_ms"]
+        print(f"tempo real: {resultado['tempo_real']['disparados']}/{resultado['tempo_real']['eventos']} disparos, "
+              f"jitter p50 {j.get('p50')} ms, p99 {j.get('p99')} ms, máx {j.get('max')} ms")
+
+    salvar_resultado(resultado, "agendador", args.saida)
+
+    erros = sum(i["duplicados"] + i["faltando"] + i["indevidos"] for c in ("dia", "saltos") for i in resultado[c])
+    if args.comparar and comparar_com_arquivo(resultado, args.comparar, metricas_comparaveis, args.limite_regressao,
+                                              CONTAGENS_ERRO):
+        return 1
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
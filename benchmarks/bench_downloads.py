@@ -0,0 +1,510 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+# --- Benchmark de Downloads ---
+# Sobe um servidor HTTP local com mídia sintética (progressivo, HLS e DASH), chega nela pelo
+# extrator genérico do yt-dlp e roda o DownloadWorker de verdade, como o app faz depois da análise:
+#   python benchmarks/bench_downloads.py
+#   python benchmarks/bench_downloads.py --concorrencia 1 4 --fragmentos 1 8 --limite-mbps 80 --queda 0.1
+# Mede por cenário (mídia x downloads simultâneos x fragmentos simultâneos):
+#   vazão de ponta a ponta, tempo até o primeiro byte de mídia, tempo depois do último byte
+#   (merge/MP3 do ffmpeg + hash do arquivo) e pico de memória do processo.
+# --limite-mbps limita o link inteiro (dividido entre as conexões), --latencia-ms atrasa cada
+# resposta e --queda derruba essa fração das respostas de mídia no meio, para ver as retomadas.
+# Sem ffmpeg, a mídia é só bytes aleatórios e os cenários de DASH (merge) e MP3 ficam de fora.
+from comum import LIMITE_REGRESSAO_PADRAO, ambiente, resumo_numeros, salvar_resultado, comparar_com_arquivo
+
+MIDIAS = ("progressivo", "hls", "dash", "mp3")
+PRECISA_FFMPEG = ("dash", "mp3")
+SEGMENTADAS = ("hls", "dash") # Onde os fragmentos simultâneos fazem diferença
+TAMANHO_PADRAO_MB = 16
+JOBS_PADRAO = 6
+TAXA_VIDEO_MBPS = 8 # Bitrate da mídia gerada pelo ffmpeg: a duração sai do tamanho pedido
+SEGMENTO_S = 2
+BLOCO_ENVIO = 64 * 1024
+AMOSTRA_MEMORIA_S = 0.05
+TEMPO_MAXIMO_PADRAO = 300 # Segundos por cenário antes de parar os workers
+CONTAGENS_ERRO = ("erros",)
+TIPOS_CONTEUDO = {
+    ".mp4": "video/mp4",
+    ".m4s": "video/iso.segment",
+    ".ts": "video/mp2t",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".mpd": "application/dash+xml",
+}
+
+# --- Mídia sintética ---
+def caminho_ffmpeg():
+    from transcodificacao import caminho_ffmpeg as procurar
+    return procurar()
+
+def versao_ffmpeg(ffmpeg):
+    if not ffmpeg:
+        return None
+    try:
+        saida = subprocess.run([ffmpeg, "-version"], capture_output=True, text=True, timeout=10)
+        return saida.stdout.splitlines()[0] if saida.stdout else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def gerar_midia(pasta, tamanho_mb, ffmpeg):
+    # pasta/progressivo/prog.mp4, pasta/hls/index.m3u8 + segmentos, pasta/dash/manifest.mpd + segmentos
+    for tipo in ("progressivo", "hls", "dash"):
+        (pasta / tipo).mkdir(parents=True, exist_ok=True)
+    if ffmpeg is None:
+        _gerar_aleatoria(pasta, tamanho_mb)
+        return
+    duracao = max(SEGMENTO_S, round(tamanho_mb * 8 / TAXA_VIDEO_MBPS))
+    prog = pasta / "progressivo" / "prog.mp4"
+    _rodar([ffmpeg, "-y", "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duracao}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={duracao}",
+            "-b:v", f"{TAXA_VIDEO_MBPS}M", "-maxrate", f"{TAXA_VIDEO_MBPS}M", "-bufsize", f"{TAXA_VIDEO_MBPS}M",
+            "-g", str(30 * SEGMENTO_S), "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart", str(prog)])
+    _rodar([ffmpeg, "-y", "-i", str(prog), "-c", "copy", "-f", "hls", "-hls_time", str(SEGMENTO_S),
+            "-hls_playlist_type", "vod", "-hls_segment_filename", str(pasta / "hls" / "seg_%03d.ts"),
+            str(pasta / "hls" / "index.m3u8")])
+    _rodar([ffmpeg, "-y", "-i", str(prog), "-map", "0:v", "-map", "0:a", "-c", "copy", "-f", "dash",
+            "-seg_duration", str(SEGMENTO_S), "-adaptation_sets", "id=0,streams=v id=1,streams=a",
+            str(pasta / "dash" / "manifest.mpd")])
+
+def _gerar_aleatoria(pasta, tamanho_mb):
+    aleatorio = random.Random(1)
+    (pasta / "progressivo" / "prog.mp4").write_bytes(aleatorio.randbytes(tamanho_mb * 1024 * 1024))
+    segmentos = max(1, tamanho_mb)
+    linhas = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{SEGMENTO_S}", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for n in range(segmentos):
+        (pasta / "hls" / f"seg_{n:03d}.ts").write_bytes(aleatorio.randbytes(1024 * 1024))
+        linhas += [f"#EXTINF:{SEGMENTO_S}.0,", f"seg_{n:03d}.ts"]
+    linhas.append("#EXT-X-ENDLIST")
+    (pasta / "hls" / "index.m3u8").write_text("\n".join(linhas) + "\n", encoding="utf-8")
+
+def _rodar(cmd):
+    saida = subprocess.run(cmd, capture_output=True, text=True)
+    if saida.returncode != 0:
+        raise RuntimeError(f"Falha ao gerar mídia: {' '.join(cmd[:3])}...\n{saida.stderr[-800:]}")
+
+# --- Servidor local ---
+class Link:
+    # Balde compartilhado: todas as conexões dividem a mesma banda, como num link de verdade
+    def __init__(self, mbps):
+        self.taxa = mbps * 1e6 / 8 if mbps else None
+        self._livre_em = 0.0
+        self._trava = threading.Lock()
+
+    def consumir(self, n):
+        if not self.taxa:
+            return
+        with self._trava:
+            agora = time.monotonic()
+            self._livre_em = max(self._livre_em, agora) + n / self.taxa
+            espera = self._livre_em - agora - n / self.taxa
+        if espera > 0:
+            time.sleep(espera)
+
+class ServidorMidia(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco, pasta, opcoes):
+        super().__init__(endereco, ManipuladorMidia)
+        self.pasta = Path(pasta)
+        self.opcoes = opcoes
+        self.link = Link(opcoes["limite_mbps"])
+        self.trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self.trava:
+            self.registros = []
+            self.aleatorio = random.Random(self.opcoes["semente"])
+
+    def resolver(self, caminho):
+        # /<tipo>/<job>/<nome>: cada job tem sua URL (e seu título), mas o arquivo é o mesmo
+        partes = caminho.strip("/").split("/")
+        if len(partes) != 3 or ".." in partes:
+            return None, None
+        tipo, job, nome = partes
+        if nome.endswith(".m3u8"):
+            nome = "index.m3u8"
+        elif nome.endswith(".mpd"):
+            nome = "manifest.mpd"
+        elif tipo == "progressivo":
+            nome = "prog.mp4"
+        arquivo = self.pasta / tipo / nome
+        return (arquivo, job) if arquivo.is_file() else (None, None)
+
+class ManipuladorMidia(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_HEAD(self):
+        self.responder(corpo=False)
+
+    def do_GET(self):
+        self.responder(corpo=True)
+
+    def _json(self, dados):
+        corpo = json.dumps(dados).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def responder(self, corpo):
+        servidor = self.server
+        caminho = urlparse(self.path).path
+        if caminho == "/_registros":
+            with servidor.trava:
+                return self._json(list(servidor.registros))
+        if caminho == "/_zerar":
+            servidor.zerar()
+            return self._json({"ok": True})
+
+        arquivo, job = servidor.resolver(caminho)
+        if arquivo is None:
+            self.send_error(404)
+            return
+        tamanho = arquivo.stat().st_size
+        inicio, fim = 0, tamanho - 1
+        intervalo = self.headers.get("Range", "")
+        if intervalo.startswith("bytes="):
+            a, _, b = intervalo[6:].split(",")[0].partition("-")
+            inicio = int(a) if a else max(0, tamanho - int(b))
+            fim = min(int(b), tamanho - 1) if a and b else fim
+            if inicio >= tamanho:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{tamanho}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        midia = arquivo.suffix not in (".m3u8", ".mpd")
+        registro = {"job": job, "arquivo": arquivo.name, "midia": midia, "inicio": time.time(), "range": inicio,
+                    "bytes": 0, "primeiro_byte": None, "fim": None, "queda": False}
+        corte = None
+        with servidor.trava:
+            if corpo:
+                servidor.registros.append(registro)
+            if corpo and midia and servidor.aleatorio.random() < servidor.opcoes["queda"]:
+                corte = inicio + int((fim - inicio + 1) * servidor.aleatorio.uniform(0.1, 0.9))
+
+        if servidor.opcoes["latencia_ms"]:
+            time.sleep(servidor.opcoes["latencia_ms"] / 1000)
+        self.send_response(206 if intervalo else 200)
+        self.send_header("Content-Type", TIPOS_CONTEUDO.get(arquivo.suffix, "application/octet-stream"))
+        self.send_header("Content-Length", str(fim - inicio + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if intervalo:
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{tamanho}")
+        self.end_headers()
+        if not corpo:
+            return
+
+        try:
+            with open(arquivo, "rb") as f:
+                f.seek(inicio)
+                posicao = inicio
+                while posicao <= fim:
+                    n = min(BLOCO_ENVIO, fim + 1 - posicao)
+                    if corte is not None:
+                        if posicao >= corte:
+                            # Queda: fecha o socket no meio da resposta, sem avisar
+                            registro["queda"] = True
+                            self.close_connection = True
+                            self.connection.shutdown(socket.SHUT_RDWR)
+                            return
+                        n = min(n, corte - posicao)
+                    servidor.link.consumir(n)
+                    self.wfile.write(f.read(n))
+                    if registro["primeiro_byte"] is None:
+                        registro["primeiro_byte"] = time.time()
+                    registro["bytes"] += n
+                    posicao += n
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True # O cliente desistiu (ex: cancelamento)
+        finally:
+            registro["fim"] = time.time()
+
+def servir(pasta, opcoes, fila):
+    servidor = ServidorMidia(("127.0.0.1", 0), pasta, opcoes)
+    fila.put(servidor.server_address[1])
+    servidor.serve_forever()
+
+def pedir(base, caminho):
+    with urlopen(base + caminho, timeout=30) as resposta:
+        return json.loads(resposta.read())
+
+# --- Memória ---
+class AmostradorMemoria(threading.Thread):
+    # RSS deste processo (o ffmpeg do merge/MP3 roda em processo à parte e não entra)
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.pico = None
+        self._parar = threading.Event()
+
+    @staticmethod
+    def rss():
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss
+        except ImportError:
+            pass
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def run(self):
+        while not self._parar.is_set():
+            valor = self.rss()
+            if valor is not None:
+                self.pico = max(self.pico or 0, valor)
+            self._parar.wait(AMOSTRA_MEMORIA_S)
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+        return self.pico
+
+# --- Cenários ---
+def url_do_job(base, midia, job):
+    if midia == "hls":
+        return f"{base}/hls/{job}/hls_{job}.m3u8"
+    if midia == "dash":
+        return f"{base}/dash/{job}/dash_{job}.mpd"
+    return f"{base}/progressivo/{job}/prog_{job}.mp4" # progressivo e mp3 (áudio extraído do mesmo arquivo)
+
+def analisar(url):
+    # O app baixa com a info da análise (cache_analise); aqui a análise fica fora da medição
+    import yt_dlp
+    from formatos import ranquear_formatos
+    with yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
+        info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    opcoes = ranquear_formatos(info)
+    recomendado = next((o["seletor"] for o in opcoes if o["recomendado"]), None)
+    # Sem altura/codec (mídia aleatória, HLS sem master) o combo também cai em "best"
+    return info, recomendado or "best/best"
+
+def rodar_cenario(base, cenario, indice, saida, tempo_maximo):
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    import downloads
+
+    midia = cenario["midia"]
+    jobs = [f"c{indice}j{n}" for n in range(cenario["jobs"])]
+    analises = {}
+    for job in jobs:
+        analises[job] = analisar(url_do_job(base, midia, job))
+    pedir(base, "/_zerar")
+
+    downloads.DOWNLOAD_DIR = saida
+    pendentes = list(jobs)
+    ativos = {}
+    resultado_jobs = {}
+
+    def iniciar_proximo():
+        while pendentes and len(ativos) < cenario["concorrencia"]:
+            job = pendentes.pop(0)
+            info, seletor = analises[job]
+            worker = downloads.DownloadWorker(url_do_job(base, midia, job), midia == "mp3", seletor, info,
+                                              cenario["fragmentos"])
+            worker.finished.connect(lambda msg, job=job: terminar(job, None))
+            worker.error.connect(lambda msg, job=job: terminar(job, msg))
+            worker.interrompido.connect(lambda job=job: terminar(job, "interrompido"))
+            worker.arquivo_concluido.connect(lambda dados, job=job: resultado_jobs[job].update(arquivo=dados["arquivo"]))
+            ativos[job] = worker
+            resultado_jobs[job] = {"inicio": time.time()}
+            worker.start()
+
+    def terminar(job, erro):
+        resultado_jobs[job].update(fim=time.time(), erro=erro)
+        worker = ativos.pop(job)
+        worker.wait()
+        worker.deleteLater()
+        iniciar_proximo()
+        if not ativos and not pendentes:
+            QCoreApplication.quit()
+
+    def estourou():
+        for worker in ativos.values():
+            worker.parar()
+
+    memoria = AmostradorMemoria()
+    base_rss = memoria.rss()
+    memoria.start()
+    t0 = time.time()
+    QTimer.singleShot(0, iniciar_proximo)
+    limite = QTimer()
+    limite.setSingleShot(True)
+    limite.timeout.connect(estourou)
+    limite.start(int(tempo_maximo * 1000))
+    QCoreApplication.exec()
+    limite.stop()
+    pico_rss = memoria.parar()
+    total_s = time.time() - t0
+
+    registros = pedir(base, "/_registros")
+    return resumir(cenario, jobs, resultado_jobs, registros, total_s, base_rss, pico_rss)
+
+def resumir(cenario, jobs, resultado_jobs, registros, total_s, base_rss, pico_rss):
+    ttfb, pos, erros = [], [], []
+    bytes_midia = 0
+    ultimo_byte = None
+    for job in jobs:
+        dados = resultado_jobs.get(job, {})
+        if dados.get("erro"):
+            erros.append(dados["erro"].strip().splitlines()[-1][:200])
+        meus = [r for r in registros if r["job"] == job and r["midia"]]
+        bytes_midia += sum(r["bytes"] for r in meus)
+        primeiros = [r["primeiro_byte"] for r in meus if r["primeiro_byte"]]
+        fins = [r["fim"] for r in meus if r["fim"]]
+        if primeiros and "inicio" in dados:
+            ttfb.append(min(primeiros) - dados["inicio"])
+        if fins:
+            ultimo = max(fins)
+            ultimo_byte = max(ultimo_byte or 0, ultimo)
+            if dados.get("fim") and not dados.get("erro"):
+                pos.append(dados["fim"] - ultimo)
+
+    inicios = [d["inicio"] for d in resultado_jobs.values() if "inicio" in d]
+    baixando_s = (ultimo_byte - min(inicios)) if ultimo_byte and inicios else None
+    midia_regs = [r for r in registros if r["midia"]]
+    return {
+        **cenario,
+        "total_s": round(total_s, 3),
+        "baixando_s": round(baixando_s, 3) if baixando_s else None,
+        "mb_recebidos": round(bytes_midia / 1e6, 2),
+        "vazao_mbps": round(bytes_midia * 8 / 1e6 / baixando_s, 1) if baixando_s else None,
+        "ttfb_ms": resumo_numeros(ttfb, escala=1000, casas=1),
+        "pos_download_ms": resumo_numeros(pos, escala=1000, casas=1),
+        "pico_rss_mb": round(pico_rss / 1e6, 1) if pico_rss else None,
+        "rss_acima_base_mb": round((pico_rss - base_rss) / 1e6, 1) if pico_rss and base_rss else None,
+        "requisicoes": len(midia_regs),
+        "quedas": sum(1 for r in midia_regs if r["queda"]),
+        "retomadas": sum(1 for r in midia_regs if r["range"] > 0),
+        "concluidos": sum(1 for d in resultado_jobs.values() if d.get("fim") and not d.get("erro")),
+        "erros": len(erros),
+        "mensagens_erro": erros[:3],
+    }
+
+def montar_cenarios(args, com_ffmpeg):
+    cenarios = []
+    for midia in args.midias:
+        if midia in PRECISA_FFMPEG and not com_ffmpeg:
+            print(f"Sem ffmpeg: cenário '{midia}' ignorado.")
+            continue
+        for concorrencia in args.concorrencia:
+            for fragmentos in (args.fragmentos if midia in SEGMENTADAS else [1]):
+                cenarios.append({"midia": midia, "concorrencia": concorrencia, "fragmentos": fragmentos,
+                                 "jobs": max(args.jobs, concorrencia)})
+    return cenarios
+
+def preparar_builde(pasta, ffmpeg):
+    # O worker exige ffmpeg.exe/ffprobe.exe na pasta builde; fora do Windows monta uma com links
+    import downloads
+    if (downloads.BUILDE_DIR / "ffmpeg.exe").exists() and (downloads.BUILDE_DIR / "ffprobe.exe").exists():
+        return
+    builde = pasta / "builde"
+    builde.mkdir()
+    ffprobe = shutil.which("ffprobe")
+    for nome, alvo in (("ffmpeg", ffmpeg), ("ffprobe", ffprobe)):
+        for arquivo in (nome, nome + ".exe"):
+            if alvo:
+                (builde / arquivo).symlink_to(alvo)
+            elif arquivo.endswith(".exe"):
+                # Só passa na checagem do worker; o yt-dlp não acha um 'ffmpeg' e segue sem pós-processar
+                (builde / arquivo).touch()
+    downloads.BUILDE_DIR = builde
+
+def metricas_comparaveis(resultado):
+    planos = {}
+    for item in resultado.get("cenarios", []):
+        base = f"{item['midia']}[c{item['concorrencia']},f{item['fragmentos']}]"
+        planos[f"{base}.total_ms"] = round(item["total_s"] * 1000, 1)
+        planos[f"{base}.ttfb_ms.p95"] = item["ttfb_ms"].get("p95")
+        planos[f"{base}.pos_download_ms.p95"] = item["pos_download_ms"].get("p95")
+        planos[f"{base}.pico_rss_mb"] = item["pico_rss_mb"]
+        planos[f"{base}.erros"] = item["erros"]
+    return planos
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do DownloadWorker contra um servidor local")
+    parser.add_argument("--midias", nargs="+", choices=MIDIAS, default=list(MIDIAS))
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 3, 6], help="Downloads simultâneos")
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=[1, 4], help="Fragmentos simultâneos (HLS/DASH)")
+    parser.add_argument("--jobs", type=int, default=JOBS_PADRAO, help="Downloads por cenário")
+    parser.add_argument("--tamanho-mb", type=int, default=TAMANHO_PADRAO_MB, help="Tamanho de cada mídia")
+    parser.add_argument("--limite-mbps", type=float, default=0, help="Banda do link simulado (0 = sem limite)")
+    parser.add_argument("--latencia-ms", type=float, default=0, help="Atraso antes de cada resposta")
+    parser.add_argument("--queda", type=float, default=0, metavar="FRAÇÃO",
+                        help="Fração das respostas de mídia cortadas no meio (0 a 1)")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--tempo-maximo", type=float, default=TEMPO_MAXIMO_PADRAO, metavar="S")
+    parser.add_argument("--saida", help="Arquivo JSON do resultado (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", metavar="JSON", help="Resultado anterior para comparar")
+    parser.add_argument("--limite-regressao", type=float, default=LIMITE_REGRESSAO_PADRAO, metavar="%")
+    args = parser.parse_args(argv)
+
+    import yt_dlp
+    from PyQt6.QtCore import QCoreApplication, QT_VERSION_STR
+    app = QCoreApplication(sys.argv[:1])
+    ffmpeg = caminho_ffmpeg()
+    opcoes = {"limite_mbps": args.limite_mbps, "latencia_ms": args.latencia_ms, "queda": args.queda,
+              "semente": args.semente}
+    resultado = ambiente("downloads")
+    resultado.update({"qt": QT_VERSION_STR, "yt_dlp": yt_dlp.version.__version__, "ffmpeg": versao_ffmpeg(ffmpeg),
+                      "tamanho_mb": args.tamanho_mb, "servidor": opcoes, "cenarios": []})
+
+    with tempfile.TemporaryDirectory(prefix="bench_downloads_") as temporaria:
+        temporaria = Path(temporaria)
+        print("Gerando mídia sintética..." + ("" if ffmpeg else " (sem ffmpeg: bytes aleatórios)"))
+        gerar_midia(temporaria / "midia", args.tamanho_mb, ffmpeg)
+        preparar_builde(temporaria, ffmpeg)
+
+        # Servidor em outro processo: as threads dele não disputam o GIL com os workers medidos
+        fila = multiprocessing.Queue()
+        servidor = multiprocessing.Process(target=servir, args=(temporaria / "midia", opcoes, fila), daemon=True)
+        servidor.start()
+        base = f"http://127.0.0.1:{fila.get(timeout=30)}"
+        try:
+            for indice, cenario in enumerate(montar_cenarios(args, ffmpeg is not None)):
+                saida = temporaria / f"saida_{indice}"
+                saida.mkdir()
+                item = rodar_cenario(base, cenario, indice, saida, args.tempo_maximo)
+                shutil.rmtree(saida, ignore_errors=True)
+                resultado["cenarios"].append(item)
+                vazao = "-" if item["vazao_mbps"] is None else f"{item['vazao_mbps']:.0f}"
+                print(f"{item['midia']:<12} {item['concorrencia']} simult. {item['fragmentos']} frag. | "
+                      f"{item['total_s']:>6.2f} s, {vazao:>5} Mbit/s | "
+                      f"ttfb p50 {item['ttfb_ms'].get('p50', '-')} ms | pós p50 {item['pos_download_ms'].get('p50', '-')} ms | "
+                      f"pico {item['pico_rss_mb']} MB | quedas {item['quedas']} retomadas {item['retomadas']} "
+                      f"erros {item['erros']}")
+                for mensagem in item["mensagens_erro"]:
+                    print(f"    {mensagem}")
+        finally:
+            servidor.terminate()
+            servidor.join()
+
+    salvar_resultado(resultado, "downloads", args.saida)
+    if args.comparar and comparar_com_arquivo(resultado, args.comparar, metricas_comparaveis, args.limite_regressao,
+                                              CONTAGENS_ERRO):
+        return 1
+    return 1 if any(item["erros"] for item in resultado["cenarios"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
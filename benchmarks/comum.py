@@ -0,0 +1,85 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# --- Partes comuns dos benchmarks ---
+# Cada benchmark grava um JSON em benchmarks/resultados/ e compara com um anterior
+# achatando os números onde "maior = pior" em chave -> valor.
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+LIMITE_REGRESSAO_PADRAO = 25 # % de piora que faz o --comparar falhar
+# Diferença absoluta abaixo da qual um tempo é ruído, qualquer que seja o %
+RUIDO_MS = 1.0
+RUIDO_US = 20.0
+
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+def versao_repositorio():
+    try:
+        saida = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=RAIZ, capture_output=True, text=True,
+                               timeout=10)
+        return saida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def ambiente(nome):
+    return {
+        "benchmark": nome,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "versao": versao_repositorio(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "nucleos": os.cpu_count(),
+    }
+
+def resumo_numeros(valores, escala=1.0, casas=3):
+    if not valores:
+        return {"n": 0}
+    ordenados = sorted(valores)
+    def p(q):
+        return round(ordenados[min(len(ordenados) - 1, int(q / 100 * len(ordenados)))] * escala, casas)
+    return {"n": len(ordenados), "media": round(sum(ordenados) / len(ordenados) * escala, casas),
+            "p50": p(50), "p95": p(95), "p99": p(99), "max": round(ordenados[-1] * escala, casas)}
+
+def salvar_resultado(resultado, nome, saida=None):
+    if saida:
+        saida = Path(saida)
+    else:
+        PASTA_RESULTADOS.mkdir(exist_ok=True)
+        saida = PASTA_RESULTADOS / f"{nome}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultado salvo em {saida}")
+    return saida
+
+def comparar(atual, anterior, limite, contagens_erro=()):
+    # atual/anterior: chave -> valor já achatados. Contagens de erro não têm margem.
+    piorou = []
+    print(f"\n{'métrica':<50}{'anterior':>12}{'atual':>12}{'variação':>10}")
+    for chave in sorted(atual.keys() & anterior.keys()):
+        va, vb = atual[chave], anterior[chave]
+        if va is None or vb is None:
+            continue
+        if vb:
+            variacao = (va - vb) * 100 / vb
+            texto = f"{variacao:+.1f}%"
+        else:
+            variacao = 0 if not va else float("inf")
+            texto = "novo" if va else "="
+        print(f"{chave:<50}{vb:>12}{va:>12}{texto:>10}")
+        erro = chave.rsplit(".", 1)[-1] in contagens_erro
+        ruido = RUIDO_US if "_us" in chave else RUIDO_MS
+        if (erro and va > vb) or (not erro and variacao > limite and va - vb > ruido):
+            piorou.append(chave)
+    return piorou
+
+def comparar_com_arquivo(resultado, caminho, achatar, limite, contagens_erro=()):
+    anterior = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    piorou = comparar(achatar(resultado), achatar(anterior), limite, contagens_erro)
+    if piorou:
+        print(f"\nRegressão em: {', '.join(piorou)}")
+    return piorou
@@ -0,0 +1,214 @@
+import argparse
+import sys
+from pathlib import Path
+from PyQt6.QtCore import QCoreApplication
+from agendador import DIAS_SEMANA
+from servico import ClienteServico
+from transcodificacao import PRESETS
+
+# --- Linha de Comando ---
+# Fala com o serviço sem janela (python cli.py servico). Exemplos:
+#   python cli.py agendar 14:30 60 "C:\Videos\abertura.mp4" --monitor 1
+#   python cli.py agendar 18:00:00 120 https://youtu.be/...
+#   python cli.py agendar 08:00 60 aviso.mp4 --dias 0-4 --a-cada 15 --ate 17:00
+#   python cli.py agendar 09:00 3600 intro.mp4 loop1.mp4 loop2.mp4   (playlist, sem corte entre os itens)
+#   python cli.py agendar 12:00 300 abertura.mp4 --monitores 0,1,2    (mesmo vídeo em 3 telas, um VLC por tela)
+#   python cli.py baixar https://youtu.be/... --audio
+#   python cli.py baixar https://youtu.be/... --preset h264_720p
+#   python cli.py converter "C:\Videos\bruto.mov" h264_1080p
+#   python cli.py metricas --csv tempos.csv
+#   python cli.py eventos / downloads / pausar <id> / encerrar
+
+def _procurar_id(itens, prefixo):
+    # Aceita o começo do id, como o git faz com hashes
+    encontrados = [i["id"] for i in itens if i["id"].startswith(prefixo)]
+    if len(encontrados) != 1:
+        raise SystemExit(f"Id '{prefixo}' {'não encontrado' if not encontrados else 'ambíguo'}.")
+    return encontrados[0]
+
+def ler_dias(texto):
+    # "0-4", "0,2,4" ou "seg,qua,sex"
+    dias = set()
+    for parte in texto.split(","):
+        parte = parte.strip().lower()
+        if parte in DIAS_SEMANA:
+            dias.add(DIAS_SEMANA.index(parte))
+        elif "-" in parte:
+            inicio, fim = (int(p) for p in parte.split("-"))
+            dias.update(range(inicio, fim + 1))
+        else:
+            dias.add(int(parte))
+    return sorted(dias)
+
+def montar_regra(args):
+    regra = {}
+    if args.dias:
+        regra["dias_semana"] = ler_dias(args.dias)
+    if args.a_cada:
+        regra["intervalo_min"] = args.a_cada
+        if args.ate:
+            regra["repetir_ate"] = args.ate
+    if args.de:
+        regra["data_inicio"] = args.de
+    if args.ate_data:
+        regra["data_fim"] = args.ate_data
+    return regra or None
+
+def listar_eventos(cliente, args):
+    for ev in cliente.pedir("eventos"):
+        extra = f" (+{len(ev['itens']) - 1})" if ev.get("tipo") == "playlist" else ""
+        telas = "+".join(str(m) for m in ev.get("monitores") or [ev.get("monitor", 0)])
+        print(f"{ev['id'][:8]}  {ev['hora']:>8}  tela {telas}  {ev['duracao']:>5}s  {ev.get('tipo', 'arquivo'):<8}  {ev['arquivo']}{extra}")
+
+def _arquivo_local(alvo):
+    caminho = Path(alvo).resolve()
+    if not caminho.exists():
+        raise SystemExit(f"Arquivo não encontrado: {caminho}")
+    return str(caminho)
+
+def agendar(cliente, args):
+    itens = None
+    if len(args.alvo) > 1:
+        # Vários arquivos: uma playlist só, tocada em sequência na mesma tela
+        tipo = "playlist"
+        itens = [_arquivo_local(a) for a in args.alvo]
+        alvo = itens[0]
+    elif "://" in args.alvo[0]:
+        tipo = "url"
+        alvo = args.alvo[0]
+    else:
+        tipo = "arquivo"
+        alvo = _arquivo_local(args.alvo[0])
+    monitores = [int(m) for m in args.monitores.split(",")] if args.monitores else None
+    monitor = monitores[0] if monitores else args.monitor
+    ev = cliente.pedir("adicionar_evento", tipo=tipo, arquivo=alvo, hora=args.hora, duracao=args.duracao,
+                       monitor=monitor, regra=montar_regra(args), itens=itens, monitores=monitores)
+    print(f"Evento {ev['id'][:8]} agendado para {ev['hora']}.")
+    if ev.get("monitores"):
+        print("Aviso: o serviço abre um VLC por tela, e eles saem de sincronia com o tempo.")
+
+def remover_evento(cliente, args):
+    ev_id = _procurar_id(cliente.pedir("eventos"), args.id)
+    cliente.pedir("remover_eventos", ids=[ev_id])
+    print(f"Evento {ev_id[:8]} removido.")
+
+def baixar(cliente, args):
+    job_id = cliente.pedir("baixar", url=args.url, is_audio=args.audio, quality_id=args.qualidade, preset=args.preset)
+    print(f"Download {job_id[:8]} adicionado à fila.")
+
+def listar_downloads(cliente, args):
+    for job in cliente.pedir("downloads"):
+        print(f"{job['id'][:8]}  {job['estado']:<10} {job['progresso']:>3}%  {job['titulo']}")
+
+def converter(cliente, args):
+    caminho = Path(args.arquivo).resolve()
+    if not caminho.exists():
+        raise SystemExit(f"Arquivo não encontrado: {caminho}")
+    tarefa_id = cliente.pedir("converter", arquivo=str(caminho), preset=args.preset)
+    print(f"Conversão {tarefa_id[:8]} adicionada ({PRESETS[args.preset]['nome']}).")
+
+def listar_conversoes(cliente, args):
+    for tarefa in cliente.pedir("conversoes"):
+        print(f"{tarefa['id'][:8]}  {tarefa['estado']:<11} {tarefa['progresso']:>3}%  {tarefa['preset']:<17}  {tarefa['arquivo']}")
+
+def mostrar_metricas(cliente, args):
+    if args.csv:
+        caminho = Path(args.csv).resolve()
+        texto = cliente.pedir("exportar_metricas")
+        with open(caminho, "w", newline="", encoding="utf-8") as saida:
+            saida.write(texto)
+        print(f"Tempos exportados para {caminho}.")
+        return
+    r = cliente.pedir("metricas", n=0)["resumo"]
+    dentro = "-" if r["dentro_sla"] is None else f"{r['dentro_sla']}%"
+    print(f"Disparos: {r['disparos']}  Perdidos: {r['perdidos']}  Na tela em até {r['sla_ms']} ms: {dentro}")
+    print(f"{'':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}{'n':>7}")
+    for campo, nome in (("atraso_despacho_ms", "despacho"), ("atraso_spawn_ms", "abertura"),
+                        ("atraso_quadro_ms", "primeiro quadro"), ("fechamento_ms", "fechamento")):
+        c = r[campo]
+        valores = ["-" if c[p] is None else f"{c[p]:.0f}" for p in ("p50", "p95", "p99", "max")]
+        print(f"{nome:<18}" + "".join(f"{v:>9}" for v in valores) + f"{c['n']:>7}")
+
+def acao_download(comando):
+    def executar(cliente, args):
+        job_id = _procurar_id(cliente.pedir("downloads"), args.id)
+        cliente.pedir(comando, job_id=job_id)
+    return executar
+
+def encerrar(cliente, args):
+    cliente.pedir("encerrar")
+    print("Serviço encerrado.")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="JA TECH pela linha de comando")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("servico", help="Roda a agenda e os downloads sem janela")
+    sub.add_parser("eventos", help="Lista os eventos agendados").set_defaults(funcao=listar_eventos)
+
+    p = sub.add_parser("agendar", help="Agenda um arquivo ou link")
+    p.add_argument("hora", help="HH:mm ou HH:mm:ss")
+    p.add_argument("duracao", type=int, help="Segundos na tela")
+    p.add_argument("alvo", nargs="+", help="Caminho do arquivo ou URL (vários arquivos = playlist)")
+    p.add_argument("--monitor", type=int, default=0)
+    p.add_argument("--monitores", metavar="0,1,2", help="Várias telas ao mesmo tempo (arquivos; um VLC por tela, sem sincronia)")
+    p.add_argument("--dias", help="Dias da semana: 0-4, 0,2,4 ou seg,qua,sex (0 = segunda)")
+    p.add_argument("--a-cada", type=int, default=0, metavar="MIN", help="Repete a cada N minutos")
+    p.add_argument("--ate", metavar="HH:mm", help="Última repetição do dia (com --a-cada)")
+    p.add_argument("--de", metavar="AAAA-MM-DD", help="Primeiro dia")
+    p.add_argument("--ate-data", metavar="AAAA-MM-DD", help="Último dia")
+    p.set_defaults(funcao=agendar)
+
+    p = sub.add_parser("remover-evento", help="Remove um evento pelo id")
+    p.add_argument("id")
+    p.set_defaults(funcao=remover_evento)
+
+    p = sub.add_parser("baixar", help="Coloca um link na fila de downloads")
+    p.add_argument("url")
+    p.add_argument("--audio", action="store_true", help="Só o áudio, em MP3")
+    p.add_argument("--qualidade", default=None, help="Seletor de formato do yt-dlp (padrão: melhor vídeo)")
+    p.add_argument("--preset", choices=list(PRESETS), help="Converte o arquivo depois do download")
+    p.set_defaults(funcao=baixar)
+
+    p = sub.add_parser("converter", help="Converte um arquivo local com um preset")
+    p.add_argument("arquivo")
+    p.add_argument("preset", choices=list(PRESETS))
+    p.set_defaults(funcao=converter)
+    sub.add_parser("conversoes", help="Lista as conversões").set_defaults(funcao=listar_conversoes)
+
+    sub.add_parser("downloads", help="Lista a fila de downloads").set_defaults(funcao=listar_downloads)
+    for comando, ajuda in (("pausar", "Pausa um download"), ("retomar", "Retoma um download"),
+                           ("cancelar", "Cancela um download")):
+        p = sub.add_parser(comando, help=ajuda)
+        p.add_argument("id")
+        p.set_defaults(funcao=acao_download(comando))
+
+    p = sub.add_parser("metricas", help="Atrasos dos disparos da agenda (ms)")
+    p.add_argument("--csv", metavar="ARQUIVO", help="Exporta todos os disparos registrados")
+    p.set_defaults(funcao=mostrar_metricas)
+
+    sub.add_parser("encerrar", help="Para o serviço").set_defaults(funcao=encerrar)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.comando == "servico":
+        from servico import main as rodar_servico
+        return rodar_servico()
+
+    app = QCoreApplication(sys.argv[:1])
+    cliente = ClienteServico.conectar()
+    if cliente is None:
+        print("O serviço não está rodando. Inicie com: python cli.py servico")
+        return 1
+    try:
+        args.funcao(cliente, args)
+    except (RuntimeError, ConnectionError) as e:
+        print(f"Erro: {e}")
+        return 1
+    finally:
+        cliente.fechar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
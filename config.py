@@ -0,0 +1,312 @@
+import sys
+import os
+import json
+import shutil
+import time
+import uuid
+from pathlib import Path
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+# --- Configurações Globais ---
+ROOT_DIR = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
+# O JSON fica sempre na raiz do projeto, independente da pasta de onde o app foi aberto
+DATA_FILE = ROOT_DIR / "configuracoes.json"
+DB_FILE = ROOT_DIR / "configuracoes.db"
+# Define onde está a pasta build
+BUILDE_DIR = ROOT_DIR / "builde"
+# Garante que a pasta downloads fique na raiz do projeto
+DOWNLOAD_DIR = ROOT_DIR / "downloads"
+DOWNLOAD_DIR.mkdir(exist_ok=True) # Cria a pasta se não existir
+# Perfis separados do navegador, um por evento, para cada janela ser um processo nosso
+PERFIS_NAVEGADOR_DIR = ROOT_DIR / "perfis_navegador"
+# Log de tempos dos disparos da agenda (metricas.py)
+METRICAS_DIR = ROOT_DIR / "metricas"
+
+# --- Armazenamento ---
+# "json" (padrão) ou "sqlite". No SQLite cada item é gravado sozinho. No JSON cada alteração
+# vai para um diário (uma linha por item) e o arquivo inteiro só é regravado quando o diário
+# passa do tamanho dele ou o app fecha: nos dois, salvar um item custa o mesmo com 10 ou 10.000 eventos.
+BACKEND_ARMAZENAMENTO = os.environ.get("JA_ARMAZENAMENTO", "json").lower()
+DIARIO_MINIMO_BYTES = 64 * 1024 # Abaixo disso o diário nunca força a regravação do JSON
+ATRASO_GRAVACAO_MS = 500 # Junta várias alterações seguidas em uma única gravação
+ATRASO_MAXIMO_GRAVACAO_MS = 3000 # Mesmo com alterações contínuas, grava pelo menos nesse intervalo
+ESPERA_NOVA_TENTATIVA_MS = 5000 # Gravação falhou (disco cheio, arquivo travado, SQLite ocupado)
+# Listas cujos itens têm "id" e podem ser gravados um a um
+COLECOES = ("eventos", "fila_downloads", "historico_downloads")
+
+def config_padrao():
+    return {"eventos": [], "downloads": []}
+
+class ArmazenamentoJSON:
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.backup = self.caminho.with_name(self.caminho.name + ".bak")
+        # Alterações feitas depois da última gravação completa, uma por linha
+        self.diario = self.caminho.with_name(self.caminho.name + ".diario")
+        self._tamanho_base = 0
+        self._tamanho_diario = 0
+
+    def carregar(self):
+        cfg = self._carregar_base()
+        self._reaplicar_diario(cfg)
+        return cfg
+
+    def _carregar_base(self):
+        origem = self.caminho
+        # Versões antigas salvavam o JSON na pasta de onde o app era aberto
+        legado = Path(self.caminho.name)
+        if not origem.exists() and legado.exists():
+            origem = legado
+
+        for arquivo in (origem, self.backup):
+            if not arquivo.exists():
+                continue
+            try:
+                with open(arquivo, "r", encoding="utf-8") as f:
+                    cfg = json.load(f)
+                self._tamanho_base = arquivo.stat().st_size
+                return cfg
+            except Exception as e:
+                print(f"Erro ao carregar JSON ({arquivo.name}): {e}")
+                # Guarda o arquivo quebrado em vez de sobrescrevê-lo com uma agenda vazia
+                arquivo.replace(arquivo.with_name(f"{arquivo.name}.corrompido-{int(time.time())}"))
+        return config_padrao()
+
+    def _reaplicar_diario(self, cfg):
+        if not self.diario.exists():
+            return
+        colecoes = {} # colecao -> {id: item}, na ordem da lista (item novo vai para o fim)
+        validos = 0
+        with open(self.diario, "r+b") as f:
+            for linha in f:
+                try:
+                    if not linha.endswith(b"\n"):
+                        raise ValueError("linha incompleta")
+                    registro = json.loads(linha)
+                except ValueError:
+                    # Última linha cortada por uma queda no meio da escrita: sai, senão a
+                    # próxima gravação emendaria nela
+                    f.truncate(validos)
+                    break
+                validos += len(linha)
+                if "chave" in registro:
+                    cfg[registro["chave"]] = registro["valor"]
+                    continue
+                colecao = registro["colecao"]
+                if colecao not in colecoes:
+                    colecoes[colecao] = {item["id"]: item for item in cfg.get(colecao, [])}
+                if "remover" in registro:
+                    colecoes[colecao].pop(registro["remover"], None)
+                else:
+                    colecoes[colecao][registro["item"]["id"]] = registro["item"]
+        for colecao, itens in colecoes.items():
+            cfg[colecao] = list(itens.values())
+        self._tamanho_diario = self.diario.stat().st_size
+
+    def gravar(self, cfg, pendente):
+        if pendente.get("tudo") or self._tamanho_diario > max(self._tamanho_base, DIARIO_MINIMO_BYTES):
+            self.compactar(cfg)
+            return
+        # Mesma ordem do SQLite: remoções, itens, chaves
+        registros = [{"colecao": colecao, "remover": item_id} for colecao, item_id in pendente.get("removidos", ())]
+        registros += [{"colecao": colecao, "item": item} for (colecao, _), item in pendente.get("itens", {}).items()]
+        registros += [{"chave": chave, "valor": cfg[chave]} for chave in pendente.get("chaves", ()) if chave in cfg]
+        if not registros:
+            return
+        dados = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in registros)
+        dados = dados.encode("utf-8")
+        with open(self.diario, "ab") as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        self._tamanho_diario += len(dados)
+
+    def compactar(self, cfg):
+        # Grava num temporário e troca com os.replace: ou fica o arquivo antigo, ou o novo inteiro
+        temporario = self.caminho.with_name(self.caminho.name + ".tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(cfg, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        if self.caminho.exists():
+            # Cópia, não rename: o arquivo principal nunca deixa de existir entre as duas etapas
+            backup_temporario = self.backup.with_name(self.backup.name + ".tmp")
+            shutil.copy2(self.caminho, backup_temporario)
+            os.replace(backup_temporario, self.backup)
+        os.replace(temporario, self.caminho)
+        # Se cair antes disso, o diário é reaplicado por cima do JSON novo sem mudar nada
+        self.diario.unlink(missing_ok=True)
+        self._tamanho_base = self.caminho.stat().st_size
+        self._tamanho_diario = 0
+
+class ArmazenamentoSQLite:
+    def __init__(self, caminho, json_legado=None):
+        import sqlite3 # Só quem usa o backend SQLite paga o import
+        self.caminho = Path(caminho)
+        self.json_legado = json_legado
+        self.conexao = sqlite3.connect(self.caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute("CREATE TABLE IF NOT EXISTS itens (colecao TEXT, id TEXT, ordem INTEGER, dados TEXT, PRIMARY KEY (colecao, id))")
+        self.conexao.execute("CREATE TABLE IF NOT EXISTS chaves (chave TEXT PRIMARY KEY, dados TEXT)")
+        self.conexao.commit()
+        self._ordem = self.conexao.execute("SELECT COALESCE(MAX(ordem), 0) FROM itens").fetchone()[0]
+
+    def carregar(self):
+        # Primeira execução com SQLite: importa o JSON existente
+        vazio = not self.conexao.execute("SELECT 1 FROM itens UNION ALL SELECT 1 FROM chaves LIMIT 1").fetchone()
+        if vazio and self.json_legado:
+            legado = self.json_legado.carregar()
+            self.gravar(legado, {"tudo": True})
+            return legado
+
+        cfg = {}
+        for chave, dados in self.conexao.execute("SELECT chave, dados FROM chaves"):
+            cfg[chave] = json.loads(dados)
+        for colecao in COLECOES:
+            linhas = self.conexao.execute("SELECT dados FROM itens WHERE colecao = ? ORDER BY ordem", (colecao,))
+            cfg[colecao] = [json.loads(dados) for (dados,) in linhas]
+        for chave, valor in config_padrao().items():
+            cfg.setdefault(chave, valor)
+        return cfg
+
+    def gravar(self, cfg, pendente):
+        with self.conexao:
+            if pendente.get("tudo"):
+                self.conexao.execute("DELETE FROM itens")
+                self.conexao.execute("DELETE FROM chaves")
+                for chave, valor in cfg.items():
+                    if chave in COLECOES:
+                        for item in valor:
+                            self._gravar_item(chave, item)
+                    else:
+                        self._gravar_chave(chave, valor)
+                return
+
+            for colecao, item_id in pendente.get("removidos", ()):
+                self.conexao.execute("DELETE FROM itens WHERE colecao = ? AND id = ?", (colecao, item_id))
+            for (colecao, _), item in pendente.get("itens", {}).items():
+                self._gravar_item(colecao, item)
+            for chave in pendente.get("chaves", ()):
+                if chave in cfg:
+                    self._gravar_chave(chave, cfg[chave])
+
+    def compactar(self, cfg):
+        pass # Cada item já está na sua linha
+
+    def _gravar_item(self, colecao, item):
+        # A ordem só é definida na inserção; atualizar um item não o move na lista
+        item.setdefault("id", uuid.uuid4().hex)
+        self._ordem += 1
+        self.conexao.execute(
+            "INSERT INTO itens (colecao, id, ordem, dados) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (colecao, id) DO UPDATE SET dados = excluded.dados",
+            (colecao, item["id"], self._ordem, json.dumps(item, ensure_ascii=False)),
+        )
+
+    def _gravar_chave(self, chave, valor):
+        self.conexao.execute(
+            "INSERT INTO chaves (chave, dados) VALUES (?, ?) ON CONFLICT (chave) DO UPDATE SET dados = excluded.dados",
+            (chave, json.dumps(valor, ensure_ascii=False)),
+        )
+
+class Gravador:
+    # Acumula as alterações e grava uma vez só depois de ATRASO_GRAVACAO_MS sem novidades
+    def __init__(self, armazenamento):
+        self.armazenamento = armazenamento
+        self.cfg = None
+        self.timer = None
+        self._primeira_pendencia = None
+        self._limpar()
+
+    def _limpar(self):
+        self.pendente = {"tudo": False, "itens": {}, "removidos": set(), "chaves": set()}
+
+    def agendar(self, cfg):
+        self.cfg = cfg
+        if QCoreApplication.instance() is None:
+            # Sem loop de eventos (scripts/CLI): grava na hora
+            self.gravar_pendente()
+            return
+        if self.timer is None:
+            self.timer = QTimer()
+            self.timer.setSingleShot(True)
+            self.timer.timeout.connect(self.gravar_pendente)
+        agora = time.monotonic()
+        if not self.timer.isActive():
+            self._primeira_pendencia = agora
+        elif (agora - self._primeira_pendencia) * 1000 > ATRASO_MAXIMO_GRAVACAO_MS:
+            return # Não adia mais: o timer já armado grava em breve
+        self.timer.start(ATRASO_GRAVACAO_MS)
+
+    def fechar(self):
+        # Ao fechar o app: grava o que falta e, no JSON, junta o diário ao arquivo principal
+        self.gravar_pendente()
+        if self.cfg is None or any(self.pendente.values()):
+            return
+        try:
+            self.armazenamento.compactar(self.cfg)
+        except Exception as e:
+            print(f"Erro ao compactar configurações: {e}")
+
+    def gravar_pendente(self):
+        if self.timer is not None:
+            self.timer.stop()
+        if self.cfg is None:
+            return
+        try:
+            self.armazenamento.gravar(self.cfg, self.pendente)
+        except Exception as e:
+            # O pendente fica como está e entra junto na próxima tentativa
+            print(f"Erro ao salvar configurações: {e}. Nova tentativa em {ESPERA_NOVA_TENTATIVA_MS // 1000} s.")
+            if self.timer is not None:
+                self._primeira_pendencia = time.monotonic()
+                self.timer.start(ESPERA_NOVA_TENTATIVA_MS)
+            return
+        self._limpar()
+
+def _criar_armazenamento():
+    json_backend = ArmazenamentoJSON(DATA_FILE)
+    if BACKEND_ARMAZENAMENTO == "sqlite":
+        return ArmazenamentoSQLite(DB_FILE, json_legado=json_backend)
+    return json_backend
+
+_gravador = None
+
+def _obter_gravador():
+    global _gravador
+    if _gravador is None:
+        _gravador = Gravador(_criar_armazenamento())
+    return _gravador
+
+# --- Funções de Configuração ---
+def carregar_config():
+    return _obter_gravador().armazenamento.carregar()
+
+def salvar_config(cfg):
+    # Regrava tudo (use salvar_item/remover_item quando só um item mudou)
+    gravador = _obter_gravador()
+    gravador.pendente["tudo"] = True
+    gravador.agendar(cfg)
+
+def salvar_item(cfg, colecao, item):
+    gravador = _obter_gravador()
+    gravador.pendente["removidos"].discard((colecao, item["id"]))
+    gravador.pendente["itens"][(colecao, item["id"])] = item
+    gravador.agendar(cfg)
+
+def remover_item(cfg, colecao, item_id):
+    gravador = _obter_gravador()
+    gravador.pendente["itens"].pop((colecao, item_id), None)
+    gravador.pendente["removidos"].add((colecao, item_id))
+    gravador.agendar(cfg)
+
+def salvar_chave(cfg, chave):
+    gravador = _obter_gravador()
+    gravador.pendente["chaves"].add(chave)
+    gravador.agendar(cfg)
+
+def gravar_pendente():
+    # Chamado ao fechar o app para não perder a última alteração
+    if _gravador is not None:
+        _gravador.fechar()
@@ -0,0 +1,634 @@
+import copy
+import glob
+import os
+import time
+import uuid
+from collections import namedtuple
+from pathlib import Path
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+from config import BUILDE_DIR, DOWNLOAD_DIR, salvar_item, remover_item, salvar_chave
+from analise import normalizar_id
+from historico import chave_do_pedido, calcular_hash
+
+# --- Estados de um job da fila ---
+PENDENTE = "pendente"
+BAIXANDO = "baixando"
+PAUSADO = "pausado"
+CONCLUIDO = "concluido"
+CANCELADO = "cancelado"
+ERRO = "erro"
+
+ESTADOS_FINAIS = (CONCLUIDO, CANCELADO, ERRO)
+MAX_SIMULTANEOS_PADRAO = 3
+FRAGMENTOS_SIMULTANEOS_PADRAO = 4 # Fragmentos DASH/HLS baixados em paralelo por job
+STATUS_LINK_EXPIRADO = (403, 410) # Respostas de quando a URL de mídia assinada venceu
+TENTATIVAS_REDE = 10 # Conexão instável: o yt-dlp tenta de novo continuando do mesmo byte
+INTERVALO_SALVAR_PROGRESSO = 5 # Segundos entre gravações do progresso de um job
+
+# --- Progresso ---
+FASE_BAIXANDO = "baixando"
+FASE_CONVERTENDO = "convertendo"
+INTERVALO_PROGRESSO_MS = 100 # 10 Hz, independente de quantos callbacks o yt-dlp dispara
+SUAVIZACAO_VELOCIDADE = 0.3 # Peso da amostra nova na média móvel exponencial
+
+def formatar_bytes(valor):
+    for unidade in ("B", "KB", "MB", "GB"):
+        if valor < 1024:
+            return f"{valor:.1f} {unidade}" if unidade != "B" else f"{int(valor)} B"
+        valor /= 1024
+    return f"{valor:.1f} TB"
+
+def formatar_eta(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}:{minutos:02d}:{segundos:02d}" if horas else f"{minutos:02d}:{segundos:02d}"
+
+class ProgressoDownload(namedtuple("ProgressoDownload", "baixado total velocidade eta fase")):
+    __slots__ = ()
+
+    @property
+    def percentual(self):
+        if not self.total:
+            return 0
+        return min(100, int(self.baixado * 100 / self.total))
+
+    def texto(self):
+        if self.fase == FASE_CONVERTENDO:
+            return "Download finalizado. Convertendo áudio/vídeo (aguarde)..."
+        velocidade = f"{formatar_bytes(self.velocidade)}/s" if self.velocidade else "..."
+        eta = formatar_eta(self.eta) if self.eta is not None else "..."
+        percent = f"{self.percentual}%" if self.total else formatar_bytes(self.baixado)
+        return f"Baixando: {percent} | Vel: {velocidade} | ETA: {eta}"
+
+class _FonteProgresso:
+    __slots__ = ("worker", "baixado", "instante", "velocidade", "ultimo")
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.baixado = None
+        self.instante = None
+        self.velocidade = None
+        self.ultimo = None
+
+class AgregadorProgresso(QObject):
+    progresso = pyqtSignal(str, object)
+
+    def __init__(self, intervalo_ms=INTERVALO_PROGRESSO_MS):
+        super().__init__()
+        self._fontes = {} # job_id -> _FonteProgresso
+        self.timer = QTimer(self)
+        self.timer.setInterval(intervalo_ms)
+        self.timer.timeout.connect(self.amostrar)
+
+    def registrar(self, job_id, worker):
+        self._fontes[job_id] = _FonteProgresso(worker)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def remover(self, job_id):
+        self._fontes.pop(job_id, None)
+        if not self._fontes:
+            self.timer.stop()
+
+    def amostrar(self):
+        agora = time.monotonic()
+        for job_id, fonte in self._fontes.items():
+            bruto = fonte.worker.bruto
+            if bruto is None:
+                continue
+            baixado, total, fase = bruto
+
+            # Velocidade calculada aqui (média móvel), sem depender do _speed_str do yt-dlp
+            if fonte.instante is not None and agora > fonte.instante:
+                instantanea = max(0, baixado - fonte.baixado) / (agora - fonte.instante)
+                if fonte.velocidade is None:
+                    fonte.velocidade = instantanea
+                else:
+                    fonte.velocidade += SUAVIZACAO_VELOCIDADE * (instantanea - fonte.velocidade)
+            fonte.baixado = baixado
+            fonte.instante = agora
+
+            eta = None
+            if fonte.velocidade and total and total > baixado:
+                eta = (total - baixado) / fonte.velocidade
+
+            progresso = ProgressoDownload(baixado, total, fonte.velocidade, eta, fase)
+            # Só emite se algo visível mudou
+            if fonte.ultimo is None or fonte.ultimo.texto() != progresso.texto():
+                fonte.ultimo = progresso
+                self.progresso.emit(job_id, progresso)
+
+class DownloadWorker(QThread):
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    status_msg = pyqtSignal(str)
+    interrompido = pyqtSignal()
+    arquivo_parcial = pyqtSignal(str)
+    arquivo_concluido = pyqtSignal(object)
+
+    def __init__(self, url, is_audio, quality_id, info=None, fragmentos=FRAGMENTOS_SIMULTANEOS_PADRAO, limite=None):
+        super().__init__()
+        self.url = url
+        self.is_audio = is_audio
+        self.quality_id = quality_id
+        self.fragmentos = fragmentos
+        self.limite = limite # Bytes/s; o yt-dlp só lê no começo do download
+        # Info já extraída pela análise: evita baixar a página/player do vídeo de novo
+        self.info = info
+        # Garante que seja string para o yt-dlp
+        self.ffmpeg_dir = str(BUILDE_DIR)
+        self._parar = False
+        # (baixado, total, fase) mais recente; lido pelo AgregadorProgresso
+        self.bruto = None
+
+    def parar(self):
+        # O yt-dlp não tem pausa: o hook aborta o download e o .part fica no disco
+        self._parar = True
+
+    def run(self):
+        # Importado aqui (na thread do worker) para não pesar na abertura do app
+        import yt_dlp
+
+        # --- 1. Verificação de Segurança do FFmpeg ---
+        # Verifica se os arquivos realmente existem antes de tentar baixar
+        ffmpeg_path = BUILDE_DIR / "ffmpeg.exe"
+        ffprobe_path = BUILDE_DIR / "ffprobe.exe"
+
+        if not ffmpeg_path.exists():
+            self.error.emit(f"CRÍTICO: ffmpeg.exe não encontrado em:\n{ffmpeg_path}")
+            return
+
+        if not ffprobe_path.exists():
+            self.error.emit(f"CRÍTICO: ffprobe.exe não encontrado em:\n{ffprobe_path}")
+            return
+
+        parciais = set()
+        arquivos = {} # arquivo -> (baixado, total); vídeo e áudio vêm em arquivos separados
+
+        # --- 2. Hook de Progresso (só anota os números, sem emitir sinais) ---
+        def progress_hook(d):
+            if self._parar:
+                raise yt_dlp.utils.DownloadCancelled()
+
+            tmp = d.get('tmpfilename')
+            if tmp and tmp not in parciais:
+                parciais.add(tmp)
+                self.arquivo_parcial.emit(tmp)
+
+            if d['status'] not in ('downloading', 'finished'):
+                return
+
+            total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            baixado = d.get('downloaded_bytes') or 0
+            if d['status'] == 'finished':
+                total = total or baixado
+                fase = FASE_CONVERTENDO
+            else:
+                fase = FASE_BAIXANDO
+            arquivos[d.get('filename')] = (baixado, total)
+
+            # Uma tupla nova por chamada: a troca da referência é atômica entre threads
+            self.bruto = (
+                sum(b for b, _ in arquivos.values()),
+                sum(t for _, t in arquivos.values()),
+                fase,
+            )
+
+        # --- 3. Configurações yt-dlp ---
+        ydl_opts = {
+            'outtmpl': str(DOWNLOAD_DIR / '%(title)s.%(ext)s'),
+            'ffmpeg_location': self.ffmpeg_dir, # Passa a pasta 'build'
+            'quiet': True,
+            'noprogress': True, # Desliga a barra do terminal para evitar lixo no log
+            'progress_hooks': [progress_hook],
+            # Streams DASH/HLS em fragmentos: vários ao mesmo tempo para ocupar o link
+            'concurrent_fragment_downloads': self.fragmentos,
+            'noplaylist': True,
+            # Continua o .part existente com HTTP Range (ou pelo .ytdl nos fragmentos)
+            'continuedl': True,
+            'retries': TENTATIVAS_REDE,
+            'fragment_retries': TENTATIVAS_REDE,
+        }
+        if self.limite:
+            # Um fragmento por vez: com vários em paralelo, cada um ganharia o limite inteiro
+            ydl_opts['ratelimit'] = self.limite
+            ydl_opts['concurrent_fragment_downloads'] = 1
+
+        if self.is_audio:
+            ydl_opts.update({
+                'format': 'bestaudio/best',
+                'postprocessors': [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '192',
+                }],
+            })
+        elif "+" in self.quality_id:
+            # Par vídeo+áudio escolhido na análise; se o áudio sumir, o vídeo segue com o melhor áudio
+            video = self.quality_id.split("+")[0]
+            ydl_opts.update({
+                'format': f'{self.quality_id}/{video}+bestaudio/best'
+            })
+        elif "/" in self.quality_id:
+            # Seletor completo (ex: formato progressivo, que já tem áudio)
+            ydl_opts.update({'format': self.quality_id})
+        else:
+            # Baixa vídeo + melhor áudio disponível
+            ydl_opts.update({
+                'format': f'{self.quality_id}+bestaudio/best'
+            })
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                if self.info:
+                    info = self.baixar_com_info(ydl)
+                else:
+                    info = ydl.extract_info(self.url, download=True)
+                titulo = info.get('title', 'Arquivo')
+                self.informar_arquivo(info)
+                self.finished.emit(f"Sucesso! Salvo em downloads.\nTítulo: {titulo}")
+        except Exception as e:
+            # O cancelamento pode chegar embrulhado em DownloadError, por isso olha a flag
+            if self._parar or isinstance(e, yt_dlp.utils.DownloadCancelled):
+                self.interrompido.emit()
+            else:
+                self.error.emit(f"Erro no Download: {str(e)}")
+
+    def informar_arquivo(self, info):
+        # Caminho final já depois dos pós-processadores (merge/MP3)
+        baixados = info.get('requested_downloads') or [info]
+        caminho = baixados[0].get('filepath') or info.get('filepath')
+        if not caminho or not os.path.exists(caminho):
+            return
+        self.arquivo_concluido.emit({
+            "chave": chave_do_pedido(self.url, self.is_audio, self.quality_id, info),
+            "arquivo": caminho,
+            "extractor": info.get('extractor_key') or info.get('extractor'),
+            "video_id": info.get('id'),
+            "formato": "mp3" if self.is_audio else self.quality_id,
+            "url": self.url,
+            "titulo": info.get('title'),
+            # O hash é calculado aqui para não travar a interface com arquivos grandes
+            "sha256": calcular_hash(caminho),
+        })
+
+    def baixar_com_info(self, ydl):
+        import yt_dlp
+        try:
+            # Cópia porque o yt-dlp altera o dicionário e o original continua no cache
+            return ydl.process_ie_result(copy.deepcopy(self.info), download=True)
+        except yt_dlp.utils.DownloadError as e:
+            if self._parar or not link_expirou(e):
+                raise
+            # As URLs de mídia da análise expiraram: extrai de novo
+            self.status_msg.emit("Links da análise expiraram. Extraindo novamente...")
+            return ydl.extract_info(self.url, download=True)
+
+def link_expirou(erro):
+    # Só vale extrair de novo quando o servidor recusou a URL (403/410); qualquer outro erro se repetiria
+    causa = erro.exc_info[1] if getattr(erro, "exc_info", None) else None
+    status = getattr(causa, "status", None) or getattr(causa, "code", None)
+    if status in STATUS_LINK_EXPIRADO:
+        return True
+    mensagem = str(erro)
+    return any(f"HTTP Error {s}" in mensagem for s in STATUS_LINK_EXPIRADO)
+
+class GerenciadorDownloads(QObject):
+    job_adicionado = pyqtSignal(str)
+    job_atualizado = pyqtSignal(str)
+    job_progresso = pyqtSignal(str, object)
+    job_removido = pyqtSignal(str)
+    job_concluido = pyqtSignal(str, str)
+    job_erro = pyqtSignal(str, str)
+
+    def __init__(self, cfg, cache_analise=None, historico=None):
+        super().__init__()
+        self.cfg = cfg
+        self.cache_analise = cache_analise
+        self.historico = historico
+        # A fila mora dentro do cfg para ser salva junto com o resto do JSON
+        self.fila = cfg.setdefault("fila_downloads", [])
+        self._jobs = {job["id"]: job for job in self.fila}
+        self.workers = {}
+        self.agregador = AgregadorProgresso()
+        self.agregador.progresso.connect(self._ao_progresso)
+        self.max_simultaneos = cfg.get("max_downloads_simultaneos", MAX_SIMULTANEOS_PADRAO)
+        self.fragmentos_simultaneos = cfg.get("fragmentos_simultaneos", FRAGMENTOS_SIMULTANEOS_PADRAO)
+
+        self._salvo_em = {} # job_id -> instante da última gravação de progresso
+        # Velocidade dos jobs ativos; a soma estima quanto tempo um download novo levaria
+        self._velocidades = {}
+        self.velocidade_recente = cfg.get("velocidade_recente")
+        self._encerrando = False
+        # Banda cedida a eventos ao vivo (banda.py): None = livre, 0 = parado, > 0 = bytes/s
+        self.limite_banda = None
+        self.motivo_limite = None
+        self._reiniciar = set() # jobs interrompidos só para voltar com o limite novo
+
+        # Só começa a baixar depois que a janela já apareceu
+        QTimer.singleShot(0, self._preencher_vagas)
+
+    # --- Consulta ---
+    def job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        return list(self.fila)
+
+    def ativos(self, origem=None):
+        if origem is None:
+            return len(self.workers)
+        return sum(1 for jid in self.workers if self._jobs[jid].get("origem") == origem)
+
+    def velocidade_estimada(self):
+        # Bytes/s do link: a soma dos downloads rodando ou, parado, a última medida
+        return sum(self._velocidades.values()) or self.velocidade_recente
+
+    # --- Retomada entre sessões ---
+    def retomar_interrompidos(self):
+        # Jobs que ainda estavam "baixando" no JSON foram cortados por fechamento ou queda do app
+        retomados = 0
+        for job in self.fila:
+            if job["estado"] != BAIXANDO or job["id"] in self.workers:
+                continue
+            existentes = [Path(c) for c in job.get("parciais", []) if Path(c).exists()]
+            job["parciais"] = [str(c) for c in existentes]
+            ja_baixado = sum(c.stat().st_size for c in existentes)
+            if ja_baixado:
+                mensagem = f"Retomando de {formatar_bytes(ja_baixado)} já baixados..."
+            else:
+                mensagem = "Retomando download interrompido..."
+            self._definir_estado(job, PENDENTE, mensagem)
+            retomados += 1
+        self._preencher_vagas()
+        return retomados
+
+    def encerrar(self):
+        # Ao fechar o app: para os workers mas mantém os jobs como "baixando",
+        # assim a próxima sessão continua do .part
+        self._encerrando = True
+        for job_id, worker in list(self.workers.items()):
+            job = self._jobs.get(job_id)
+            if job:
+                salvar_item(self.cfg, "fila_downloads", job)
+            worker.parar()
+        for worker in list(self.workers.values()):
+            worker.wait(3000)
+
+    # --- Ações da fila ---
+    def adicionar(self, url, is_audio, quality_id, titulo=None, origem=None, preset=None):
+        # Mesmo vídeo no mesmo formato já está em downloads: atende na hora, sem rede
+        existente = None
+        if self.historico:
+            existente = self.historico.procurar_pedido(url, is_audio, quality_id, self._info_em_cache(url))
+            if existente and origem is None:
+                self.historico.fixar(existente)
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "url": url,
+            "is_audio": is_audio,
+            "quality_id": quality_id,
+            "titulo": titulo or url,
+            "estado": PENDENTE,
+            "progresso": 0,
+            "mensagem": "Na fila...",
+            "tentativas": 0,
+            "parciais": [],
+            "criado_em": time.time(),
+            "origem": origem,
+            "preset": preset, # Conversão feita pelo Transcodificador depois do download
+        }
+        if existente:
+            job.update({
+                "estado": CONCLUIDO,
+                "progresso": 100,
+                "arquivo": existente["arquivo"],
+                "mensagem": f"Já baixado anteriormente: {Path(existente['arquivo']).name}",
+            })
+
+        self.fila.append(job)
+        self._jobs[job["id"]] = job
+        salvar_item(self.cfg, "fila_downloads", job)
+        self.job_adicionado.emit(job["id"])
+        if existente:
+            self.job_concluido.emit(job["id"], job["mensagem"])
+        else:
+            self._preencher_vagas()
+        return job["id"]
+
+    def pausar(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job["estado"] not in (PENDENTE, BAIXANDO):
+            return
+        self._definir_estado(job, PAUSADO, "Pausado.")
+        self._interromper(job_id)
+
+    def retomar(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job["estado"] != PAUSADO:
+            return
+        self._definir_estado(job, PENDENTE, "Na fila...")
+        self._preencher_vagas()
+
+    def cancelar(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job["estado"] in ESTADOS_FINAIS:
+            return
+        self._definir_estado(job, CANCELADO, "Cancelado.")
+        if job_id in self.workers:
+            # Os arquivos parciais são apagados quando o worker realmente parar
+            self._interromper(job_id)
+        else:
+            self._remover_parciais(job)
+
+    def tentar_novamente(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job["estado"] not in (ERRO, CANCELADO):
+            return
+        job["progresso"] = 0
+        job["tentativas"] = job.get("tentativas", 0) + 1
+        self._definir_estado(job, PENDENTE, "Na fila...")
+        self._preencher_vagas()
+
+    def remover(self, job_id):
+        job = self._jobs.get(job_id)
+        if not job or job["estado"] not in ESTADOS_FINAIS or job_id in self.workers:
+            return
+        self.fila.remove(job)
+        del self._jobs[job_id]
+        remover_item(self.cfg, "fila_downloads", job_id)
+        self.job_removido.emit(job_id)
+
+    def limpar_finalizados(self):
+        for job in [j for j in self.fila if j["estado"] in (CONCLUIDO, CANCELADO)]:
+            self.remover(job["id"])
+
+    def definir_max_simultaneos(self, valor):
+        # Reduzir o limite não interrompe quem já está baixando
+        self.max_simultaneos = max(1, int(valor))
+        self.cfg["max_downloads_simultaneos"] = self.max_simultaneos
+        salvar_chave(self.cfg, "max_downloads_simultaneos")
+        self._preencher_vagas()
+
+    def limitar_banda(self, limite, motivo=None):
+        if limite == self.limite_banda:
+            return
+        self.limite_banda = limite
+        self.motivo_limite = motivo
+        print(f"Banda dos downloads: {motivo or 'livre'}")
+        # O yt-dlp não muda o limite no meio do download: para e continua do .part com o valor novo
+        for job_id in list(self.workers):
+            self._reiniciar.add(job_id)
+            self._interromper(job_id)
+        for job in self.fila:
+            if job["estado"] == PENDENTE and job["id"] not in self.workers:
+                self._definir_estado(job, PENDENTE, motivo or "Na fila...")
+        self._preencher_vagas()
+
+    def definir_fragmentos_simultaneos(self, valor):
+        # Vale para os próximos jobs; os que estão rodando mantêm a configuração
+        self.fragmentos_simultaneos = max(1, int(valor))
+        self.cfg["fragmentos_simultaneos"] = self.fragmentos_simultaneos
+        salvar_chave(self.cfg, "fragmentos_simultaneos")
+
+    # --- Pool de workers ---
+    def _preencher_vagas(self):
+        if self._encerrando:
+            return
+        for job in self.fila:
+            if len(self.workers) >= self._vagas():
+                break
+            if job["estado"] == PENDENTE and job["id"] not in self.workers:
+                self._iniciar(job)
+
+    def _vagas(self):
+        if self.limite_banda is None:
+            return self.max_simultaneos
+        # Com limite, um download por vez fica com a banda que sobrou
+        return 1 if self.limite_banda else 0
+
+    def _iniciar(self, job):
+        jid = job["id"]
+        info = self._info_em_cache(job["url"])
+        worker = DownloadWorker(job["url"], job["is_audio"], job["quality_id"], info, self.fragmentos_simultaneos,
+                                self.limite_banda)
+        worker.status_msg.connect(lambda msg, jid=jid: self._ao_status(jid, msg))
+        worker.finished.connect(lambda msg, jid=jid: self._ao_concluir(jid, msg))
+        worker.error.connect(lambda msg, jid=jid: self._ao_erro(jid, msg))
+        worker.interrompido.connect(lambda jid=jid: self._ao_interromper(jid))
+        worker.arquivo_parcial.connect(lambda caminho, jid=jid: self._ao_arquivo_parcial(jid, caminho))
+        worker.arquivo_concluido.connect(lambda dados, jid=jid: self._ao_arquivo_concluido(jid, dados))
+        self.workers[jid] = worker
+        self.agregador.registrar(jid, worker)
+        self._definir_estado(job, BAIXANDO, "Iniciando download...")
+        worker.start()
+
+    def _info_em_cache(self, url):
+        return self.cache_analise.obter(normalizar_id(url)) if self.cache_analise else None
+
+    def _interromper(self, job_id):
+        worker = self.workers.get(job_id)
+        if worker:
+            worker.parar()
+
+    def _liberar_worker(self, job_id):
+        worker = self.workers.pop(job_id, None)
+        self._reiniciar.discard(job_id)
+        self.agregador.remover(job_id)
+        self._salvo_em.pop(job_id, None)
+        velocidade = sum(self._velocidades.values())
+        if self._velocidades.pop(job_id, None) and velocidade:
+            self.velocidade_recente = velocidade
+            self.cfg["velocidade_recente"] = velocidade
+            salvar_chave(self.cfg, "velocidade_recente")
+        if worker:
+            # O sinal é o último passo do run(), então a espera é praticamente nula
+            worker.wait(2000)
+            worker.deleteLater()
+
+    def _definir_estado(self, job, estado, mensagem):
+        job["estado"] = estado
+        job["mensagem"] = mensagem
+        salvar_item(self.cfg, "fila_downloads", job)
+        self.job_atualizado.emit(job["id"])
+
+    def _remover_parciais(self, job):
+        for caminho in job.get("parciais", []):
+            parcial = Path(caminho)
+            # Apaga o .part e os fragmentos/estado que o yt-dlp cria ao lado dele
+            for arquivo in parcial.parent.glob(glob.escape(parcial.name) + "*"):
+                arquivo.unlink(missing_ok=True)
+            Path(caminho.removesuffix(".part") + ".ytdl").unlink(missing_ok=True)
+        job["parciais"] = []
+
+    # --- Sinais dos workers ---
+    def _ao_progresso(self, job_id, progresso):
+        job = self._jobs.get(job_id)
+        if job and job["estado"] == BAIXANDO:
+            job["progresso"] = progresso.percentual
+            job["mensagem"] = progresso.texto()
+            if progresso.velocidade:
+                self._velocidades[job_id] = progresso.velocidade
+            self.job_progresso.emit(job_id, progresso)
+            # Progresso salvo de tempos em tempos para a retomada mostrar onde parou
+            agora = time.monotonic()
+            if agora - self._salvo_em.get(job_id, 0) > INTERVALO_SALVAR_PROGRESSO:
+                self._salvo_em[job_id] = agora
+                salvar_item(self.cfg, "fila_downloads", job)
+
+    def _ao_status(self, job_id, msg):
+        job = self._jobs.get(job_id)
+        if job and job["estado"] == BAIXANDO:
+            job["mensagem"] = msg
+            self.job_atualizado.emit(job_id)
+
+    def _ao_arquivo_parcial(self, job_id, caminho):
+        job = self._jobs.get(job_id)
+        if job is not None and caminho.endswith(".part") and caminho not in job.setdefault("parciais", []):
+            job["parciais"].append(caminho)
+
+    def _ao_arquivo_concluido(self, job_id, dados):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job["arquivo"] = dados["arquivo"]
+        dados["origem"] = job.get("origem")
+        if self.historico:
+            entrada = self.historico.registrar(dados.pop("chave"), dados)
+            # Se era um conteúdo repetido, o histórico aponta para a cópia que ficou
+            job["arquivo"] = entrada["arquivo"]
+
+    def _ao_concluir(self, job_id, msg):
+        self._liberar_worker(job_id)
+        job = self._jobs.get(job_id)
+        if job:
+            job["progresso"] = 100
+            job["parciais"] = []
+            self._definir_estado(job, CONCLUIDO, msg)
+            self.job_concluido.emit(job_id, msg)
+        self._preencher_vagas()
+
+    def _ao_erro(self, job_id, msg):
+        self._liberar_worker(job_id)
+        job = self._jobs.get(job_id)
+        if job:
+            self._definir_estado(job, ERRO, msg)
+            self.job_erro.emit(job_id, msg)
+        self._preencher_vagas()
+
+    def _ao_interromper(self, job_id):
+        reiniciar = job_id in self._reiniciar
+        self._liberar_worker(job_id)
+        if self._encerrando:
+            return
+        job = self._jobs.get(job_id)
+        if job:
+            if job["estado"] == CANCELADO:
+                self._remover_parciais(job)
+                salvar_item(self.cfg, "fila_downloads", job)
+            elif job["estado"] == BAIXANDO and reiniciar:
+                self._definir_estado(job, PENDENTE, self.motivo_limite or "Na fila...")
+            elif job["estado"] == BAIXANDO:
+                self._definir_estado(job, PAUSADO, "Interrompido.")
+        self._preencher_vagas()
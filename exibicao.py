@@ -0,0 +1,261 @@
+import os
+import sys
+import shutil
+import uuid
+import webbrowser
+from pathlib import Path
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from config import PERFIS_NAVEGADOR_DIR, salvar_config, salvar_item, remover_item
+from agendador import AgendadorEventos, garantir_ids, ANTECEDENCIA_PREPARO_PADRAO
+from processos import RegistroProcessos, fechar_janela_por_titulo
+from metricas import RegistroMetricas
+from telas import tela_do_monitor
+
+MSG_TELAS_SEM_SINCRONIA = "Sem o player interno cada tela abre um VLC próprio, e eles saem de sincronia com o tempo."
+
+def chave_espelho(ev_id, monitor):
+    # Processo extra de um evento em várias telas (player externo)
+    return f"{ev_id}@{monitor}"
+
+# --- Exibição dos Eventos ---
+# Núcleo da agenda, sem widgets: guarda os eventos, dispara no horário e abre/fecha a
+# mídia. Usado pela interface e pelo serviço sem janela (servico.py).
+class ExibidorEventos(QObject):
+    evento_adicionado = pyqtSignal(object)
+    eventos_removidos = pyqtSignal(list) # ids; um sinal só para uma exclusão em lote
+
+    def __init__(self, cfg, historico, interno=True):
+        super().__init__()
+        self.cfg = cfg
+        self.historico = historico
+        if garantir_ids(self.cfg.setdefault("eventos", [])):
+            salvar_config(self.cfg)
+
+        # Agenda orientada a eventos: um timer armado só para o próximo disparo
+        antecedencia = self.cfg.get("antecedencia_preparo", ANTECEDENCIA_PREPARO_PADRAO)
+        self.agendador = AgendadorEventos(self.cfg["eventos"], antecedencia=antecedencia)
+        self.agendador.preparar.connect(self.preparar_evento)
+        self.agendador.disparar.connect(self.disparar_evento)
+        self.processos = RegistroProcessos()
+        # Horário agendado x despacho x abertura x primeiro quadro x fechamento, por disparo
+        self.metricas = RegistroMetricas(self.cfg)
+        self.agendador.perdido.connect(self.metricas.perdido)
+        self.processos.fechado.connect(self.metricas.fechado)
+        self.reprodutor = None # Player interno, criado no primeiro evento de arquivo
+        self.navegador = None # Navegador interno, criado no primeiro evento de link
+        # Sem janelas (serviço): player e navegador internos ficam desligados
+        self._sem_reprodutor = not interno
+        self._sem_navegador = not interno
+
+    # --- Eventos ---
+    def eventos(self):
+        return self.cfg["eventos"]
+
+    def telas_sincronizadas(self):
+        # Só o player interno repete o mesmo quadro em todas as telas
+        return self.obter_reprodutor() is not None
+
+    def adicionar_evento(self, tipo, arquivo, hora, duracao, monitor=0, regra=None, itens=None, monitores=None):
+        if monitores and len(monitores) > 1 and not self.telas_sincronizadas():
+            print(f"Aviso: {MSG_TELAS_SEM_SINCRONIA}")
+        evento = {
+            "id": uuid.uuid4().hex,
+            "tipo": tipo,
+            "arquivo": arquivo,
+            "hora": hora,
+            "duracao": duracao,
+            "monitor": monitor # Salva o monitor escolhido
+        }
+        if regra:
+            evento["regra"] = regra # Repetição (dias da semana, intervalo, período)
+        if tipo == "playlist":
+            # Arquivos tocados em sequência (e em loop) até acabar a duração; 'arquivo' fica com o primeiro
+            evento["itens"] = list(itens)
+            evento["arquivo"] = evento["itens"][0]
+        if monitores and len(monitores) > 1:
+            # Mesma mídia em várias telas, sincronizada; 'monitor' fica com a primeira
+            evento["monitores"] = list(monitores)
+            evento["monitor"] = evento["monitores"][0]
+        self.cfg["eventos"].append(evento)
+        salvar_item(self.cfg, "eventos", evento)
+        self.agendador.adicionar(evento)
+        self.evento_adicionado.emit(evento)
+        return evento
+
+    def remover_eventos(self, ids):
+        ids = set(ids)
+        removidos = [e for e in self.cfg["eventos"] if e["id"] in ids]
+        # Uma passada só pela lista, mesmo removendo muitos de uma vez
+        self.cfg["eventos"][:] = [e for e in self.cfg["eventos"] if e["id"] not in ids]
+        for ev in removidos:
+            remover_item(self.cfg, "eventos", ev["id"])
+            self.agendador.remover(ev["id"])
+            # O que já está na tela segue até o fim; só a pré-carga ainda escondida é liberada
+            for motor in (self.reprodutor, self.navegador):
+                if motor is not None:
+                    motor.descartar_preparo(ev["id"])
+            shutil.rmtree(PERFIS_NAVEGADOR_DIR / ev["id"], ignore_errors=True)
+        if removidos:
+            self.eventos_removidos.emit([ev["id"] for ev in removidos])
+
+    # --- Disparo ---
+    def obter_reprodutor(self):
+        if self.reprodutor is None and not self._sem_reprodutor:
+            try:
+                # QtMultimedia é pesado e depende dos codecs do sistema: só carrega quando precisa
+                from reproducao import ReprodutorTelas
+                self.reprodutor = ReprodutorTelas()
+                self.reprodutor.iniciado.connect(self.metricas.primeiro_quadro)
+            except ImportError as e:
+                print(f"Player interno indisponível ({e}). Usando player externo.")
+                self._sem_reprodutor = True
+        return self.reprodutor
+
+    def obter_navegador(self):
+        if self.navegador is None and not self._sem_navegador:
+            try:
+                # PyQt6-WebEngine é opcional; sem ele os links abrem no Chrome/Edge na hora
+                from navegador import NavegadorTelas
+                self.navegador = NavegadorTelas()
+                self.navegador.iniciado.connect(self.metricas.primeiro_quadro)
+            except ImportError as e:
+                print(f"Navegador interno indisponível ({e}). Usando navegador externo.")
+                self._sem_navegador = True
+        return self.navegador
+
+    def resolver_local(self, ev):
+        # Link do YouTube que já foi baixado: toca o arquivo em vez de depender da rede
+        if ev.get("tipo") != "url":
+            return ev
+        entrada = self.historico.procurar_local(ev["arquivo"])
+        if entrada is None:
+            return ev
+        self.historico.marcar_uso(entrada)
+        return {**ev, "tipo": "arquivo", "arquivo": entrada["arquivo"]}
+
+    def preparar_evento(self, ev, instante):
+        ev = self.resolver_local(ev)
+        if ev.get("tipo", "arquivo") in ("arquivo", "playlist"):
+            motor = self.obter_reprodutor()
+        else:
+            motor = self.obter_navegador()
+        if motor is not None:
+            print(f"Pré-carregando: {ev['arquivo']}")
+            motor.preparar(ev, instante)
+
+    def disparar_evento(self, ev, instante):
+        self.metricas.despachado(ev, instante)
+        # Horário da ocorrência que disparou: reabrir o app logo depois não repete o disparo
+        ev["ultimo_disparo"] = instante
+        salvar_item(self.cfg, "eventos", ev)
+        ev = self.resolver_local(ev)
+        print(f"Disparando: {ev['arquivo']}")
+
+        try:
+            tipo = ev.get("tipo", "arquivo")
+            conteudo = ev["arquivo"]
+
+            # --- Lógica de Posicionamento (Geometria da Tela) ---
+            rect = tela_do_monitor(ev.get("monitor", 0)).geometry()
+            pos_x = rect.x()
+            pos_y = rect.y()
+
+            if tipo == "url" and self.obter_navegador() is not None:
+                # Navegador interno: a página já foi carregada escondida na tela certa
+                self.navegador.iniciar(ev, instante)
+                motor = "navegador_interno"
+            elif tipo == "url":
+                # Abre link no navegador com coordenadas
+                chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+                edge_path = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+                browser = chrome_path if os.path.exists(chrome_path) else edge_path
+
+                if os.path.exists(browser):
+                    # Perfil próprio do evento: sem ele o Chrome entrega a janela para a
+                    # instância já aberta e o processo que lançamos some na hora
+                    perfil = PERFIS_NAVEGADOR_DIR / ev["id"]
+                    # Modo Kiosk ou Fullscreen forçado na coordenada X,Y
+                    cmd = [
+                        browser,
+                        f"--user-data-dir={perfil}",
+                        "--no-first-run",
+                        "--no-default-browser-check",
+                        "--new-window",
+                        f"--window-position={pos_x},{pos_y}",
+                        "--start-fullscreen",
+                        conteudo
+                    ]
+                    self.processos.iniciar(ev["id"], cmd)
+                    motor = "navegador_externo"
+                else:
+                    webbrowser.open(conteudo)
+                    motor = "sistema"
+
+            elif self.obter_reprodutor() is not None:
+                # Player interno: a mídia já foi pré-carregada na tela certa
+                self.reprodutor.iniciar(ev, instante)
+                motor = "player_interno"
+            else:
+                # Sem player interno: tenta usar VLC para garantir que abra na tela certa
+                vlc_path = r"C:\Program Files\VideoLAN\VLC\vlc.exe"
+                
+                if os.path.exists(vlc_path):
+                    itens = ev.get("itens") or [conteudo]
+
+                    def comando_vlc(x, y):
+                        cmd = [
+                            vlc_path,
+                            *itens,
+                            "--no-one-instance", # Processo próprio, para fechar só este vídeo
+                            "--no-embedded-video",
+                            "--fullscreen",
+                            f"--video-x={x}",
+                            f"--video-y={y}"
+                        ]
+                        if len(itens) > 1:
+                            cmd.append("--loop") # Playlist: o VLC segue na ordem, mas troca de item com um corte
+                        return cmd
+
+                    self.processos.iniciar(ev["id"], comando_vlc(pos_x, pos_y))
+                    # Várias telas: um VLC por tela, abertos juntos mas sem sincronia entre eles
+                    for monitor in ev.get("monitores", [])[1:]:
+                        extra = tela_do_monitor(monitor).geometry()
+                        self.processos.iniciar(chave_espelho(ev["id"], monitor), comando_vlc(extra.x(), extra.y()))
+                    motor = "vlc"
+                else:
+                    motor = "sistema"
+                    # Se não tiver VLC, usa o padrão (não garante tela certa)
+                    if sys.platform == "win32":
+                        os.startfile(conteudo)
+                    else:
+                        self.processos.iniciar(ev["id"], ["xdg-open", conteudo])
+            self.metricas.aberto(ev["id"], motor)
+            
+            QTimer.singleShot(ev["duracao"] * 1000, lambda ev=ev: self.fechar_midia(ev))
+
+        except Exception as e:
+            print(f"Erro ao disparar evento: {e}")
+
+    def fechar_midia(self, ev):
+        conteudo = ev["arquivo"]
+        print(f"Tentando fechar: {conteudo}")
+        self.metricas.fechando(ev["id"])
+
+        if self.reprodutor is not None and self.reprodutor.parar(ev["id"]):
+            self.metricas.fechado(ev["id"])
+            return
+        if self.navegador is not None and self.navegador.parar(ev["id"]):
+            self.metricas.fechado(ev["id"])
+            return
+
+        # Fecha exatamente o processo que este evento abriu (terminate -> kill, sem travar a tela).
+        # O tempo até ele sair chega depois, pelo sinal 'fechado' do registro
+        for monitor in ev.get("monitores", [])[1:]:
+            self.processos.fechar(chave_espelho(ev["id"], monitor))
+        if self.processos.fechar(ev["id"]):
+            return
+
+        # Aberto sem handle (os.startfile/webbrowser): só dá para mirar pelo título da janela
+        if ev.get("tipo") != "url":
+            fechar_janela_por_titulo(Path(conteudo).stem)
+        self.metricas.fechado(ev["id"])
@@ -0,0 +1,119 @@
+from downloads import formatar_bytes, formatar_eta
+
+# --- Escolha de Formato ---
+# Para cada resolução oferece um par vídeo+áudio que o yt-dlp só precisa juntar (remux),
+# sem reconverter, preferindo o codec mais leve para os players dos quiosques.
+# Custo relativo de decodificação por software (H.264 = 1); VP9/AV1 pesam em máquinas sem aceleração
+CUSTO_CODEC = {"h264": 1.0, "vp8": 1.2, "vp9": 1.6, "hevc": 1.8, "av1": 2.5}
+CUSTO_CODEC_DESCONHECIDO = 2.0
+NOMES_CODEC = {"h264": "H.264", "vp8": "VP8", "vp9": "VP9", "hevc": "HEVC", "av1": "AV1"}
+# Contêiner do vídeo -> extensões de áudio que entram nele sem reconverter
+AUDIO_COMPATIVEL = {"mp4": ("m4a", "mp4"), "webm": ("webm",)}
+ALTURA_RECOMENDADA = 1080 # Acima disso o padrão não é a maior resolução, e sim a melhor até aqui
+
+def familia_codec(vcodec):
+    vcodec = (vcodec or "").lower()
+    for prefixo, familia in (("avc", "h264"), ("h264", "h264"), ("vp09", "vp9"), ("vp9", "vp9"), ("vp8", "vp8"),
+                             ("hev", "hevc"), ("hvc", "hevc"), ("h265", "hevc"), ("av01", "av1")):
+        if vcodec.startswith(prefixo):
+            return familia
+    return None
+
+def tamanho_estimado(formato, duracao):
+    # Tamanho informado > aproximado > bitrate médio x duração
+    tamanho = formato.get("filesize") or formato.get("filesize_approx")
+    if tamanho:
+        return tamanho
+    if formato.get("tbr") and duracao:
+        return int(formato["tbr"] * 125 * duracao) # kbit/s -> bytes/s
+    return None
+
+def _tem_video(f):
+    return f.get("vcodec") not in (None, "none") and bool(f.get("height"))
+
+def _so_audio(f):
+    return f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")
+
+def melhor_audio(formatos, ext_video):
+    audios = [f for f in formatos if _so_audio(f)]
+    if not audios:
+        return None, False
+    compativeis = [f for f in audios if f.get("ext") in AUDIO_COMPATIVEL.get(ext_video, ())]
+    candidatos = compativeis or audios
+    melhor = max(candidatos, key=lambda f: (f.get("abr") or f.get("tbr") or 0))
+    return melhor, bool(compativeis)
+
+def ranquear_formatos(info, velocidade=None):
+    # Uma opção por altura/fps, da maior para a menor; 'recomendado' marca o padrão do combo
+    formatos = info.get("formats") or []
+    duracao = info.get("duration")
+    grupos = {} # (altura, alta_taxa) -> (chave de ordenação, opção)
+    # Vídeo sem nenhum áudio (mudo) ainda pode ser baixado; se o vídeo tem som, opção sem som não entra
+    mudo = not any(f.get("acodec") not in (None, "none") for f in formatos)
+
+    for f in formatos:
+        if not _tem_video(f):
+            continue
+        codec = familia_codec(f.get("vcodec"))
+        fps = f.get("fps") or 30
+        progressivo = f.get("acodec") not in (None, "none")
+        if progressivo:
+            audio, remux = None, True
+        else:
+            audio, remux = melhor_audio(formatos, f.get("ext"))
+            if audio is None:
+                if not mudo:
+                    continue
+                remux = True # Nada a juntar: sai no contêiner do próprio formato
+        custo = CUSTO_CODEC.get(codec, CUSTO_CODEC_DESCONHECIDO) * max(1.0, fps / 30)
+
+        tamanho = tamanho_estimado(f, duracao)
+        if tamanho is not None and audio is not None:
+            tamanho_audio = tamanho_estimado(audio, duracao)
+            tamanho = tamanho + tamanho_audio if tamanho_audio else tamanho
+
+        opcao = {
+            # Progressivo (ou mudo) vai sozinho, sem "+bestaudio"
+            "seletor": f"{f['format_id']}/best" if audio is None else f"{f['format_id']}+{audio['format_id']}",
+            "altura": f["height"],
+            "fps": fps,
+            "codec": codec,
+            "ext": f.get("ext") if remux else "mkv", # Sem par compatível o yt-dlp junta em MKV
+            "tamanho": tamanho,
+            "custo": custo,
+            "remux": remux,
+        }
+        # Mesma altura: o que junta direto em mp4/webm, depois o mais leve, depois o de mais bitrate
+        chave = (not remux, custo, -(f.get("tbr") or 0))
+        grupo = (f["height"], fps > 30)
+        if grupo not in grupos or chave < grupos[grupo][0]:
+            grupos[grupo] = (chave, opcao)
+
+    opcoes = [o for _, o in sorted(grupos.values(), key=lambda g: (g[1]["altura"], g[1]["fps"]), reverse=True)]
+    for opcao in opcoes:
+        opcao["texto"] = texto_opcao(opcao, velocidade)
+        opcao["recomendado"] = False
+    # Padrão: a maior até 1080p com o codec mais barato (um 1080p60 AV1 não ganha de um 1080p H.264)
+    elegiveis = [o for o in opcoes if o["altura"] <= ALTURA_RECOMENDADA] or opcoes
+    if elegiveis:
+        escolhido = min(elegiveis, key=lambda o: (-o["altura"], not o["remux"], o["custo"]))
+        escolhido["recomendado"] = True
+    return opcoes
+
+def texto_audio(info, velocidade=None):
+    # Modo MP3: o yt-dlp baixa o melhor áudio e converte
+    audio, _ = melhor_audio(info.get("formats") or [], None)
+    tamanho = tamanho_estimado(audio, info.get("duration")) if audio else None
+    if not tamanho:
+        return "Melhor Qualidade (MP3)"
+    texto = f"Melhor Qualidade (MP3) · ~{formatar_bytes(tamanho)}"
+    return texto + (f" · ~{formatar_eta(tamanho / velocidade)}" if velocidade else "")
+
+def texto_opcao(opcao, velocidade=None):
+    fps = f"{opcao['fps']:.0f}" if opcao["fps"] > 30 else ""
+    partes = [f"{opcao['altura']}p{fps}", NOMES_CODEC.get(opcao["codec"], "?"), opcao["ext"]]
+    if opcao["tamanho"]:
+        partes.append(f"~{formatar_bytes(opcao['tamanho'])}")
+        if velocidade:
+            partes.append(f"~{formatar_eta(opcao['tamanho'] / velocidade)}")
+    return " · ".join(partes)
@@ -0,0 +1,146 @@
+import hashlib
+import time
+from pathlib import Path
+from config import salvar_item, remover_item
+from analise import normalizar_id
+
+# --- Histórico de Downloads ---
+# Cada entrada é identificada por extrator + id do vídeo + formato, como no
+# --download-archive do yt-dlp, mas guardando também o arquivo e o hash dele.
+
+def chave_historico(extractor, video_id, formato):
+    return f"{extractor.lower()}:{video_id}:{formato}"
+
+def chave_do_pedido(url, is_audio, quality_id, info=None):
+    formato = "mp3" if is_audio else quality_id
+    if info and info.get("extractor_key") and info.get("id"):
+        return chave_historico(info["extractor_key"], info["id"], formato)
+    return chave_por_url(url, formato)
+
+def chave_por_url(url, formato):
+    # Sem análise: para o YouTube a chave normalizada já é "youtube:<id>"
+    return f"{normalizar_id(url)}:{formato}"
+
+def calcular_hash(caminho, bloco=1024 * 1024):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        while True:
+            dados = f.read(bloco)
+            if not dados:
+                break
+            sha.update(dados)
+    return sha.hexdigest()
+
+class HistoricoDownloads:
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.entradas = cfg.setdefault("historico_downloads", [])
+        self._por_chave = {e["id"]: e for e in self.entradas}
+        # Outros sites só têm extrator/id depois da análise; o link serve de chave alternativa
+        self._por_url = {e["chave_url"]: e for e in self.entradas if e.get("chave_url")}
+        self._por_hash = {e["sha256"]: e for e in self.entradas if e.get("sha256")}
+
+    def procurar_pedido(self, url, is_audio, quality_id, info=None):
+        entrada = self.procurar(chave_do_pedido(url, is_audio, quality_id, info))
+        if entrada is None:
+            alternativa = self._por_url.get(chave_por_url(url, "mp3" if is_audio else quality_id))
+            if alternativa is not None:
+                entrada = self.procurar(alternativa["id"])
+        return entrada
+
+    def procurar_local(self, url):
+        # Qualquer formato já baixado do mesmo vídeo serve para exibir (vídeo antes de mp3)
+        prefixo = f"{normalizar_id(url)}:"
+        candidatas = [e for e in self.entradas if e["id"].startswith(prefixo)]
+        candidatas.sort(key=lambda e: e.get("formato") == "mp3")
+        for e in candidatas:
+            entrada = self.procurar(e["id"])
+            if entrada is not None:
+                return entrada
+        return None
+
+    def procurar(self, chave):
+        entrada = self._por_chave.get(chave)
+        if entrada is None:
+            return None
+        # Confere se o arquivo ainda está lá e inteiro (tamanho é barato; o hash fica para o registro)
+        caminho = Path(entrada["arquivo"])
+        if not caminho.exists() or caminho.stat().st_size != entrada.get("tamanho"):
+            self.remover(chave)
+            return None
+        return entrada
+
+    def procurar_por_hash(self, sha256):
+        entrada = self._por_hash.get(sha256)
+        if entrada and Path(entrada["arquivo"]).exists():
+            return entrada
+        return None
+
+    def registrar(self, chave, dados):
+        arquivo = Path(dados["arquivo"])
+        tamanho = arquivo.stat().st_size
+        sha256 = dados.get("sha256") or calcular_hash(arquivo)
+
+        # Mesmo conteúdo já existe com outro nome (ex: "Título (1).mp4"): fica só uma cópia
+        igual = self.procurar_por_hash(sha256)
+        if igual and Path(igual["arquivo"]) != arquivo:
+            arquivo.unlink(missing_ok=True)
+            arquivo = Path(igual["arquivo"])
+            if not dados.get("origem"):
+                # A cópia que fica passa a ser de um download manual: o pré-cache não pode mais apagá-la
+                self.fixar(igual)
+
+        entrada = {
+            "id": chave,
+            "extractor": dados.get("extractor"),
+            "video_id": dados.get("video_id"),
+            "formato": dados.get("formato"),
+            "url": dados.get("url"),
+            "chave_url": chave_por_url(dados.get("url") or "", dados.get("formato")),
+            "titulo": dados.get("titulo"),
+            "arquivo": str(arquivo),
+            "tamanho": tamanho,
+            "sha256": sha256,
+            "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "origem": dados.get("origem"), # "pre_cache" quando baixado sozinho para um evento
+            "ultimo_uso": time.time(),
+        }
+        antiga = self._por_chave.get(chave)
+        if antiga is not None:
+            self.entradas.remove(antiga)
+        self.entradas.append(entrada)
+        self._por_chave[chave] = entrada
+        self._por_url[entrada["chave_url"]] = entrada
+        self._por_hash[sha256] = entrada
+        salvar_item(self.cfg, "historico_downloads", entrada)
+        return entrada
+
+    def marcar_uso(self, entrada):
+        # Base do LRU do pré-cache: arquivo tocado por um evento é o último a sair
+        entrada["ultimo_uso"] = time.time()
+        salvar_item(self.cfg, "historico_downloads", entrada)
+
+    def fixar(self, entrada):
+        # Pedido manual de um arquivo do pré-cache: passa a ser do usuário e nunca é apagado sozinho
+        if entrada.get("origem"):
+            entrada["origem"] = None
+            salvar_item(self.cfg, "historico_downloads", entrada)
+
+    def remover(self, chave):
+        entrada = self._por_chave.pop(chave, None)
+        if entrada is None:
+            return
+        self.entradas.remove(entrada)
+        if self._por_url.get(entrada.get("chave_url")) is entrada:
+            del self._por_url[entrada["chave_url"]]
+        if self._por_hash.get(entrada.get("sha256")) is entrada:
+            del self._por_hash[entrada["sha256"]]
+        remover_item(self.cfg, "historico_downloads", chave)
+
+    def consultar(self, texto=""):
+        texto = texto.strip().lower()
+        resultado = [
+            e for e in self.entradas
+            if not texto or any(texto in str(e.get(campo) or "").lower() for campo in ("titulo", "url", "video_id", "arquivo"))
+        ]
+        return sorted(resultado, key=lambda e: e["data"], reverse=True)
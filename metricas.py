@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal
+from config import METRICAS_DIR
+
+# --- Métricas de Tempo da Agenda ---
+# Para cada disparo: horário agendado, quando o exibidor recebeu (despacho), quando a
+# mídia/processo foi aberto (spawn), o primeiro quadro/página na tela (quando o player ou
+# navegador interno informa) e quanto o fechamento levou. Cada disparo fechado vira uma
+# linha JSON em metricas/tempos.jsonl, que gira ao passar do limite.
+ARQUIVO_METRICAS = "tempos.jsonl"
+LIMITE_ARQUIVO_BYTES = 5 * 1024 * 1024
+ARQUIVOS_GUARDADOS = 5 # tempos.jsonl + tempos.jsonl.1 ... .4
+REGISTROS_EM_MEMORIA = 2000 # Base do painel de estatísticas
+SLA_PADRAO_MS = 500 # Atraso máximo combinado entre o horário e a mídia na tela
+
+# Campos do CSV, na ordem; os atrasos são em ms em relação ao horário agendado
+CAMPOS = ["evento_id", "arquivo", "tipo", "motor", "perdido", "agendado",
+          "atraso_despacho_ms", "atraso_spawn_ms", "atraso_quadro_ms", "fechamento_ms"]
+
+def _ms(inicio, fim):
+    if inicio is None or fim is None:
+        return None
+    return round((fim - inicio) * 1000, 1)
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    # Vizinho mais próximo: sem interpolar, o valor é sempre um disparo real
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+def linha_metrica(medicao):
+    # Registro gravado: timestamps brutos + atrasos já calculados
+    agendado = medicao["agendado"]
+    return {
+        "evento_id": medicao["evento_id"],
+        "arquivo": medicao["arquivo"],
+        "tipo": medicao["tipo"],
+        "motor": medicao.get("motor"),
+        "perdido": medicao.get("perdido", False),
+        "agendado": agendado,
+        "despacho": medicao.get("despacho"),
+        "spawn": medicao.get("spawn"),
+        "primeiro_quadro": medicao.get("primeiro_quadro"),
+        "fechamento_inicio": medicao.get("fechamento_inicio"),
+        "fechamento_fim": medicao.get("fechamento_fim"),
+        "atraso_despacho_ms": _ms(agendado, medicao.get("despacho")),
+        "atraso_spawn_ms": _ms(agendado, medicao.get("spawn")),
+        "atraso_quadro_ms": _ms(agendado, medicao.get("primeiro_quadro")),
+        "fechamento_ms": _ms(medicao.get("fechamento_inicio"), medicao.get("fechamento_fim")),
+    }
+
+class RegistroMetricas(QObject):
+    registrada = pyqtSignal(object) # linha gravada
+
+    def __init__(self, cfg, pasta=METRICAS_DIR, relogio=time.time):
+        super().__init__()
+        self.cfg = cfg
+        self.pasta = pasta
+        self.relogio = relogio
+        self.ativo = cfg.get("metricas_ativas", True)
+        self._abertas = {} # evento_id -> medição do disparo em andamento
+        self.recentes = deque(maxlen=REGISTROS_EM_MEMORIA)
+        self._arquivo = None
+        if self.ativo:
+            self.pasta.mkdir(exist_ok=True)
+            self._carregar_recentes()
+
+    def sla_ms(self):
+        return self.cfg.get("sla_ms", SLA_PADRAO_MS)
+
+    # --- Marcas do ciclo de um disparo ---
+    def despachado(self, ev, agendado):
+        if not self.ativo:
+            return
+        if ev["id"] in self._abertas:
+            # Repetição que começou antes do fechamento da anterior: a anterior vai como está
+            self._gravar(self._abertas.pop(ev["id"]))
+        self._abertas[ev["id"]] = {
+            "evento_id": ev["id"],
+            "arquivo": ev.get("arquivo"),
+            "tipo": ev.get("tipo", "arquivo"),
+            "agendado": agendado,
+            "despacho": self.relogio(),
+        }
+
+    def aberto(self, ev_id, motor):
+        medicao = self._abertas.get(ev_id)
+        if medicao is not None:
+            medicao["spawn"] = self.relogio()
+            medicao["motor"] = motor
+
+    def primeiro_quadro(self, ev_id, latencia):
+        # O player/navegador interno já mede em relação ao horário agendado
+        medicao = self._abertas.get(ev_id)
+        if medicao is not None and "primeiro_quadro" not in medicao:
+            medicao["primeiro_quadro"] = medicao["agendado"] + latencia
+
+    def fechando(self, ev_id):
+        medicao = self._abertas.get(ev_id)
+        if medicao is not None:
+            medicao["fechamento_inicio"] = self.relogio()
+
+    def fechado(self, ev_id, segundos=None):
+        # 'segundos' vem do RegistroProcessos, que mede até o processo realmente sair
+        medicao = self._abertas.get(ev_id)
+        if medicao is None or "fechamento_inicio" not in medicao:
+            return # Ex: processo de um disparo anterior fechado ao abrir o novo
+        del self._abertas[ev_id]
+        inicio = medicao["fechamento_inicio"]
+        if segundos is not None:
+            medicao["fechamento_fim"] = inicio + segundos
+        else:
+            medicao["fechamento_fim"] = self.relogio()
+        self._gravar(medicao)
+
+    def perdido(self, ev, agendado):
+        if self.ativo:
+            self._gravar({"evento_id": ev["id"], "arquivo": ev.get("arquivo"), "tipo": ev.get("tipo", "arquivo"),
+                          "agendado": agendado, "perdido": True})
+
+    def encerrar(self):
+        # Disparos ainda na tela saem sem o tempo de fechamento
+        for ev_id in list(self._abertas):
+            self._gravar(self._abertas.pop(ev_id))
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    # --- Consulta ---
+    def resumo(self):
+        linhas = list(self.recentes)
+        sla = self.sla_ms()
+        resumo = {"disparos": 0, "perdidos": 0, "sla_ms": sla, "dentro_sla": None}
+        for campo in ("atraso_despacho_ms", "atraso_spawn_ms", "atraso_quadro_ms", "fechamento_ms"):
+            valores = [l[campo] for l in linhas if l.get(campo) is not None]
+            resumo[campo] = {
+                "n": len(valores),
+                "p50": percentil(valores, 50),
+                "p95": percentil(valores, 95),
+                "p99": percentil(valores, 99),
+                "max": max(valores) if valores else None,
+            }
+        resumo["perdidos"] = sum(1 for l in linhas if l.get("perdido"))
+        resumo["disparos"] = len(linhas) - resumo["perdidos"]
+        if linhas:
+            # O que o público vê: primeiro quadro quando medido, senão a abertura do processo
+            dentro = 0
+            for l in linhas:
+                atraso = l.get("atraso_quadro_ms") if l.get("atraso_quadro_ms") is not None else l.get("atraso_spawn_ms")
+                if not l.get("perdido") and atraso is not None and atraso <= sla:
+                    dentro += 1
+            resumo["dentro_sla"] = round(dentro * 100 / len(linhas), 1)
+        return resumo
+
+    def ultimas(self, n=50):
+        return list(self.recentes)[-n:] if n > 0 else []
+
+    def exportar_csv(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as saida:
+            saida.write(self.texto_csv())
+
+    def texto_csv(self):
+        # Todos os arquivos da rotação, do mais antigo para o mais novo
+        saida = io.StringIO(newline="")
+        escritor = csv.DictWriter(saida, fieldnames=CAMPOS, extrasaction="ignore")
+        escritor.writeheader()
+        for linha in self._ler_todas():
+            escritor.writerow(linha)
+        return saida.getvalue()
+
+    # --- Arquivo ---
+    def _caminho(self, n=0):
+        return self.pasta / (ARQUIVO_METRICAS if n == 0 else f"{ARQUIVO_METRICAS}.{n}")
+
+    def _gravar(self, medicao):
+        linha = linha_metrica(medicao)
+        self.recentes.append(linha)
+        if self._arquivo is None:
+            self._arquivo = open(self._caminho(), "a", encoding="utf-8")
+        self._arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+        # Uma linha por disparo: flush logo, para não perder medições se o app cair
+        self._arquivo.flush()
+        if self._arquivo.tell() > LIMITE_ARQUIVO_BYTES:
+            self._girar()
+        self.registrada.emit(linha)
+
+    def _girar(self):
+        self._arquivo.close()
+        self._arquivo = None
+        self._caminho(ARQUIVOS_GUARDADOS - 1).unlink(missing_ok=True)
+        for n in range(ARQUIVOS_GUARDADOS - 2, -1, -1):
+            if self._caminho(n).exists():
+                self._caminho(n).replace(self._caminho(n + 1))
+
+    def _ler_arquivo(self, caminho):
+        with open(caminho, encoding="utf-8") as f:
+            for texto in f:
+                try:
+                    yield json.loads(texto)
+                except ValueError:
+                    continue # Linha cortada por uma queda
+
+    def _ler_todas(self):
+        for n in range(ARQUIVOS_GUARDADOS - 1, -1, -1):
+            caminho = self._caminho(n)
+            if caminho.exists():
+                yield from self._ler_arquivo(caminho)
+
+    def _carregar_recentes(self):
+        # O painel abre já com as últimas sessões; só o arquivo atual, para não atrasar a abertura
+        if self._caminho().exists():
+            self.recentes.extend(self._ler_arquivo(self._caminho()))
@@ -0,0 +1,150 @@
+import os
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+from agendador import ler_hora, descrever_regra
+
+# --- Modelo da Lista de Eventos ---
+# A view só pede o texto das linhas visíveis; adicionar ou remover um evento mexe só
+# na linha dele, em vez de apagar e recriar a lista inteira.
+PAPEL_ID = Qt.ItemDataRole.UserRole
+PAPEL_HORA = Qt.ItemDataRole.UserRole + 1 # segundos desde a meia-noite, para ordenar
+PAPEL_MONITOR = Qt.ItemDataRole.UserRole + 2
+PAPEL_ORDEM = Qt.ItemDataRole.UserRole + 3 # ordem de criação
+PAPEL_MONITORES = Qt.ItemDataRole.UserRole + 4 # todas as telas do evento, para o filtro
+
+def texto_evento(ev):
+    conteudo = ev.get('arquivo', '?')
+    if ev.get('tipo') == 'playlist':
+        nome_exibicao = f"{len(ev['itens'])} itens: " + ", ".join(os.path.basename(i) for i in ev['itens'][:3])
+        nome_exibicao += ", ..." if len(ev['itens']) > 3 else ""
+        tipo_icon = "🎞️"
+    else:
+        nome_exibicao = os.path.basename(conteudo) if ev.get('tipo') == 'arquivo' else conteudo
+        tipo_icon = "📄" if ev.get('tipo', 'arquivo') == 'arquivo' else "🌐"
+    monitor_id = "+".join(str(m) for m in ev['monitores']) if ev.get('monitores') else ev.get('monitor', 0)
+    repeticao = f" | 🔁 {descrever_regra(ev['regra'])}" if ev.get('regra') else ""
+    return f"⏰ {ev['hora']}{repeticao} | 📺 Tela {monitor_id} | ⏳ {ev['duracao']}s | {tipo_icon} {nome_exibicao}"
+
+class ModeloEventos(QAbstractListModel):
+    def __init__(self, exibidor):
+        super().__init__()
+        self._linhas = [] # eventos na ordem de criação
+        self._linha_de = {} # id -> linha
+        self._ordem = {} # id -> número de criação (não muda quando outros saem)
+        self._proxima_ordem = 0
+        self._marcados = set()
+        for ev in exibidor.eventos():
+            self._anexar(ev)
+        exibidor.evento_adicionado.connect(self.adicionar)
+        exibidor.eventos_removidos.connect(self.remover)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._linhas)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        ev = self._linhas[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return texto_evento(ev)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "\n".join(ev["itens"]) if ev.get("tipo") == "playlist" else ev.get("arquivo")
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if ev["id"] in self._marcados else Qt.CheckState.Unchecked
+        if role == PAPEL_ID:
+            return ev["id"]
+        if role == PAPEL_HORA:
+            h = ler_hora(ev["hora"])
+            return h.hour * 3600 + h.minute * 60 + h.second
+        if role == PAPEL_MONITOR:
+            return ev.get("monitor", 0)
+        if role == PAPEL_MONITORES:
+            return ev.get("monitores") or [ev.get("monitor", 0)]
+        if role == PAPEL_ORDEM:
+            return self._ordem[ev["id"]]
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        ev_id = self._linhas[index.row()]["id"]
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self._marcados.add(ev_id)
+        else:
+            self._marcados.discard(ev_id)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsUserCheckable
+
+    def marcados(self):
+        return list(self._marcados)
+
+    # --- Mudanças vindas do exibidor ---
+    def adicionar(self, ev):
+        linha = len(self._linhas)
+        self.beginInsertRows(QModelIndex(), linha, linha)
+        self._anexar(ev)
+        self.endInsertRows()
+
+    def remover(self, ids):
+        # Exclusão em lote: linhas seguidas saem num bloco só e as posições são refeitas numa passada
+        linhas = sorted((self._linha_de.pop(i) for i in ids if i in self._linha_de), reverse=True)
+        if not linhas:
+            return
+        for ev_id in ids:
+            self._ordem.pop(ev_id, None)
+            self._marcados.discard(ev_id)
+        blocos = [] # (início, fim), de baixo para cima: tirar um bloco não mexe nos índices dos de cima
+        for linha in linhas:
+            if blocos and linha == blocos[-1][0] - 1:
+                blocos[-1][0] = linha
+            else:
+                blocos.append([linha, linha])
+        # Sem reset: ele obrigaria o filtro a reordenar a lista inteira pelo lessThan em Python
+        for inicio, fim in blocos:
+            self.beginRemoveRows(QModelIndex(), inicio, fim)
+            del self._linhas[inicio:fim + 1]
+            self.endRemoveRows()
+        # Só as linhas abaixo da primeira removida mudam de posição
+        for i in range(linhas[-1], len(self._linhas)):
+            self._linha_de[self._linhas[i]["id"]] = i
+
+    def _anexar(self, ev):
+        self._linha_de[ev["id"]] = len(self._linhas)
+        self._linhas.append(ev)
+        self._ordem[ev["id"]] = self._proxima_ordem
+        self._proxima_ordem += 1
+
+class FiltroEventos(QSortFilterProxyModel):
+    # Ordena por horário/tela/criação e mostra só uma tela ou um trecho do nome
+    def __init__(self, modelo):
+        super().__init__()
+        self.setSourceModel(modelo)
+        self.monitor = None
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        # Com o filtro dinâmico, um evento novo já entra na posição certa
+        self.setDynamicSortFilter(True)
+        self.ordenar_por(PAPEL_HORA)
+
+    def ordenar_por(self, papel):
+        self.setSortRole(papel)
+        self.sort(0)
+
+    def filtrar_monitor(self, monitor):
+        self.monitor = monitor
+        self.invalidateRowsFilter()
+
+    def filterAcceptsRow(self, linha, pai):
+        if self.monitor is not None:
+            indice = self.sourceModel().index(linha, 0, pai)
+            if self.monitor not in indice.data(PAPEL_MONITORES):
+                return False
+        return super().filterAcceptsRow(linha, pai)
+
+    def lessThan(self, esquerda, direita):
+        # Empate (mesmo horário ou mesma tela): mantém a ordem de criação
+        a, b = esquerda.data(self.sortRole()), direita.data(self.sortRole())
+        if a != b:
+            return a < b
+        return esquerda.data(PAPEL_ORDEM) < direita.data(PAPEL_ORDEM)
@@ -0,0 +1,107 @@
+import time
+from PyQt6.QtCore import QObject, QUrl, Qt, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtWebEngineCore import QWebEngineScript
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from telas import tela_do_monitor
+
+# --- Navegador Interno (Eventos de Link) ---
+# A página é aberta escondida na tela do evento alguns segundos antes do horário;
+# no horário a janela só aparece. Vídeos da página (ex: YouTube com autoplay) ficam
+# segurados no início e sem som até a revelação.
+SCRIPT_SEGURAR = """
+window.__jaSegurar = true;
+document.addEventListener('play', function (e) {
+    if (window.__jaSegurar) { e.target.pause(); e.target.currentTime = 0; }
+}, true);
+"""
+SCRIPT_SOLTAR = """
+window.__jaSegurar = false;
+document.querySelectorAll('video, audio').forEach(function (m) { m.currentTime = 0; m.play(); });
+"""
+
+class JanelaNavegador(QWidget):
+    def __init__(self, tela):
+        super().__init__(None, Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
+        self.view = QWebEngineView()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+        script = QWebEngineScript()
+        script.setName("ja_segurar")
+        script.setSourceCode(SCRIPT_SEGURAR)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+        self.view.page().scripts().insert(script)
+        self.view.page().setAudioMuted(True)
+
+        self.setScreen(tela)
+        self.setGeometry(tela.geometry())
+
+    def mostrar(self):
+        self.view.page().setAudioMuted(False)
+        self.view.page().runJavaScript(SCRIPT_SOLTAR)
+        self.showFullScreen()
+        self.raise_()
+        self.activateWindow()
+
+class NavegadorTelas(QObject):
+    iniciado = pyqtSignal(str, float) # id do evento, atraso da exibição (s) em relação ao horário
+
+    def __init__(self, relogio=time.time):
+        super().__init__()
+        self.relogio = relogio
+        self._sessoes = {} # id do evento -> {"janela", "instante", "carregada", "exibida"}
+
+    def preparar(self, ev, instante):
+        self.parar(ev["id"])
+        janela = JanelaNavegador(tela_do_monitor(ev.get("monitor", 0)))
+        sessao = {"janela": janela, "instante": instante, "carregada": None, "exibida": False}
+        self._sessoes[ev["id"]] = sessao
+        janela.view.loadFinished.connect(lambda ok, s=sessao: self._carregou(s, ok))
+        janela.view.load(QUrl(ev["arquivo"]))
+        return janela
+
+    def iniciar(self, ev, instante):
+        sessao = self._sessoes.get(ev["id"])
+        if sessao is None or sessao["instante"] != instante:
+            self.preparar(ev, instante)
+            sessao = self._sessoes[ev["id"]]
+        sessao["janela"].mostrar()
+        sessao["exibida"] = True
+
+        latencia = self.relogio() - instante
+        if sessao["carregada"] is None:
+            print(f"Página exibida com {latencia * 1000:.0f} ms de atraso (ainda carregando).")
+        else:
+            print(f"Página exibida com {latencia * 1000:.0f} ms de atraso "
+                  f"(carregada {instante - sessao['carregada']:.1f}s antes).")
+        self.iniciado.emit(ev["id"], latencia)
+
+    def parar(self, ev_id):
+        sessao = self._sessoes.pop(ev_id, None)
+        if sessao is None:
+            return False
+        janela = sessao["janela"]
+        janela.view.stop()
+        janela.close()
+        janela.deleteLater()
+        return True
+
+    def parar_todos(self):
+        for ev_id in list(self._sessoes):
+            self.parar(ev_id)
+
+    def descartar_preparo(self, ev_id):
+        # Evento removido antes do horário: fecha a página carregada escondida
+        sessao = self._sessoes.get(ev_id)
+        if sessao is not None and not sessao["exibida"]:
+            self.parar(ev_id)
+
+    def _carregou(self, sessao, ok):
+        if not ok:
+            print("Aviso: a página do evento não carregou completamente.")
+        if sessao["carregada"] is None:
+            sessao["carregada"] = self.relogio()
@@ -0,0 +1,39 @@
+from config import gravar_pendente
+from analise import CacheAnalise
+from historico import HistoricoDownloads
+from downloads import GerenciadorDownloads
+from pre_cache import PreCacheEventos
+from banda import GovernadorBanda
+from exibicao import ExibidorEventos
+from transcodificacao import Transcodificador
+
+# --- Núcleo ---
+# Tudo que funciona sem widgets: fila de downloads, conversões, histórico, pré-cache e agenda.
+# A interface (JA_TECH.py) e o serviço (servico.py) montam o mesmo núcleo.
+class Nucleo:
+    def __init__(self, cfg, interno=True):
+        self.cfg = cfg
+        self.cache_analise = CacheAnalise()
+        self.historico = HistoricoDownloads(cfg)
+        self.gerenciador = GerenciadorDownloads(cfg, self.cache_analise, self.historico)
+        # Antes da retomada: se um link da agenda já está no ar, nada volta a baixar com banda cheia
+        self.governador = GovernadorBanda(cfg, self.gerenciador, self.historico)
+        # Downloads cortados pelo fechamento/queda do app continuam de onde pararam
+        retomados = self.gerenciador.retomar_interrompidos()
+        if retomados:
+            print(f"Retomando {retomados} download(s) interrompido(s).")
+        # Baixa sozinho, com a máquina ociosa, os vídeos do YouTube que a agenda vai exibir
+        # Downloads com preset são convertidos pelo pool de ffmpeg assim que terminam
+        self.transcodificador = Transcodificador(cfg, self.gerenciador)
+        self.pre_cache = PreCacheEventos(cfg, self.gerenciador, self.historico)
+        self.exibidor = ExibidorEventos(cfg, self.historico, interno)
+        # Evento novo ou removido pode mudar quando a banda precisa ficar livre
+        self.exibidor.evento_adicionado.connect(lambda _: self.governador.verificar())
+        self.exibidor.eventos_removidos.connect(lambda _: self.governador.verificar())
+
+    def encerrar(self):
+        # Para os downloads mantendo o .part e grava o que estiver no buffer antes de sair
+        self.gerenciador.encerrar()
+        self.transcodificador.encerrar()
+        self.exibidor.metricas.encerrar()
+        gravar_pendente()
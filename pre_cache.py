@@ -0,0 +1,188 @@
+import time
+from datetime import datetime
+from pathlib import Path
+from PyQt6.QtCore import QObject, QTimer
+from config import DOWNLOAD_DIR
+from analise import normalizar_id
+from agendador import proxima_ocorrencia, ler_hora
+from downloads import PENDENTE, BAIXANDO, PAUSADO, ESTADOS_FINAIS
+
+# --- Pré-cache dos Eventos ---
+# Baixa, com a máquina ociosa, os vídeos do YouTube que a agenda vai exibir. Na hora do
+# evento o TelaAgendador encontra a cópia no histórico e toca o arquivo, sem depender da rede.
+ORIGEM_PRE_CACHE = "pre_cache"
+INTERVALO_VERIFICACAO_MS = 60 * 1000
+LIMITE_DISCO_PADRAO_GB = 10 # Uso total da pasta downloads a partir do qual o pré-cache apaga/para
+FORMATO_PRE_CACHE_PADRAO = "bestvideo[height<=1080]"
+ESPERA_APOS_FALHA = 60 * 60 # Um link que falhou só é tentado de novo depois disso
+
+def dentro_da_janela(janela, agora):
+    # janela = ["01:00", "06:00"]; pode virar a meia-noite (ex: ["22:00", "06:00"])
+    if not janela:
+        return True
+    inicio, fim = ler_hora(janela[0]), ler_hora(janela[1])
+    hora = datetime.fromtimestamp(agora).time()
+    if inicio <= fim:
+        return inicio <= hora < fim
+    return hora >= inicio or hora < fim
+
+class PreCacheEventos(QObject):
+    def __init__(self, cfg, gerenciador, historico, relogio=time.time):
+        super().__init__()
+        self.cfg = cfg
+        self.gerenciador = gerenciador
+        self.historico = historico
+        self.relogio = relogio
+        self._jobs = {} # job_id -> chave normalizada do vídeo
+        self._pausados = set() # jobs que o próprio pré-cache pausou por falta de ociosidade
+        self._falhas = {} # chave normalizada -> instante da última falha
+
+        # Jobs de pré-cache que ficaram na fila da sessão anterior continuam sendo nossos
+        for job in gerenciador.jobs():
+            if job.get("origem") == ORIGEM_PRE_CACHE and job["estado"] not in ESTADOS_FINAIS:
+                self._jobs[job["id"]] = normalizar_id(job["url"])
+
+        gerenciador.job_concluido.connect(self._ao_concluir)
+        gerenciador.job_erro.connect(self._ao_erro)
+        # Download manual entrando na fila: reavalia logo, sem esperar o próximo ciclo
+        gerenciador.job_adicionado.connect(lambda _: QTimer.singleShot(0, self.verificar))
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(INTERVALO_VERIFICACAO_MS)
+        self.timer.timeout.connect(self.verificar)
+        self.timer.start()
+
+    # --- Configuração ---
+    def ativo(self):
+        return self.cfg.get("pre_cache_ativo", True)
+
+    def limite_bytes(self):
+        return int(self.cfg.get("pre_cache_limite_gb", LIMITE_DISCO_PADRAO_GB) * 1024 ** 3)
+
+    def formato(self):
+        return self.cfg.get("pre_cache_formato", FORMATO_PRE_CACHE_PADRAO)
+
+    # --- Ciclo ---
+    def verificar(self):
+        if not self.ativo():
+            return
+        agora = self.relogio()
+        self._conferir_jobs(agora)
+        ocioso = self._ocioso(agora)
+
+        for job_id in list(self._jobs):
+            job = self.gerenciador.job(job_id)
+            if not ocioso and job["estado"] in (PENDENTE, BAIXANDO):
+                # Usuário baixando ou evento no ar: o pré-cache sai da frente (o .part fica)
+                self._pausados.add(job_id)
+                self.gerenciador.pausar(job_id)
+            elif ocioso and job_id in self._pausados:
+                self._pausados.discard(job_id)
+                self.gerenciador.retomar(job_id)
+
+        if not ocioso or self._jobs:
+            return # Um vídeo por vez, para não disputar banda com nada
+
+        self.liberar_espaco()
+        if self.uso_disco() >= self.limite_bytes():
+            return
+        pendentes = self.pendentes(agora)
+        if pendentes:
+            ev = pendentes[0]
+            print(f"Pré-cache: baixando {ev['arquivo']}")
+            job_id = self.gerenciador.adicionar(ev["arquivo"], False, self.formato(),
+                                                titulo=f"[Pré-cache] {ev['arquivo']}", origem=ORIGEM_PRE_CACHE)
+            self._jobs[job_id] = normalizar_id(ev["arquivo"])
+
+    def pendentes(self, agora):
+        # Links do YouTube ainda sem cópia local, do próximo a tocar para o mais distante
+        vistos = set()
+        candidatos = []
+        for ev in self.cfg.get("eventos", []):
+            if ev.get("tipo") != "url":
+                continue
+            chave = normalizar_id(ev["arquivo"])
+            if not chave.startswith("youtube:") or chave in vistos:
+                continue
+            vistos.add(chave)
+            if agora - self._falhas.get(chave, 0) < ESPERA_APOS_FALHA:
+                continue
+            if self.historico.procurar_local(ev["arquivo"]) is not None:
+                continue
+            quando = proxima_ocorrencia(ev, agora)
+            if quando is not None: # Regra com data de fim que já passou
+                candidatos.append((quando, ev))
+        candidatos.sort(key=lambda c: c[0])
+        return [ev for _, ev in candidatos]
+
+    # --- Espaço em disco (LRU) ---
+    def uso_disco(self):
+        return sum(f.stat().st_size for f in DOWNLOAD_DIR.iterdir() if f.is_file())
+
+    def liberar_espaco(self):
+        excesso = self.uso_disco() - self.limite_bytes()
+        if excesso <= 0:
+            return
+        # Só sai o que o pré-cache baixou e nenhum evento usa mais; downloads manuais nunca
+        em_uso = {normalizar_id(ev["arquivo"]) for ev in self.cfg.get("eventos", []) if ev.get("tipo") == "url"}
+        candidatas = []
+        protegidos = set() # arquivos que alguma entrada que fica ainda usa
+        for e in self.historico.entradas:
+            if e.get("origem") == ORIGEM_PRE_CACHE and normalizar_id(e.get("url") or "") not in em_uso:
+                candidatas.append(e)
+            else:
+                protegidos.add(e["arquivo"])
+        candidatas.sort(key=lambda e: e.get("ultimo_uso", 0))
+        apagados = set()
+        for entrada in candidatas:
+            if excesso <= 0:
+                break
+            if entrada["arquivo"] in protegidos:
+                # Mesmo conteúdo de um download manual (o histórico guarda uma cópia só): o arquivo fica
+                continue
+            if entrada["arquivo"] not in apagados:
+                apagados.add(entrada["arquivo"])
+                Path(entrada["arquivo"]).unlink(missing_ok=True)
+                excesso -= entrada.get("tamanho", 0)
+                print(f"Pré-cache: {Path(entrada['arquivo']).name} removido para liberar espaço.")
+            self.historico.remover(entrada["id"])
+
+    # --- Internos ---
+    def _ocioso(self, agora):
+        if not dentro_da_janela(self.cfg.get("pre_cache_janela"), agora):
+            return False
+        for job in self.gerenciador.jobs():
+            if job.get("origem") != ORIGEM_PRE_CACHE and job["estado"] in (PENDENTE, BAIXANDO):
+                return False
+        for ev in self.cfg.get("eventos", []):
+            # Começou há menos de 'duracao' segundos: está no ar
+            quando = proxima_ocorrencia(ev, agora - ev.get("duracao", 0))
+            if quando is not None and quando <= agora:
+                return False
+        return True
+
+    def _conferir_jobs(self, agora):
+        for job_id in list(self._jobs):
+            job = self.gerenciador.job(job_id)
+            usuario_mexeu = job is not None and job["estado"] == PAUSADO and job_id not in self._pausados
+            if job is None or job["estado"] in ESTADOS_FINAIS or usuario_mexeu:
+                # Removido, cancelado ou pausado pelo usuário: deixa de ser do pré-cache
+                self._falhas[self._jobs.pop(job_id)] = agora
+                self._pausados.discard(job_id)
+
+    def _ao_concluir(self, job_id, msg):
+        if self._jobs.pop(job_id, None) is None:
+            return
+        self._pausados.discard(job_id)
+        # O arquivo fica no histórico; o job sai da lista para não poluir a tela de downloads
+        self.gerenciador.remover(job_id)
+        QTimer.singleShot(0, self.verificar)
+
+    def _ao_erro(self, job_id, msg):
+        chave = self._jobs.pop(job_id, None)
+        if chave is None:
+            return
+        print(f"Pré-cache falhou ({msg}). Nova tentativa em {ESPERA_APOS_FALHA // 60} min.")
+        self._falhas[chave] = self.relogio()
+        self._pausados.discard(job_id)
+        self.gerenciador.remover(job_id)
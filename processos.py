@@ -0,0 +1,93 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# --- Encerramento de Processos ---
+TEMPO_ENCERRAMENTO_GRACIOSO_MS = 2000 # Depois disso o pedido educado vira kill forçado
+TEMPO_DESISTIR_MS = 10000
+INTERVALO_VERIFICACAO_MS = 50
+
+def opcoes_grupo_processo():
+    # Cada player/navegador ganha o próprio grupo, para fechar a árvore inteira dele e só ela
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def _taskkill(args):
+    # Assíncrono e sem shell: a interface não espera o taskkill terminar
+    subprocess.Popen(["taskkill", *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     creationflags=subprocess.CREATE_NO_WINDOW)
+
+def fechar_janela_por_titulo(trecho):
+    # Último recurso para mídia aberta sem handle (os.startfile): só janelas com esse título
+    if sys.platform == "win32":
+        _taskkill(["/FI", f"WINDOWTITLE eq *{trecho}*", "/F"])
+
+class RegistroProcessos(QObject):
+    fechado = pyqtSignal(str, float) # chave, segundos até o processo sair
+
+    def __init__(self):
+        super().__init__()
+        self._processos = {} # chave -> Popen
+        self._fechando = {} # chave -> [Popen, inicio, forcado]
+        self.timer = QTimer(self)
+        self.timer.setInterval(INTERVALO_VERIFICACAO_MS)
+        self.timer.timeout.connect(self._verificar)
+
+    def iniciar(self, chave, cmd):
+        # Se o mesmo evento ainda tem um processo aberto (ex: disparo do dia anterior), fecha antes
+        self.fechar(chave)
+        processo = subprocess.Popen(cmd, **opcoes_grupo_processo())
+        self._processos[chave] = processo
+        return processo
+
+    def ativo(self, chave):
+        processo = self._processos.get(chave)
+        return processo is not None and processo.poll() is None
+
+    def fechar(self, chave):
+        processo = self._processos.pop(chave, None)
+        if processo is None:
+            return False
+        if processo.poll() is not None:
+            self.fechado.emit(chave, 0.0)
+            return True
+        self._sinalizar(processo, forcar=False)
+        self._fechando[chave] = [processo, time.monotonic(), False]
+        if not self.timer.isActive():
+            self.timer.start()
+        return True
+
+    def fechar_todos(self):
+        for chave in list(self._processos):
+            self.fechar(chave)
+
+    def _sinalizar(self, processo, forcar):
+        try:
+            if sys.platform == "win32":
+                # Sem /F o taskkill pede para a janela fechar; com /F mata a árvore
+                _taskkill(["/PID", str(processo.pid), "/T"] + (["/F"] if forcar else []))
+            else:
+                os.killpg(processo.pid, signal.SIGKILL if forcar else signal.SIGTERM)
+        except OSError:
+            pass # Já saiu
+
+    def _verificar(self):
+        agora = time.monotonic()
+        for chave, item in list(self._fechando.items()):
+            processo, inicio, forcado = item
+            decorrido_ms = (agora - inicio) * 1000
+            if processo.poll() is not None:
+                del self._fechando[chave]
+                self.fechado.emit(chave, agora - inicio)
+            elif decorrido_ms > TEMPO_DESISTIR_MS:
+                del self._fechando[chave]
+                print(f"Aviso: processo {processo.pid} não fechou após {decorrido_ms / 1000:.0f}s.")
+            elif not forcado and decorrido_ms > TEMPO_ENCERRAMENTO_GRACIOSO_MS:
+                self._sinalizar(processo, forcar=True)
+                item[2] = True
+        if not self._fechando:
+            self.timer.stop()
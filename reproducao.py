@@ -0,0 +1,257 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, QUrl, Qt, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QStackedLayout
+from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PyQt6.QtMultimediaWidgets import QVideoWidget
+from telas import tela_do_monitor
+
+# --- Reprodução Interna ---
+# Substitui o VLC externo: a janela e o player são criados antes do horário, a mídia
+# já fica carregada e parada no primeiro quadro, e no horário só falta mostrar e dar play.
+# Eventos de playlist tocam os itens em sequência na mesma janela, trocando entre dois
+# players: enquanto um toca, o outro já carregou o próximo, então a troca não tem buraco.
+# Eventos em várias telas decodificam uma vez só: o player fica na janela da primeira tela
+# e cada quadro dele é repassado às janelas-espelho das outras, que mostram sempre o mesmo quadro.
+
+class JanelaReproducao(QWidget):
+    def __init__(self, tela, camadas=1):
+        super().__init__(None, Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
+        self.setStyleSheet("background-color: black;")
+        self.setCursor(Qt.CursorShape.BlankCursor)
+        # Uma camada = vídeo + player. A playlist usa duas empilhadas: a da frente toca e a
+        # de trás já tem o próximo item carregado e parado no primeiro quadro
+        self.pilha = QStackedLayout()
+        self.pilha.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.pilha)
+        self.camadas = [self._criar_camada() for _ in range(camadas)]
+        if self.camadas:
+            self.video = self.camadas[0]["video"]
+            self.player = self.camadas[0]["player"]
+        else:
+            # Espelho: sem player próprio, só mostra os quadros que recebe
+            self.video = QVideoWidget()
+            self.pilha.addWidget(self.video)
+            self.player = None
+
+        # Posiciona na tela certa já na criação, sem depender do gerenciador de janelas
+        self.setScreen(tela)
+        self.setGeometry(tela.geometry())
+
+    def _criar_camada(self):
+        video = QVideoWidget()
+        player = QMediaPlayer(self)
+        audio = QAudioOutput(self)
+        player.setAudioOutput(audio)
+        player.setVideoOutput(video)
+        self.pilha.addWidget(video)
+        return {"video": video, "player": player, "audio": audio}
+
+    def mostrar(self):
+        self.showFullScreen()
+        self.raise_()
+        self.activateWindow()
+
+    def parar(self):
+        for camada in self.camadas:
+            camada["player"].stop()
+
+class ReprodutorTelas(QObject):
+    iniciado = pyqtSignal(str, float) # id do evento, atraso do primeiro quadro (s) em relação ao horário
+    error = pyqtSignal(str, str)
+
+    def __init__(self, relogio=time.time):
+        super().__init__()
+        self.relogio = relogio
+        self._sessoes = {} # id do evento -> {"janela", "espelhos", "instante", "pronto", "tocar", "itens", ...}
+
+    def preparar(self, ev, instante):
+        # Carrega a mídia e decodifica o primeiro quadro; a janela continua escondida
+        self.parar(ev["id"])
+        itens = ev.get("itens") or [ev["arquivo"]]
+        playlist = ev.get("tipo") == "playlist"
+        monitores = ev.get("monitores") or [ev.get("monitor", 0)]
+        janela = JanelaReproducao(tela_do_monitor(monitores[0]), camadas=2 if playlist else 1)
+        espelhos = [JanelaReproducao(tela_do_monitor(m), camadas=0) for m in monitores[1:]]
+        # 'ativa' é a camada da frente; 'posicao' e 'atras' são os itens da frente e de trás
+        sessao = {"janela": janela, "espelhos": espelhos, "instante": instante, "pronto": False, "tocar": False,
+                  "itens": itens, "ativa": 0, "posicao": 0, "atras": 1 % len(itens), "falhas": 0,
+                  "reportado": False}
+        self._sessoes[ev["id"]] = sessao
+
+        for indice, camada in enumerate(janela.camadas):
+            player = camada["player"]
+            player.mediaStatusChanged.connect(
+                lambda status, ev_id=ev["id"], indice=indice: self._status(ev_id, indice, status))
+            player.errorOccurred.connect(lambda _, msg, ev_id=ev["id"], indice=indice: self._erro(ev_id, indice, msg))
+            if espelhos:
+                camada["video"].videoSink().videoFrameChanged.connect(
+                    lambda quadro, ev_id=ev["id"], indice=indice: self._espelhar(ev_id, indice, quadro))
+            self._carregar(camada, itens[indice % len(itens)])
+        return janela
+
+    def iniciar(self, ev, instante):
+        sessao = self._sessoes.get(ev["id"])
+        if sessao is None or sessao["instante"] != instante:
+            # Sem pré-carga (evento criado em cima da hora, app aberto atrasado): carrega agora
+            self.preparar(ev, instante)
+            sessao = self._sessoes[ev["id"]]
+        sessao["tocar"] = True
+        if sessao["pronto"]:
+            self._tocar(ev["id"])
+        else:
+            print(f"Mídia ainda carregando no horário: {ev['arquivo']}")
+
+    def parar(self, ev_id):
+        sessao = self._sessoes.pop(ev_id, None)
+        if sessao is None:
+            return False
+        janela = sessao["janela"]
+        janela.parar()
+        for j in [janela, *sessao["espelhos"]]:
+            j.close()
+            j.deleteLater()
+        return True
+
+    def parar_todos(self):
+        for ev_id in list(self._sessoes):
+            self.parar(ev_id)
+
+    def descartar_preparo(self, ev_id):
+        # Evento removido antes do horário: libera a janela e os decodificadores já carregados
+        sessao = self._sessoes.get(ev_id)
+        if sessao is not None and not sessao["tocar"]:
+            self.parar(ev_id)
+
+    def _carregar(self, camada, arquivo):
+        camada["falhou"] = False
+        camada["player"].setSource(QUrl.fromLocalFile(arquivo))
+        # pause() com a mídia carregada faz o backend decodificar e segurar o primeiro quadro
+        camada["player"].pause()
+
+    def _status(self, ev_id, indice, status):
+        sessao = self._sessoes.get(ev_id)
+        if sessao is None:
+            return
+        if status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self._erro(ev_id, indice, "Mídia inválida ou formato não suportado")
+            return
+        if indice != sessao["ativa"]:
+            return # Camada de trás: carregou e ficou parada, esperando a vez
+        if status == QMediaPlayer.MediaStatus.EndOfMedia and len(sessao["janela"].camadas) > 1:
+            self._avancar(ev_id)
+            return
+        if sessao["pronto"]:
+            return
+        if status in (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia):
+            sessao["pronto"] = True
+            if sessao["tocar"]:
+                self._tocar(ev_id)
+
+    def _tocar(self, ev_id):
+        sessao = self._sessoes[ev_id]
+        janela = sessao["janela"]
+        camada = janela.camadas[sessao["ativa"]]
+        player = camada["player"]
+        sink = camada["video"].videoSink()
+
+        def primeiro_quadro(_):
+            sink.videoFrameChanged.disconnect(primeiro_quadro)
+            self._reportar(ev_id, sessao)
+
+        if player.hasVideo():
+            sink.videoFrameChanged.connect(primeiro_quadro)
+        janela.pilha.setCurrentWidget(camada["video"])
+        self._mostrar(sessao)
+        player.play()
+        if not player.hasVideo():
+            self._reportar(ev_id, sessao) # Só áudio: o play já é o início
+
+    def _avancar(self, ev_id):
+        # Playlist: a camada de trás (já carregada) vem para a frente e a que saiu carrega o item seguinte
+        sessao = self._sessoes[ev_id]
+        janela = sessao["janela"]
+        saindo = janela.camadas[sessao["ativa"]]
+        sessao["ativa"] = 1 - sessao["ativa"]
+        entrando = janela.camadas[sessao["ativa"]]
+        sessao["posicao"] = sessao["atras"]
+        sessao["atras"] = (sessao["posicao"] + 1) % len(sessao["itens"])
+        player = entrando["player"]
+        sink = entrando["video"].videoSink()
+
+        def trocar():
+            # A camada que saiu segura o último quadro até o primeiro do próximo item chegar
+            janela.pilha.setCurrentWidget(entrando["video"])
+            saindo["player"].stop()
+            self._carregar(saindo, sessao["itens"][sessao["atras"]])
+
+        def comecou():
+            trocar()
+            if not sessao["reportado"]:
+                # O primeiro item falhou no horário: a janela aparece e a medida conta a partir deste
+                self._mostrar(sessao)
+                self._reportar(ev_id, sessao)
+
+        def primeiro_quadro(_):
+            sink.videoFrameChanged.disconnect(primeiro_quadro)
+            sessao["falhas"] = 0
+            comecou()
+
+        if not sessao["tocar"]:
+            # Item com erro antes do horário: só troca os papéis das camadas
+            sessao["pronto"] = player.mediaStatus() in (QMediaPlayer.MediaStatus.LoadedMedia,
+                                                        QMediaPlayer.MediaStatus.BufferedMedia)
+            trocar()
+            return
+        if player.hasVideo():
+            sink.videoFrameChanged.connect(primeiro_quadro)
+        player.play()
+        if not player.hasVideo():
+            comecou()
+
+    def _mostrar(self, sessao):
+        for janela in [sessao["janela"], *sessao["espelhos"]]:
+            janela.mostrar()
+
+    def _espelhar(self, ev_id, indice, quadro):
+        # Mesmo quadro em todas as telas: um decode só, sem relógio para acertar entre elas.
+        # Só a camada da frente é repassada; a de trás (playlist) está parada no próximo item
+        sessao = self._sessoes.get(ev_id)
+        if sessao is None or indice != sessao["ativa"]:
+            return
+        for espelho in sessao["espelhos"]:
+            espelho.video.videoSink().setVideoFrame(quadro)
+
+    def _pular(self, ev_id, sessao, indice):
+        if self._sessoes.get(ev_id) is not sessao:
+            return
+        if indice == sessao["ativa"]:
+            self._avancar(ev_id)
+        else:
+            sessao["atras"] = (sessao["atras"] + 1) % len(sessao["itens"])
+            self._carregar(sessao["janela"].camadas[indice], sessao["itens"][sessao["atras"]])
+
+    def _reportar(self, ev_id, sessao):
+        sessao["reportado"] = True
+        latencia = self.relogio() - sessao["instante"]
+        print(f"Reprodução iniciada com {latencia * 1000:.0f} ms de atraso.")
+        self.iniciado.emit(ev_id, latencia)
+
+    def _erro(self, ev_id, indice, msg):
+        sessao = self._sessoes.get(ev_id)
+        if sessao is None:
+            return
+        camada = sessao["janela"].camadas[indice]
+        if camada.get("falhou"):
+            return # A mesma falha chega pelo status (InvalidMedia) e pelo errorOccurred
+        camada["falhou"] = True
+        if len(sessao["janela"].camadas) > 1 and sessao["falhas"] < len(sessao["itens"]):
+            # Playlist: pula o item com problema em vez de derrubar o bloco inteiro
+            sessao["falhas"] += 1
+            item = sessao["posicao"] if indice == sessao["ativa"] else sessao["atras"]
+            print(f"Item da playlist com erro ({msg}), pulando: {sessao['itens'][item]}")
+            # Fora do sinal de erro: o player ainda vai emitir a mesma falha pelo outro sinal
+            QTimer.singleShot(0, lambda: self._pular(ev_id, sessao, indice))
+            return
+        print(f"Erro na reprodução: {msg}")
+        self.error.emit(ev_id, msg)
+        self.parar(ev_id)
@@ -0,0 +1,536 @@
+import itertools
+import json
+import signal
+import sys
+import time
+from PyQt6.QtCore import QObject, QCoreApplication, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from agendador import ler_hora, validar_regra
+from analise import normalizar_id
+from downloads import ProgressoDownload, BAIXANDO
+from transcodificacao import PRESETS, CONCLUIDA, FALHOU
+
+# --- Serviço Local ---
+# Protocolo: uma mensagem JSON por linha. Pedido {"id", "cmd", "args"} ->
+# resposta {"id", "ok", "resultado"|"erro"}. Quem mandou "assinar" recebe também
+# avisos {"aviso": ..., ...} a cada mudança na fila de downloads, nas conversões ou na agenda.
+NOME_SERVICO = "ja_tech_servico"
+TEMPO_CONEXAO_MS = 200 # Sem serviço a falha é imediata; isso só cobre um serviço ocupado
+TEMPO_RESPOSTA_MS = 10000
+
+def _linha(mensagem):
+    return (json.dumps(mensagem, ensure_ascii=False) + "\n").encode("utf-8")
+
+class ServicoJA(QObject):
+    def __init__(self, nucleo, nome=NOME_SERVICO):
+        super().__init__()
+        self.nucleo = nucleo
+        self.nome = nome
+        self._buffers = {} # conexão -> bytes recebidos ainda sem '\n'
+        self._assinantes = []
+        self.servidor = QLocalServer(self)
+        self.servidor.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.servidor.newConnection.connect(self._nova_conexao)
+
+        g = nucleo.gerenciador
+        g.job_adicionado.connect(lambda jid: self._avisar("job_adicionado", job=g.job(jid)))
+        g.job_atualizado.connect(lambda jid: self._avisar("job_atualizado", job=g.job(jid)))
+        g.job_progresso.connect(lambda jid, p: self._avisar("job_progresso", job_id=jid, progresso=list(p)))
+        g.job_removido.connect(lambda jid: self._avisar("job_removido", job_id=jid))
+        g.job_concluido.connect(lambda jid, msg: self._avisar("job_concluido", job_id=jid, mensagem=msg))
+        g.job_erro.connect(lambda jid, msg: self._avisar("job_erro", job_id=jid, mensagem=msg))
+        nucleo.exibidor.evento_adicionado.connect(lambda ev: self._avisar("evento_adicionado", evento=ev))
+        nucleo.exibidor.eventos_removidos.connect(lambda ids: self._avisar("eventos_removidos", evento_ids=ids))
+        t = nucleo.transcodificador
+        t.tarefa_adicionada.connect(lambda tid: self._avisar("tarefa_adicionada", tarefa=t.tarefa(tid)))
+        t.tarefa_progresso.connect(lambda tid, p: self._avisar("tarefa_progresso", tarefa_id=tid, progresso=p))
+        t.tarefa_concluida.connect(lambda tid, saida: self._avisar("tarefa_concluida", tarefa_id=tid, saida=saida))
+        t.tarefa_erro.connect(lambda tid, msg: self._avisar("tarefa_erro", tarefa_id=tid, mensagem=msg))
+
+    def iniciar(self):
+        # Socket que sobrou de um serviço que caiu impediria o listen
+        QLocalServer.removeServer(self.nome)
+        return self.servidor.listen(self.nome)
+
+    # --- Conexões ---
+    def _nova_conexao(self):
+        while self.servidor.hasPendingConnections():
+            conexao = self.servidor.nextPendingConnection()
+            self._buffers[conexao] = b""
+            conexao.readyRead.connect(lambda c=conexao: self._ler(c))
+            conexao.disconnected.connect(lambda c=conexao: self._desconectar(c))
+
+    def _desconectar(self, conexao):
+        self._buffers.pop(conexao, None)
+        if conexao in self._assinantes:
+            self._assinantes.remove(conexao)
+        conexao.deleteLater()
+
+    def _ler(self, conexao):
+        buffer = self._buffers.get(conexao, b"") + bytes(conexao.readAll())
+        while b"\n" in buffer:
+            linha, buffer = buffer.split(b"\n", 1)
+            if not linha.strip():
+                continue
+            resposta = {"id": None}
+            try:
+                pedido = json.loads(linha)
+                resposta["id"] = pedido.get("id")
+                resposta["resultado"] = self._executar(conexao, pedido.get("cmd"), pedido.get("args") or {})
+                resposta["ok"] = True
+            except Exception as e:
+                resposta["ok"] = False
+                resposta["erro"] = str(e)
+            conexao.write(_linha(resposta))
+        self._buffers[conexao] = buffer
+
+    def _executar(self, conexao, cmd, args):
+        metodo = getattr(self, f"cmd_{cmd}", None)
+        if metodo is None:
+            raise ValueError(f"Comando desconhecido: {cmd}")
+        return metodo(conexao, **args)
+
+    def _avisar(self, tipo, **dados):
+        if not self._assinantes:
+            return
+        dados["aviso"] = tipo
+        mensagem = _linha(dados)
+        for conexao in self._assinantes:
+            conexao.write(mensagem)
+
+    # --- Comandos ---
+    def cmd_estado(self, conexao):
+        g = self.nucleo.gerenciador
+        return {
+            "jobs": g.jobs(),
+            "eventos": self.nucleo.exibidor.eventos(),
+            "max_simultaneos": g.max_simultaneos,
+            "fragmentos_simultaneos": g.fragmentos_simultaneos,
+            "ativos": g.ativos(),
+            "velocidade_recente": g.velocidade_estimada(),
+            "limite_banda": g.limite_banda, # None = livre; 0 ou bytes/s durante transmissão ao vivo
+            "conversoes": list(self.nucleo.transcodificador.tarefas.values()),
+        }
+
+    def cmd_assinar(self, conexao):
+        # Devolve o estado na mesma resposta para o cliente não perder nada entre os dois
+        if conexao not in self._assinantes:
+            self._assinantes.append(conexao)
+        return self.cmd_estado(conexao)
+
+    def cmd_eventos(self, conexao):
+        return self.nucleo.exibidor.eventos()
+
+    def cmd_adicionar_evento(self, conexao, tipo, arquivo, hora, duracao, monitor=0, regra=None, itens=None,
+                             monitores=None):
+        if tipo not in ("arquivo", "url", "playlist"):
+            raise ValueError(f"Tipo inválido: {tipo}")
+        if tipo == "playlist" and not itens:
+            raise ValueError("Playlist sem itens.")
+        if monitores and tipo == "url":
+            raise ValueError("Links abrem em uma tela só.")
+        # Valida antes de entrar na agenda
+        ler_hora(hora)
+        if regra:
+            validar_regra(regra)
+        monitores = [int(m) for m in monitores] if monitores else None
+        return self.nucleo.exibidor.adicionar_evento(tipo, arquivo, hora, int(duracao), int(monitor), regra, itens,
+                                                     monitores)
+
+    def cmd_remover_eventos(self, conexao, ids):
+        self.nucleo.exibidor.remover_eventos(ids)
+
+    def cmd_downloads(self, conexao):
+        return self.nucleo.gerenciador.jobs()
+
+    def cmd_baixar(self, conexao, url, is_audio=False, quality_id=None, titulo=None, preset=None, info=None):
+        if preset and preset not in PRESETS:
+            raise ValueError(f"Preset desconhecido: {preset}")
+        if info:
+            # Análise feita na janela: o worker do serviço baixa direto, sem extrair de novo
+            self.nucleo.cache_analise.guardar(normalizar_id(url), info)
+        quality_id = quality_id or ("best_audio" if is_audio else "bestvideo")
+        return self.nucleo.gerenciador.adicionar(url, is_audio, quality_id, titulo, preset=preset)
+
+    def cmd_pausar(self, conexao, job_id):
+        self.nucleo.gerenciador.pausar(job_id)
+
+    def cmd_retomar(self, conexao, job_id):
+        self.nucleo.gerenciador.retomar(job_id)
+
+    def cmd_cancelar(self, conexao, job_id):
+        self.nucleo.gerenciador.cancelar(job_id)
+
+    def cmd_tentar_novamente(self, conexao, job_id):
+        self.nucleo.gerenciador.tentar_novamente(job_id)
+
+    def cmd_remover_download(self, conexao, job_id):
+        self.nucleo.gerenciador.remover(job_id)
+
+    def cmd_limpar_finalizados(self, conexao):
+        self.nucleo.gerenciador.limpar_finalizados()
+
+    def cmd_definir_max_simultaneos(self, conexao, valor):
+        self.nucleo.gerenciador.definir_max_simultaneos(valor)
+
+    def cmd_definir_fragmentos_simultaneos(self, conexao, valor):
+        self.nucleo.gerenciador.definir_fragmentos_simultaneos(valor)
+
+    def cmd_converter(self, conexao, arquivo, preset):
+        return self.nucleo.transcodificador.adicionar(arquivo, preset)
+
+    def cmd_conversoes(self, conexao):
+        return list(self.nucleo.transcodificador.tarefas.values())
+
+    def cmd_cancelar_conversao(self, conexao, tarefa_id):
+        self.nucleo.transcodificador.cancelar(tarefa_id)
+
+    def cmd_metricas(self, conexao, n=50):
+        metricas = self.nucleo.exibidor.metricas
+        return {"resumo": metricas.resumo(), "ultimas": metricas.ultimas(n)}
+
+    def cmd_exportar_metricas(self, conexao):
+        # Devolve o CSV em vez de gravar: quem pediu escolhe onde salvar, o serviço não escreve
+        # em caminhos vindos de fora
+        return self.nucleo.exibidor.metricas.texto_csv()
+
+    def cmd_historico(self, conexao, texto=""):
+        return self.nucleo.historico.consultar(texto)
+
+    def cmd_encerrar(self, conexao):
+        # Depois da resposta sair
+        QTimer.singleShot(100, QCoreApplication.quit)
+
+# --- Cliente ---
+class ClienteServico(QObject):
+    aviso = pyqtSignal(object)
+    desconectado = pyqtSignal()
+
+    def __init__(self, socket):
+        super().__init__()
+        self.socket = socket
+        self._buffer = b""
+        self._seq = itertools.count(1)
+        self._aguardando = set()
+        self._respostas = {}
+        self._retornos = {} # pedido_id -> (retorno, erro) dos pedidos que não travam quem pediu
+        self.socket.readyRead.connect(self._ler)
+        self.socket.disconnected.connect(self._ao_desconectar)
+
+    @staticmethod
+    def conectar(nome=NOME_SERVICO, espera_ms=TEMPO_CONEXAO_MS):
+        socket = QLocalSocket()
+        socket.connectToServer(nome)
+        if not socket.waitForConnected(espera_ms):
+            return None
+        return ClienteServico(socket)
+
+    def conectado(self):
+        return self.socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    def enviar(self, cmd, **args):
+        # Sem esperar resposta; se der erro ele só aparece no log
+        if not self.conectado():
+            # Quem usa o cliente fica sabendo pelo sinal 'desconectado'
+            print(f"Serviço desconectado: '{cmd}' não foi enviado.")
+            return None
+        pedido_id = next(self._seq)
+        self.socket.write(_linha({"id": pedido_id, "cmd": cmd, "args": args}))
+        self.socket.flush()
+        return pedido_id
+
+    def pedir(self, cmd, **args):
+        # Trava até a resposta: serve à linha de comando; na janela, use pedir_depois
+        pedido_id = self.enviar(cmd, **args)
+        if pedido_id is None:
+            raise ConnectionError("O serviço não está conectado.")
+        self._aguardando.add(pedido_id)
+        limite = time.monotonic() + TEMPO_RESPOSTA_MS / 1000
+        while pedido_id not in self._respostas:
+            restante_ms = int((limite - time.monotonic()) * 1000)
+            if restante_ms <= 0 or not self.socket.waitForReadyRead(restante_ms):
+                self._aguardando.discard(pedido_id)
+                raise ConnectionError("O serviço não respondeu.")
+            self._ler()
+        resposta = self._respostas.pop(pedido_id)
+        if not resposta["ok"]:
+            raise RuntimeError(resposta["erro"])
+        return resposta.get("resultado")
+
+    def pedir_depois(self, cmd, retorno, erro=None, **args):
+        # A resposta chega por 'retorno' (ou a falha por 'erro') quando o serviço responder
+        pedido_id = self.enviar(cmd, **args)
+        if pedido_id is None:
+            if erro:
+                erro("O serviço não está conectado.")
+            return
+        self._retornos[pedido_id] = (retorno, erro)
+
+    def fechar(self):
+        self.socket.disconnectFromServer()
+
+    def _ao_desconectar(self):
+        retornos, self._retornos = self._retornos, {}
+        for _, erro in retornos.values():
+            if erro:
+                erro("O serviço foi desconectado.")
+        self.desconectado.emit()
+
+    def _ler(self):
+        self._buffer += bytes(self.socket.readAll())
+        while b"\n" in self._buffer:
+            linha, self._buffer = self._buffer.split(b"\n", 1)
+            mensagem = json.loads(linha)
+            if "aviso" in mensagem:
+                self.aviso.emit(mensagem)
+            elif mensagem.get("id") in self._aguardando:
+                self._aguardando.discard(mensagem["id"])
+                self._respostas[mensagem["id"]] = mensagem
+            elif mensagem.get("id") in self._retornos:
+                retorno, erro = self._retornos.pop(mensagem["id"])
+                if mensagem["ok"]:
+                    retorno(mensagem.get("resultado"))
+                elif erro:
+                    erro(mensagem["erro"])
+                else:
+                    print(f"Erro no serviço: {mensagem['erro']}")
+            elif not mensagem.get("ok"):
+                print(f"Erro no serviço: {mensagem.get('erro')}")
+
+class GerenciadorRemoto(QObject):
+    # Mesma interface do GerenciadorDownloads, para a TelaDownload não saber a diferença
+    job_adicionado = pyqtSignal(str)
+    job_atualizado = pyqtSignal(str)
+    job_progresso = pyqtSignal(str, object)
+    job_removido = pyqtSignal(str)
+    job_concluido = pyqtSignal(str, str)
+    job_erro = pyqtSignal(str, str)
+
+    def __init__(self, cliente, estado, cache_analise=None):
+        super().__init__()
+        self.cliente = cliente
+        self.cache_analise = cache_analise
+        self.fila = estado["jobs"]
+        self._jobs = {job["id"]: job for job in self.fila}
+        self.max_simultaneos = estado["max_simultaneos"]
+        self.fragmentos_simultaneos = estado["fragmentos_simultaneos"]
+        self.velocidade_recente = estado.get("velocidade_recente")
+        self._velocidades = {}
+        cliente.aviso.connect(self._ao_aviso)
+
+    def job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        return list(self.fila)
+
+    def ativos(self, origem=None):
+        return sum(1 for j in self.fila if j["estado"] == BAIXANDO and (origem is None or j.get("origem") == origem))
+
+    def velocidade_estimada(self):
+        return sum(self._velocidades.values()) or self.velocidade_recente
+
+    def adicionar(self, url, is_audio, quality_id, titulo=None, preset=None):
+        info = self.cache_analise.obter(normalizar_id(url)) if self.cache_analise else None
+        if info is not None:
+            import yt_dlp
+            # O info do yt-dlp pode ter objetos que não viram JSON
+            info = yt_dlp.YoutubeDL.sanitize_info(info)
+        self.cliente.enviar("baixar", url=url, is_audio=is_audio, quality_id=quality_id, titulo=titulo, preset=preset,
+                            info=info)
+
+    def pausar(self, job_id):
+        self.cliente.enviar("pausar", job_id=job_id)
+
+    def retomar(self, job_id):
+        self.cliente.enviar("retomar", job_id=job_id)
+
+    def cancelar(self, job_id):
+        self.cliente.enviar("cancelar", job_id=job_id)
+
+    def tentar_novamente(self, job_id):
+        self.cliente.enviar("tentar_novamente", job_id=job_id)
+
+    def remover(self, job_id):
+        self.cliente.enviar("remover_download", job_id=job_id)
+
+    def limpar_finalizados(self):
+        self.cliente.enviar("limpar_finalizados")
+
+    def definir_max_simultaneos(self, valor):
+        self.max_simultaneos = max(1, int(valor))
+        self.cliente.enviar("definir_max_simultaneos", valor=self.max_simultaneos)
+
+    def definir_fragmentos_simultaneos(self, valor):
+        self.fragmentos_simultaneos = max(1, int(valor))
+        self.cliente.enviar("definir_fragmentos_simultaneos", valor=self.fragmentos_simultaneos)
+
+    def encerrar(self):
+        # Os downloads continuam no serviço; só a conexão é fechada
+        self.cliente.fechar()
+
+    def _ao_aviso(self, aviso):
+        tipo = aviso["aviso"]
+        if tipo == "job_adicionado":
+            job = aviso["job"]
+            self.fila.append(job)
+            self._jobs[job["id"]] = job
+            self.job_adicionado.emit(job["id"])
+        elif tipo == "job_atualizado" and aviso["job"]["id"] in self._jobs:
+            if aviso["job"]["estado"] != BAIXANDO:
+                velocidade = sum(self._velocidades.values())
+                if self._velocidades.pop(aviso["job"]["id"], None) and velocidade:
+                    self.velocidade_recente = velocidade
+            self._jobs[aviso["job"]["id"]].update(aviso["job"])
+            self.job_atualizado.emit(aviso["job"]["id"])
+        elif tipo == "job_progresso" and aviso["job_id"] in self._jobs:
+            progresso = ProgressoDownload(*aviso["progresso"])
+            job = self._jobs[aviso["job_id"]]
+            job["progresso"] = progresso.percentual
+            job["mensagem"] = progresso.texto()
+            if progresso.velocidade:
+                self._velocidades[aviso["job_id"]] = progresso.velocidade
+            self.job_progresso.emit(aviso["job_id"], progresso)
+        elif tipo == "job_removido":
+            job = self._jobs.pop(aviso["job_id"], None)
+            if job is not None:
+                self.fila.remove(job)
+                self.job_removido.emit(aviso["job_id"])
+        elif tipo == "job_concluido":
+            self.job_concluido.emit(aviso["job_id"], aviso["mensagem"])
+        elif tipo == "job_erro":
+            self.job_erro.emit(aviso["job_id"], aviso["mensagem"])
+
+class ExibidorRemoto(QObject):
+    # Mesma interface de eventos do ExibidorEventos; quem dispara é o serviço
+    evento_adicionado = pyqtSignal(object)
+    eventos_removidos = pyqtSignal(list)
+
+    def __init__(self, cliente, estado):
+        super().__init__()
+        self.cliente = cliente
+        self._eventos = estado["eventos"]
+        self.metricas = MetricasRemotas(cliente)
+        cliente.aviso.connect(self._ao_aviso)
+
+    def eventos(self):
+        return self._eventos
+
+    def telas_sincronizadas(self):
+        return False # O serviço só usa players externos
+
+    def adicionar_evento(self, tipo, arquivo, hora, duracao, monitor=0, regra=None, itens=None, monitores=None):
+        self.cliente.enviar("adicionar_evento", tipo=tipo, arquivo=arquivo, hora=hora, duracao=duracao,
+                            monitor=monitor, regra=regra, itens=itens, monitores=monitores)
+
+    def remover_eventos(self, ids):
+        self.cliente.enviar("remover_eventos", ids=list(ids))
+
+    def _ao_aviso(self, aviso):
+        if aviso["aviso"] == "evento_adicionado":
+            self._eventos.append(aviso["evento"])
+            self.evento_adicionado.emit(aviso["evento"])
+        elif aviso["aviso"] == "eventos_removidos":
+            ids = set(aviso["evento_ids"])
+            self._eventos[:] = [e for e in self._eventos if e["id"] not in ids]
+            self.eventos_removidos.emit(aviso["evento_ids"])
+
+class MetricasRemotas:
+    # Mesma consulta do RegistroMetricas; os tempos são medidos no serviço
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def resumo(self):
+        return self.cliente.pedir("metricas", n=0)["resumo"]
+
+    def ultimas(self, n=50):
+        return self.cliente.pedir("metricas", n=n)["ultimas"]
+
+    def consultar_depois(self, n, retorno, erro=None):
+        # {"resumo", "ultimas"} sem travar a janela; o painel redesenha quando chegar
+        self.cliente.pedir_depois("metricas", retorno, erro, n=n)
+
+    def exportar_csv(self, caminho):
+        texto = self.cliente.pedir("exportar_metricas")
+        with open(caminho, "w", newline="", encoding="utf-8") as saida:
+            saida.write(texto)
+
+class TranscodificadorRemoto(QObject):
+    # Mesma interface do Transcodificador; as conversões rodam no serviço
+    tarefa_adicionada = pyqtSignal(str)
+    tarefa_progresso = pyqtSignal(str, int)
+    tarefa_concluida = pyqtSignal(str, str)
+    tarefa_erro = pyqtSignal(str, str)
+
+    def __init__(self, cliente, estado):
+        super().__init__()
+        self.cliente = cliente
+        self.tarefas = {t["id"]: t for t in estado.get("conversoes", [])}
+        cliente.aviso.connect(self._ao_aviso)
+
+    def tarefa(self, tarefa_id):
+        return self.tarefas.get(tarefa_id)
+
+    def adicionar(self, arquivo, preset, job_id=None):
+        self.cliente.enviar("converter", arquivo=str(arquivo), preset=preset)
+
+    def cancelar(self, tarefa_id):
+        self.cliente.enviar("cancelar_conversao", tarefa_id=tarefa_id)
+
+    def _ao_aviso(self, aviso):
+        tipo = aviso["aviso"]
+        if tipo == "tarefa_adicionada":
+            self.tarefas[aviso["tarefa"]["id"]] = aviso["tarefa"]
+            self.tarefa_adicionada.emit(aviso["tarefa"]["id"])
+        elif tipo == "tarefa_progresso" and aviso["tarefa_id"] in self.tarefas:
+            self.tarefas[aviso["tarefa_id"]]["progresso"] = aviso["progresso"]
+            self.tarefa_progresso.emit(aviso["tarefa_id"], aviso["progresso"])
+        elif tipo == "tarefa_concluida" and aviso["tarefa_id"] in self.tarefas:
+            self.tarefas[aviso["tarefa_id"]].update(estado=CONCLUIDA, progresso=100, saida=aviso["saida"])
+            self.tarefa_concluida.emit(aviso["tarefa_id"], aviso["saida"])
+        elif tipo == "tarefa_erro" and aviso["tarefa_id"] in self.tarefas:
+            self.tarefas[aviso["tarefa_id"]].update(estado=FALHOU, mensagem=aviso["mensagem"])
+            self.tarefa_erro.emit(aviso["tarefa_id"], aviso["mensagem"])
+
+class HistoricoRemoto:
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def consultar(self, texto=""):
+        return self.cliente.pedir("historico", texto=texto)
+
+    def consultar_depois(self, texto, retorno, erro=None):
+        self.cliente.pedir_depois("historico", retorno, erro, texto=texto)
+
+# --- Execução sem janela ---
+def main():
+    # QGuiApplication e não QApplication: sem widgets, mas com a lista de monitores
+    from PyQt6.QtGui import QGuiApplication
+    from config import carregar_config
+    from nucleo import Nucleo
+
+    app = QGuiApplication(sys.argv)
+    if ClienteServico.conectar() is not None:
+        print("Já existe um serviço JA TECH rodando.")
+        return 1
+
+    # Sem janelas: os eventos abrem nos players externos (sem pré-carga nem sincronia entre telas)
+    nucleo = Nucleo(carregar_config(), interno=False)
+    servico = ServicoJA(nucleo)
+    if not servico.iniciar():
+        print(f"Não foi possível abrir o socket local: {servico.servidor.errorString()}")
+        return 1
+    app.aboutToQuit.connect(nucleo.encerrar)
+
+    # Ctrl+C: o Python só trata o sinal quando volta a rodar código, daí o timer vazio
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    acordar = QTimer()
+    acordar.timeout.connect(lambda: None)
+    acordar.start(500)
+
+    print(f"Serviço JA TECH rodando ({servico.servidor.fullServerName()}). Ctrl+C para parar.")
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+from PyQt6.QtGui import QGuiApplication
+
+# --- Telas (Monitores) ---
+# QGuiApplication basta: o serviço sem janela também precisa saber onde fica cada monitor
+def tela_do_monitor(indice):
+    telas = QGuiApplication.screens()
+    if indice < len(telas):
+        return telas[indice]
+    print(f"Aviso: Monitor {indice} não existe. Usando principal.")
+    return QGuiApplication.primaryScreen()
@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QCoreApplication
+from agendador import AgendadorEventos, FilaEventos, proxima_ocorrencia, validar_regra
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+HORARIO = datetime(2026, 3, 2, 12, 0).timestamp()
+
+class TestReinicioDentroDaTolerancia(unittest.TestCase):
+    def reabrir(self, ev, agora):
+        # App aberto de novo 'agora': a agenda carrega e processa o que está vencido
+        agendador = AgendadorEventos([], relogio=lambda: agora)
+        disparos = []
+        agendador.disparar.connect(lambda ev, quando: disparos.append(quando))
+        agendador.recarregar([ev])
+        agendador.processar()
+        agendador.timer.stop()
+        return disparos
+
+    def test_ocorrencia_perdida_ainda_dispara(self):
+        ev = {"id": "a", "hora": "12:00", "duracao": 10}
+        self.assertEqual(self.reabrir(ev, HORARIO + 30), [HORARIO])
+
+    def test_ocorrencia_ja_disparada_nao_repete(self):
+        ev = {"id": "a", "hora": "12:00", "duracao": 10, "ultimo_disparo": HORARIO}
+        self.assertEqual(self.reabrir(ev, HORARIO + 30), [])
+
+    def test_repeticao_seguinte_continua_valendo(self):
+        regra = {"intervalo_min": 5, "repetir_ate": "13:00"}
+        ev = {"id": "a", "hora": "12:00", "duracao": 10, "regra": regra, "ultimo_disparo": HORARIO}
+        self.assertEqual(self.reabrir(ev, HORARIO + 5 * 60 + 30), [HORARIO + 5 * 60])
+
+class TestFilaEventos(unittest.TestCase):
+    def evento(self, ev_id, hora):
+        return {"id": ev_id, "hora": hora, "duracao": 10}
+
+    def test_removido_nao_dispara(self):
+        fila = FilaEventos()
+        fila.carregar([self.evento("a", "12:00"), self.evento("b", "12:05")], HORARIO - 60)
+        fila.remover("a")
+        self.assertEqual(fila.proximo_instante(), HORARIO + 5 * 60)
+        vencidos = fila.retirar_vencidos(HORARIO + 5 * 60)
+        self.assertEqual([ev["id"] for ev, _, _ in vencidos], ["b"])
+
+    def test_readicionado_vale_so_o_horario_novo(self):
+        fila = FilaEventos()
+        ev = self.evento("a", "12:00")
+        fila.adicionar(ev, HORARIO - 60)
+        fila.remover("a")
+        ev = self.evento("a", "12:10")
+        fila.adicionar(ev, HORARIO - 60)
+        # A entrada antiga das 12:00 continua no heap, mas não vale mais
+        self.assertEqual(fila.retirar_vencidos(HORARIO + 5 * 60), [])
+        self.assertEqual(fila.proximo_instante(), HORARIO + 10 * 60)
+        self.assertEqual(len(fila), 1)
+
+    def test_muitas_remocoes_reconstroem_o_heap(self):
+        fila = FilaEventos()
+        eventos = [self.evento(str(i), f"12:{i % 60:02d}") for i in range(200)]
+        fila.carregar(eventos, HORARIO - 60)
+        for ev in eventos[:190]:
+            fila.remover(ev["id"])
+        self.assertEqual(len(fila), 10)
+        self.assertLessEqual(len(fila._heap), 2 * len(fila) + 32)
+        vencidos = fila.retirar_vencidos(HORARIO + 3600)
+        self.assertEqual(sorted(ev["id"] for ev, _, _ in vencidos), sorted(str(i) for i in range(190, 200)))
+
+def instante(dia, hora, minuto=0):
+    return datetime(2026, 3, dia, hora, minuto).timestamp()
+
+class TestProximaOcorrencia(unittest.TestCase):
+    # 02/03/2026 é uma segunda-feira
+    def test_sem_regra_toca_todo_dia(self):
+        ev = {"hora": "12:00"}
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 11)), instante(2, 12))
+        # Estritamente depois: no próprio horário já é o dia seguinte
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 12)), instante(3, 12))
+
+    def test_dias_da_semana(self):
+        ev = {"hora": "08:00", "regra": {"dias_semana": [0, 2, 4]}}
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 9)), instante(4, 8))
+        self.assertEqual(proxima_ocorrencia(ev, instante(6, 9)), instante(9, 8)) # sexta -> segunda
+
+    def test_intervalo_ate_o_fim_do_dia(self):
+        ev = {"hora": "08:00", "regra": {"intervalo_min": 15, "repetir_ate": "09:00"}}
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 8, 20)), instante(2, 8, 30))
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 8, 45)), instante(2, 9))
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 9)), instante(3, 8))
+
+    def test_periodo(self):
+        ev = {"hora": "10:00", "regra": {"data_inicio": "2026-03-10", "data_fim": "2026-03-11"}}
+        self.assertEqual(proxima_ocorrencia(ev, instante(2, 0)), instante(10, 10))
+        self.assertEqual(proxima_ocorrencia(ev, instante(11, 10)), None)
+
+    def test_regra_invalida(self):
+        for regra in ({"dias_semana": []}, {"dias_semana": [7]}, {"intervalo_min": -5},
+                      {"data_inicio": "2026-03-10", "data_fim": "2026-03-01"}):
+            with self.assertRaises(ValueError):
+                validar_regra(regra)
+        validar_regra({"dias_semana": [0, 6], "intervalo_min": 5, "repetir_ate": "18:00"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analise
+from analise import CacheAnalise, normalizar_id
+
+class TestCacheAnalise(unittest.TestCase):
+    def setUp(self):
+        self.agora = 1000.0
+        patcher = mock.patch.object(analise.time, "monotonic", lambda: self.agora)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_expira_depois_do_ttl(self):
+        cache = CacheAnalise(ttl=60)
+        cache.guardar("a", {"id": "a"})
+        self.agora += 60
+        self.assertEqual(cache.obter("a"), {"id": "a"})
+        self.agora += 1
+        self.assertIsNone(cache.obter("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_descarta_o_usado_ha_mais_tempo(self):
+        cache = CacheAnalise(max_itens=2)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        cache.obter("a") # 'a' passa a ser o mais recente
+        cache.guardar("c", 3)
+        self.assertIsNone(cache.obter("b"))
+        self.assertEqual((cache.obter("a"), cache.obter("c")), (1, 3))
+
+    def test_guardar_de_novo_renova(self):
+        cache = CacheAnalise(ttl=60)
+        cache.guardar("a", 1)
+        self.agora += 50
+        cache.guardar("a", 2)
+        self.agora += 50
+        self.assertEqual(cache.obter("a"), 2)
+
+class TestNormalizarId(unittest.TestCase):
+    def test_links_do_mesmo_video(self):
+        chaves = {normalizar_id(url) for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30",
+            "https://youtu.be/dQw4w9WgXcQ",
+            "youtube.com/shorts/dQw4w9WgXcQ",
+            "https://m.youtube.com/watch?v=dQw4w9WgXcQ#comentarios",
+        )}
+        self.assertEqual(chaves, {"youtube:dQw4w9WgXcQ"})
+
+    def test_outros_sites(self):
+        self.assertEqual(normalizar_id("https://vimeo.com/123#t=5"), "vimeo.com/123")
+
+if __name__ == "__main__":
+    unittest.main()
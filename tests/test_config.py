@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QCoreApplication
+import config
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class BaseArmazenamento:
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+
+    def usar(self, armazenamento):
+        # Troca o gravador global do módulo pelo deste backend
+        gravador = config.Gravador(armazenamento)
+        patcher = mock.patch.object(config, "_gravador", gravador)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: gravador.timer and gravador.timer.stop())
+        return gravador
+
+    def test_ida_e_volta(self):
+        gravador = self.usar(self.criar())
+        cfg = gravador.armazenamento.carregar()
+        cfg["eventos"] = [{"id": "a", "hora": "12:00"}, {"id": "b", "hora": "13:00"}]
+        config.salvar_config(cfg)
+        config.gravar_pendente()
+
+        cfg["eventos"][0]["hora"] = "12:30"
+        config.salvar_item(cfg, "eventos", cfg["eventos"][0])
+        novo = {"id": "c", "hora": "14:00"}
+        cfg["eventos"].append(novo)
+        config.salvar_item(cfg, "eventos", novo)
+        cfg["eventos"].pop(1)
+        config.remover_item(cfg, "eventos", "b")
+        cfg["max_simultaneos"] = 5
+        config.salvar_chave(cfg, "max_simultaneos")
+        config.gravar_pendente()
+
+        lido = self.criar().carregar()
+        self.assertEqual(lido["eventos"], [{"id": "a", "hora": "12:30"}, {"id": "c", "hora": "14:00"}])
+        self.assertEqual(lido["max_simultaneos"], 5)
+
+    def test_falha_mantem_o_pendente(self):
+        gravador = self.usar(self.criar())
+        cfg = gravador.armazenamento.carregar()
+        item = {"id": "a", "hora": "12:00"}
+        cfg["eventos"].append(item)
+        config.salvar_item(cfg, "eventos", item)
+        with mock.patch.object(gravador.armazenamento, "gravar", side_effect=OSError("disco cheio")):
+            gravador.gravar_pendente()
+        self.assertIn(("eventos", "a"), gravador.pendente["itens"])
+        gravador.gravar_pendente()
+        self.assertEqual(self.criar().carregar()["eventos"], [item])
+
+class TestArmazenamentoJSON(BaseArmazenamento, unittest.TestCase):
+    def criar(self):
+        return config.ArmazenamentoJSON(Path(self.pasta.name) / "configuracoes.json")
+
+    def test_diario_reaplicado_e_compactado(self):
+        gravador = self.usar(self.criar())
+        cfg = gravador.armazenamento.carregar()
+        item = {"id": "a", "hora": "12:00"}
+        cfg["eventos"].append(item)
+        config.salvar_item(cfg, "eventos", item)
+        gravador.gravar_pendente()
+        diario = gravador.armazenamento.diario
+        self.assertTrue(diario.exists())
+        # Queda no meio da próxima escrita: a linha cortada é ignorada e descartada
+        with open(diario, "a", encoding="utf-8") as f:
+            f.write('{"colecao": "eventos", "item": {"id": "b"')
+        self.assertEqual(self.criar().carregar()["eventos"], [item])
+
+        config.gravar_pendente() # Fechar o app junta o diário ao arquivo principal
+        self.assertFalse(diario.exists())
+        self.assertEqual(self.criar().carregar()["eventos"], [item])
+
+class TestArmazenamentoSQLite(BaseArmazenamento, unittest.TestCase):
+    def criar(self):
+        armazenamento = config.ArmazenamentoSQLite(Path(self.pasta.name) / "configuracoes.db")
+        self.addCleanup(armazenamento.conexao.close)
+        return armazenamento
+
+    def test_importa_o_json_existente(self):
+        legado = config.ArmazenamentoJSON(Path(self.pasta.name) / "configuracoes.json")
+        cfg = legado.carregar()
+        cfg["eventos"] = [{"id": "a", "hora": "12:00"}]
+        legado.gravar(cfg, {"tudo": True})
+        armazenamento = config.ArmazenamentoSQLite(Path(self.pasta.name) / "configuracoes.db", json_legado=legado)
+        self.addCleanup(armazenamento.conexao.close)
+        armazenamento.carregar()
+        self.assertEqual(self.criar().carregar()["eventos"], [{"id": "a", "hora": "12:00"}])
+
+if __name__ == "__main__":
+    unittest.main()
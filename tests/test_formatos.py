@@ -0,0 +1,53 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from formatos import ranquear_formatos
+
+def video(format_id, altura, vcodec="avc1.640028", ext="mp4", fps=30, tbr=1000, acodec="none"):
+    return {"format_id": format_id, "height": altura, "vcodec": vcodec, "acodec": acodec, "ext": ext, "fps": fps,
+            "tbr": tbr}
+
+def audio(format_id, ext, abr):
+    return {"format_id": format_id, "vcodec": "none", "acodec": "mp4a" if ext == "m4a" else "opus", "ext": ext,
+            "abr": abr}
+
+class TestRanquearFormatos(unittest.TestCase):
+    def test_prefere_codec_leve_que_junta_sem_reconverter(self):
+        info = {"formats": [video("137", 1080), video("248", 1080, vcodec="vp9", ext="webm"),
+                            audio("140", "m4a", 128), audio("251", "webm", 160)]}
+        opcao, = ranquear_formatos(info)
+        self.assertEqual(opcao["seletor"], "137+140")
+        self.assertEqual(opcao["ext"], "mp4")
+        self.assertTrue(opcao["remux"])
+
+    def test_recomenda_ate_1080p(self):
+        info = {"formats": [video("401", 2160, vcodec="av01"), video("137", 1080), video("136", 720),
+                            audio("140", "m4a", 128)]}
+        opcoes = ranquear_formatos(info)
+        self.assertEqual([o["altura"] for o in opcoes], [2160, 1080, 720])
+        self.assertEqual([o["altura"] for o in opcoes if o["recomendado"]], [1080])
+
+    def test_sem_audio_compativel_junta_em_mkv(self):
+        info = {"formats": [video("248", 1080, vcodec="vp9", ext="webm"), audio("140", "m4a", 128)]}
+        opcao, = ranquear_formatos(info)
+        self.assertEqual(opcao["seletor"], "248+140")
+        self.assertEqual(opcao["ext"], "mkv")
+
+    def test_video_sem_par_de_audio_fica_de_fora(self):
+        # O 1080p só existe sem áudio e o site não oferece áudio separado: baixaria mudo
+        info = {"formats": [video("137", 1080), video("22", 720, acodec="mp4a")]}
+        opcao, = ranquear_formatos(info)
+        self.assertEqual(opcao["seletor"], "22/best")
+        self.assertEqual(opcao["ext"], "mp4")
+
+    def test_video_mudo_usa_o_proprio_conteiner(self):
+        info = {"formats": [video("1", 720, vcodec="vp9", ext="webm")]}
+        opcao, = ranquear_formatos(info)
+        self.assertEqual(opcao["seletor"], "1/best")
+        self.assertEqual(opcao["ext"], "webm")
+
+if __name__ == "__main__":
+    unittest.main()
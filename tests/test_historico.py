@@ -0,0 +1,67 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import historico
+from historico import HistoricoDownloads, chave_do_pedido
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+INFO = {"extractor_key": "Youtube", "id": "dQw4w9WgXcQ"}
+
+class TestHistoricoDownloads(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        # O histórico grava pelo config.py; aqui só interessa o estado em memória
+        for nome in ("salvar_item", "remover_item"):
+            patcher = mock.patch.object(historico, nome, lambda *a: None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.historico = HistoricoDownloads({})
+
+    def arquivo(self, nome, conteudo=b"video"):
+        caminho = Path(self.pasta.name) / nome
+        caminho.write_bytes(conteudo)
+        return caminho
+
+    def registrar(self, nome, formato="bestvideo", conteudo=b"video", **dados):
+        chave = chave_do_pedido(URL, formato == "mp3", formato, INFO)
+        return self.historico.registrar(chave, {"arquivo": str(self.arquivo(nome, conteudo)), "url": URL,
+                                                "formato": formato, **dados})
+
+    def test_pedido_repetido_acha_o_arquivo(self):
+        entrada = self.registrar("Video.mp4")
+        # Outro link do mesmo vídeo, com e sem análise
+        self.assertIs(self.historico.procurar_pedido("https://youtu.be/dQw4w9WgXcQ", False, "bestvideo", INFO), entrada)
+        self.assertIs(self.historico.procurar_pedido("https://youtu.be/dQw4w9WgXcQ?t=3", False, "bestvideo"), entrada)
+        self.assertIsNone(self.historico.procurar_pedido(URL, True, "best_audio", INFO))
+
+    def test_mesmo_conteudo_fica_uma_copia(self):
+        primeira = self.registrar("Video.mp4")
+        segunda = self.historico.registrar("vimeo:1:bestvideo", {"arquivo": str(self.arquivo("Video (1).mp4")),
+                                                                   "formato": "bestvideo"})
+        self.assertEqual(segunda["arquivo"], primeira["arquivo"])
+        self.assertFalse((Path(self.pasta.name) / "Video (1).mp4").exists())
+
+    def test_copia_de_download_manual_deixa_de_ser_do_pre_cache(self):
+        do_pre_cache = self.registrar("Video.mp4", origem="pre_cache")
+        self.historico.registrar("vimeo:1:bestvideo", {"arquivo": str(self.arquivo("Copia.mp4")), "formato": "bestvideo"})
+        self.assertIsNone(do_pre_cache["origem"])
+
+    def test_arquivo_apagado_ou_alterado_sai_do_historico(self):
+        entrada = self.registrar("Video.mp4")
+        Path(entrada["arquivo"]).write_bytes(b"cortado")
+        self.assertIsNone(self.historico.procurar(entrada["id"]))
+        self.assertEqual(self.historico.entradas, [])
+
+    def test_registrar_de_novo_substitui(self):
+        self.registrar("Video.mp4")
+        nova = self.registrar("Video novo.mp4", conteudo=b"outro video")
+        self.assertEqual(self.historico.entradas, [nova])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+import historico
+import pre_cache
+from historico import HistoricoDownloads, calcular_hash
+from pre_cache import PreCacheEventos, ORIGEM_PRE_CACHE
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class GerenciadorFalso(QObject):
+    job_concluido = pyqtSignal(str, str)
+    job_erro = pyqtSignal(str, str)
+    job_adicionado = pyqtSignal(str)
+
+    def jobs(self):
+        return []
+
+class TestLiberarEspaco(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.downloads = Path(self.pasta.name)
+        # O histórico grava pelo config.py; aqui só interessa o estado em memória
+        for nome in ("salvar_item", "remover_item"):
+            patcher = mock.patch.object(historico, nome, lambda *a: None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(pre_cache, "DOWNLOAD_DIR", self.downloads)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pasta.cleanup)
+
+        # Limite de 0 GB: qualquer arquivo no disco é excesso
+        self.cfg = {"eventos": [], "pre_cache_limite_gb": 0}
+        self.historico = HistoricoDownloads(self.cfg)
+        self.pre_cache = PreCacheEventos(self.cfg, GerenciadorFalso(), self.historico)
+        self.pre_cache.timer.stop()
+
+    def baixar(self, nome, conteudo, url, origem):
+        arquivo = self.downloads / nome
+        arquivo.write_bytes(conteudo)
+        chave = f"youtube:{url[-3:]}:{origem or 'manual'}"
+        return self.historico.registrar(chave, {"arquivo": str(arquivo), "url": url, "formato": "best",
+                                                "sha256": calcular_hash(arquivo), "origem": origem})
+
+    def test_manual_depois_do_pre_cache_com_mesmo_conteudo(self):
+        pre = self.baixar("video.mp4", b"x" * 1000, "https://youtu.be/abc", ORIGEM_PRE_CACHE)
+        manual = self.baixar("video (1).mp4", b"x" * 1000, "https://youtu.be/abc", None)
+        self.assertEqual(manual["arquivo"], pre["arquivo"])
+
+        self.pre_cache.liberar_espaco()
+
+        self.assertTrue(Path(manual["arquivo"]).exists())
+        self.assertIsNotNone(self.historico.procurar(manual["id"]))
+
+    def test_pre_cache_depois_do_manual_com_mesmo_conteudo(self):
+        manual = self.baixar("video.mp4", b"y" * 1000, "https://youtu.be/def", None)
+        pre = self.baixar("video (1).mp4", b"y" * 1000, "https://youtu.be/def", ORIGEM_PRE_CACHE)
+        self.assertEqual(pre["arquivo"], manual["arquivo"])
+
+        self.pre_cache.liberar_espaco()
+
+        self.assertTrue(Path(manual["arquivo"]).exists())
+        self.assertIsNotNone(self.historico.procurar(manual["id"]))
+
+    def test_arquivo_so_do_pre_cache_sai(self):
+        pre = self.baixar("sozinho.mp4", b"z" * 1000, "https://youtu.be/ghi", ORIGEM_PRE_CACHE)
+
+        self.pre_cache.liberar_espaco()
+
+        self.assertFalse(Path(pre["arquivo"]).exists())
+        self.assertIsNone(self.historico.procurar(pre["id"]))
+
+if __name__ == "__main__":
+    unittest.main()
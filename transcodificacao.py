@@ -0,0 +1,314 @@
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
+from config import BUILDE_DIR
+
+# --- Transcodificação (ffmpeg) ---
+# Depois do download, o arquivo pode ser normalizado para os quiosques: resolução máxima,
+# H.264 + AAC e volume padronizado (loudnorm, EBU R128). Cada arquivo vira um processo
+# ffmpeg próprio; vários rodam juntos, em paralelo com os downloads, e o progresso vem
+# da saída '-progress' do próprio ffmpeg.
+THREADS_POR_PROCESSO = 2 # x264 rende mais com vários processos de poucas threads que com um só de muitas
+SESSOES_HW_MAX = 2 # Placas de vídeo domésticas limitam quantas codificações simultâneas aceitam
+LINHAS_ERRO = 8 # Últimas linhas do stderr guardadas para a mensagem de erro
+
+# Volume alvo dos quiosques: -16 LUFS, pico -1.5 dBTP
+FILTRO_VOLUME = "loudnorm=I=-16:TP=-1.5:LRA=11"
+AUDIO_AAC = ["-c:a", "aac", "-b:a", "160k", "-ar", "48000", "-af", FILTRO_VOLUME]
+X264 = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"]
+
+# Codificadores de hardware, na ordem de preferência, com um ajuste de qualidade equivalente ao CRF 23
+CODIFICADORES_HW = {
+    "h264_nvenc": ["-preset", "p4", "-cq", "23"],
+    "h264_qsv": ["-global_quality", "23"],
+    "h264_amf": ["-quality", "balanced", "-rc", "cqp", "-qp_i", "23", "-qp_p", "23"],
+    "h264_videotoolbox": ["-q:v", "65"],
+}
+
+PRESETS = {
+    "h264_720p": {
+        "nome": "H.264 720p (volume normalizado)",
+        "video": True,
+        "altura": 720,
+        "extensao": "mp4",
+    },
+    "h264_1080p": {
+        "nome": "H.264 1080p (volume normalizado)",
+        "video": True,
+        "altura": 1080,
+        "extensao": "mp4",
+    },
+    "audio_normalizado": {
+        "nome": "Áudio MP3 (volume normalizado)",
+        "video": False,
+        "argumentos": ["-vn", "-c:a", "libmp3lame", "-b:a", "192k", "-ar", "48000", "-af", FILTRO_VOLUME],
+        "extensao": "mp3",
+    },
+}
+
+# --- Estados de uma tarefa ---
+NA_FILA = "na_fila"
+CONVERTENDO = "convertendo"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+
+RE_DURACAO = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+def caminho_ffmpeg():
+    # O ffmpeg.exe da pasta builde (o mesmo do yt-dlp); fora do Windows, o do sistema
+    local = BUILDE_DIR / "ffmpeg.exe"
+    if local.exists():
+        return str(local)
+    return shutil.which("ffmpeg")
+
+def processos_padrao():
+    # Um núcleo fica livre para a interface e para os downloads
+    return max(1, ((os.cpu_count() or 2) - 1) // THREADS_POR_PROCESSO)
+
+def montar_comando(preset, entrada, saida, codificador="libx264"):
+    args = ["-hide_banner", "-nostdin", "-y", "-i", str(entrada), "-map_metadata", "-1"]
+    if preset["video"]:
+        # Nunca aumenta: vídeo menor que o limite fica do tamanho original
+        altura = preset["altura"]
+        args += ["-vf", f"scale=-2:'min({altura},ih)'", "-pix_fmt", "yuv420p"]
+        if codificador == "libx264":
+            args += X264
+        else:
+            args += ["-c:v", codificador] + CODIFICADORES_HW[codificador]
+        args += AUDIO_AAC + ["-movflags", "+faststart"]
+    else:
+        args += preset["argumentos"]
+    args += ["-threads", str(THREADS_POR_PROCESSO), "-progress", "pipe:1", "-nostats", str(saida)]
+    return args
+
+def nome_saida(entrada, chave):
+    entrada = Path(entrada)
+    return entrada.with_name(f"{entrada.stem} [{chave}].{PRESETS[chave]['extensao']}")
+
+class Transcodificador(QObject):
+    tarefa_adicionada = pyqtSignal(str)
+    tarefa_progresso = pyqtSignal(str, int) # id da tarefa, percentual
+    tarefa_concluida = pyqtSignal(str, str) # id da tarefa, arquivo gerado
+    tarefa_erro = pyqtSignal(str, str)
+
+    def __init__(self, cfg, gerenciador=None):
+        super().__init__()
+        self.cfg = cfg
+        self.max_simultaneos = cfg.get("transcodificacoes_simultaneas") or processos_padrao()
+        self.usar_hw = cfg.get("transcodificacao_hw", True)
+        self.tarefas = {} # id -> tarefa
+        self._fila = [] # ids na ordem de chegada
+        self._processos = {} # id -> QProcess
+        self._codificadores_hw = None # None = ainda não detectados
+        self._detector = None
+
+        if gerenciador is not None:
+            # Download com preset: converte assim que termina, sem esperar a fila de downloads esvaziar
+            self.gerenciador = gerenciador
+            gerenciador.job_concluido.connect(self._ao_download_concluido)
+
+    # --- Consulta ---
+    def tarefa(self, tarefa_id):
+        return self.tarefas.get(tarefa_id)
+
+    def ativas(self):
+        return len(self._processos)
+
+    # --- Ações ---
+    def adicionar(self, arquivo, preset, job_id=None):
+        if preset not in PRESETS:
+            raise ValueError(f"Preset desconhecido: {preset}")
+        tarefa = {
+            "id": uuid.uuid4().hex,
+            "arquivo": str(arquivo),
+            "preset": preset,
+            "saida": str(nome_saida(arquivo, preset)),
+            "job_id": job_id,
+            "estado": NA_FILA,
+            "progresso": 0,
+            "velocidade": None,
+            "mensagem": "Aguardando conversão...",
+        }
+        self.tarefas[tarefa["id"]] = tarefa
+        self.tarefa_adicionada.emit(tarefa["id"])
+        if Path(tarefa["saida"]).exists():
+            # Já convertido antes (ex: o mesmo vídeo baixado de novo)
+            tarefa.update({"estado": CONCLUIDA, "progresso": 100,
+                           "mensagem": f"Já convertido: {Path(tarefa['saida']).name}"})
+            self.tarefa_concluida.emit(tarefa["id"], tarefa["saida"])
+            return tarefa["id"]
+        self._fila.append(tarefa["id"])
+        self._preencher_vagas()
+        return tarefa["id"]
+
+    def cancelar(self, tarefa_id):
+        tarefa = self.tarefas.get(tarefa_id)
+        if not tarefa or tarefa["estado"] not in (NA_FILA, CONVERTENDO):
+            return
+        tarefa["estado"] = CANCELADA
+        tarefa["mensagem"] = "Conversão cancelada."
+        if tarefa_id in self._fila:
+            self._fila.remove(tarefa_id)
+        processo = self._processos.get(tarefa_id)
+        if processo is not None:
+            processo.kill() # O arquivo temporário é apagado quando o processo terminar
+
+    def encerrar(self):
+        for tarefa_id in list(self._processos):
+            self.cancelar(tarefa_id)
+        for processo in list(self._processos.values()):
+            processo.waitForFinished(2000)
+
+    # --- Pool de processos ---
+    def _preencher_vagas(self):
+        if not self._fila:
+            return
+        if self.usar_hw and self._codificadores_hw is None:
+            self._detectar_hw() # Continua quando a lista de codificadores chegar
+            return
+        while self._fila and len(self._processos) < self.max_simultaneos:
+            self._iniciar(self.tarefas[self._fila.pop(0)])
+
+    def _detectar_hw(self):
+        if self._detector is not None:
+            return
+        ffmpeg = caminho_ffmpeg()
+        if ffmpeg is None:
+            self._codificadores_hw = []
+            self._preencher_vagas()
+            return
+        self._detector = QProcess(self)
+        self._detector.finished.connect(self._ao_detectar)
+        self._detector.errorOccurred.connect(lambda _: self._ao_detectar())
+        self._detector.start(ffmpeg, ["-hide_banner", "-encoders"])
+
+    def _ao_detectar(self, *args):
+        if self._detector is None:
+            return
+        saida = bytes(self._detector.readAllStandardOutput()).decode(errors="replace")
+        self._detector.deleteLater()
+        self._detector = None
+        self._codificadores_hw = [c for c in CODIFICADORES_HW if re.search(rf"\b{c}\b", saida)]
+        if self._codificadores_hw:
+            print(f"Transcodificação: codificador de hardware disponível ({self._codificadores_hw[0]}).")
+        self._preencher_vagas()
+
+    def _escolher_codificador(self, preset):
+        if not preset["video"] or not self._codificadores_hw:
+            return "libx264"
+        em_uso = sum(1 for t in self.tarefas.values()
+                     if t["estado"] == CONVERTENDO and t.get("codificador", "libx264") != "libx264")
+        # Sessões da placa esgotadas: este arquivo vai para a CPU
+        return self._codificadores_hw[0] if em_uso < SESSOES_HW_MAX else "libx264"
+
+    def _iniciar(self, tarefa):
+        ffmpeg = caminho_ffmpeg()
+        if ffmpeg is None:
+            self._falhar(tarefa, "ffmpeg não encontrado na pasta builde nem no sistema.")
+            return
+        preset = PRESETS[tarefa["preset"]]
+        saida = Path(tarefa["saida"])
+        # Escreve num temporário: o nome final só aparece com o arquivo completo
+        tarefa["temporario"] = str(saida.with_name(saida.stem + ".tmp" + saida.suffix))
+        tarefa["codificador"] = self._escolher_codificador(preset)
+        tarefa["duracao"] = None
+        tarefa["stderr"] = []
+        tarefa["estado"] = CONVERTENDO
+        tarefa["progresso"] = 0
+        tarefa["mensagem"] = f"Convertendo ({preset['nome']})..."
+
+        processo = QProcess(self)
+        tid = tarefa["id"]
+        processo.readyReadStandardOutput.connect(lambda tid=tid: self._ler_progresso(tid))
+        processo.readyReadStandardError.connect(lambda tid=tid: self._ler_stderr(tid))
+        processo.finished.connect(lambda codigo, _status, tid=tid: self._ao_terminar(tid, codigo))
+        processo.errorOccurred.connect(lambda erro, tid=tid: self._ao_falhar_inicio(tid, erro))
+        self._processos[tid] = processo
+        processo.start(ffmpeg, montar_comando(preset, tarefa["arquivo"], tarefa["temporario"], tarefa["codificador"]))
+        self.tarefa_progresso.emit(tid, 0)
+
+    # --- Saída do ffmpeg ---
+    def _ler_stderr(self, tarefa_id):
+        tarefa = self.tarefas[tarefa_id]
+        texto = bytes(self._processos[tarefa_id].readAllStandardError()).decode(errors="replace")
+        for linha in texto.splitlines():
+            if tarefa["duracao"] is None:
+                achado = RE_DURACAO.search(linha)
+                if achado:
+                    h, m, s = achado.groups()
+                    tarefa["duracao"] = int(h) * 3600 + int(m) * 60 + float(s)
+            if linha.strip():
+                tarefa["stderr"] = (tarefa["stderr"] + [linha.strip()])[-LINHAS_ERRO:]
+
+    def _ler_progresso(self, tarefa_id):
+        # Blocos "chave=valor" terminados por progress=continue|end, um a cada ~0,5 s
+        tarefa = self.tarefas[tarefa_id]
+        processo = self._processos[tarefa_id]
+        while processo.canReadLine():
+            linha = bytes(processo.readLine()).decode(errors="replace").strip()
+            chave, _, valor = linha.partition("=")
+            if chave == "out_time_us" and valor.isdigit() and tarefa["duracao"]:
+                percentual = min(99, int(int(valor) / 1e6 * 100 / tarefa["duracao"]))
+                if percentual != tarefa["progresso"]:
+                    tarefa["progresso"] = percentual
+                    self.tarefa_progresso.emit(tarefa_id, percentual)
+            elif chave == "speed" and valor.endswith("x"):
+                try:
+                    tarefa["velocidade"] = float(valor[:-1])
+                except ValueError:
+                    pass
+
+    def _ao_terminar(self, tarefa_id, codigo):
+        if tarefa_id not in self._processos:
+            return
+        # O que sobrou nos buffers (a mensagem de erro costuma ser a última linha)
+        self._ler_stderr(tarefa_id)
+        self._ler_progresso(tarefa_id)
+        self._processos.pop(tarefa_id).deleteLater()
+        tarefa = self.tarefas[tarefa_id]
+        temporario = Path(tarefa["temporario"])
+        if tarefa["estado"] == CANCELADA:
+            temporario.unlink(missing_ok=True)
+        elif codigo == 0 and temporario.exists():
+            temporario.replace(tarefa["saida"])
+            tarefa["estado"] = CONCLUIDA
+            tarefa["progresso"] = 100
+            tarefa["mensagem"] = f"Convertido: {Path(tarefa['saida']).name}"
+            self.tarefa_progresso.emit(tarefa_id, 100)
+            self.tarefa_concluida.emit(tarefa_id, tarefa["saida"])
+        elif tarefa["codificador"] != "libx264":
+            # O ffmpeg lista o codificador da placa mesmo sem driver/placa: desiste dele e refaz na CPU
+            temporario.unlink(missing_ok=True)
+            print(f"Transcodificação: {tarefa['codificador']} falhou, usando a CPU.")
+            if tarefa["codificador"] in self._codificadores_hw:
+                self._codificadores_hw.remove(tarefa["codificador"])
+            tarefa["estado"] = NA_FILA
+            self._fila.insert(0, tarefa_id)
+        else:
+            temporario.unlink(missing_ok=True)
+            detalhe = tarefa["stderr"][-1] if tarefa["stderr"] else f"código {codigo}"
+            self._falhar(tarefa, f"Erro na conversão: {detalhe}")
+        self._preencher_vagas()
+
+    def _ao_falhar_inicio(self, tarefa_id, erro):
+        if erro != QProcess.ProcessError.FailedToStart:
+            return # Os outros erros chegam também pelo finished
+        processo = self._processos.pop(tarefa_id, None)
+        if processo is not None:
+            processo.deleteLater()
+        self._falhar(self.tarefas[tarefa_id], "Não foi possível iniciar o ffmpeg.")
+        QTimer.singleShot(0, self._preencher_vagas)
+
+    def _falhar(self, tarefa, mensagem):
+        tarefa["estado"] = FALHOU
+        tarefa["mensagem"] = mensagem
+        self.tarefa_erro.emit(tarefa["id"], mensagem)
+
+    def _ao_download_concluido(self, job_id, msg):
+        job = self.gerenciador.job(job_id)
+        if job and job.get("preset") and job.get("arquivo"):
+            self.adicionar(job["arquivo"], job["preset"], job_id)